@@ -0,0 +1,224 @@
+import collections
+
+import numpy as np
+
+# Сколько ближайших монет рассматривается для каждого транспорта
+CANDIDATES_PER_TRANSPORT = 8
+# Ценность монеты — очки в секунду пути: очки делятся на оценку времени
+# до нее плюс SETTLE_SECONDS (торможение у монеты и выбор следующей),
+# иначе самые близкие монеты получают почти бесконечную ценность
+SETTLE_SECONDS = 3.0
+# Моменты (секунды), в которые проверяется, успевает ли транспорт
+# к монете: чаще вблизи, реже на больших расстояниях
+TRAVEL_SECONDS = np.concatenate((
+    np.arange(0.5, 10, 0.5), np.arange(10, 60, 2.0), np.arange(60, 200, 10.0)
+    ))
+# Надбавка к ценности монеты (очки в секунду), которую транспорт выбрал
+# сам по правилам угла и дистанции: при равной ценности транспорт
+# сохраняет свой выбор
+PREFERRED_BONUS = 0.05
+# Радиус поиска кандидатов; если в нем нет монет, берется ближайшая
+CANDIDATE_RADIUS = 1500
+# Минимальный шаг повышения цены в аукционе (очки в секунду): итоговое
+# распределение отличается от оптимального не больше чем
+# на T * AUCTION_EPSILON
+AUCTION_EPSILON = 5e-5
+# Предел числа ставок за один тик
+MAX_BIDS = 2000
+# Насколько ценность отказа от монеты ниже худшего кандидата транспорта
+# (очки в секунду): транспорт уступает монету, только если ее цена
+# выросла сильнее
+UNASSIGNED_PENALTY = 0.1
+
+
+def travel_seconds(transport, x, y, max_accel, max_speed):
+    """
+    Оценивает время пути транспорта до точек.
+
+    Транспорт успевает к точке за время t, если смещение, которое
+    остается после движения по инерции и под действием поля аномалий
+    в его точке (поле считается постоянным), покрывается собственным
+    ускорением не больше max_accel, а расстояние — скоростью не больше
+    max_speed. Берется наименьший такой момент из TRAVEL_SECONDS.
+
+    Параметры:
+    transport (Transport): Транспорт.
+    x, y (ndarray): Координаты точек.
+    max_accel (float): Максимальное собственное ускорение.
+    max_speed (float): Максимальная скорость.
+
+    Возвращает:
+    ndarray: Время в секундах для каждой точки (последний момент
+    TRAVEL_SECONDS, если транспорт не успевает ни к одному).
+    """
+    dx = (np.asarray(x, dtype=float) - transport.x)[:, None]
+    dy = (np.asarray(y, dtype=float) - transport.y)[:, None]
+    t = TRAVEL_SECONDS[None, :]
+    drift = t * t / 2
+    rest_x = dx - transport.vx * t - transport.anomaly_ax * drift
+    rest_y = dy - transport.vy * t - transport.anomaly_ay * drift
+    reachable = (np.hypot(rest_x, rest_y) <= max_accel * drift) & (
+        np.hypot(dx, dy) <= max_speed * t
+        )
+    first = np.where(
+        reachable.any(axis=1), reachable.argmax(axis=1),
+        len(TRAVEL_SECONDS) - 1
+        )
+    return TRAVEL_SECONDS[first]
+
+
+class BountyAssigner:
+    """
+    Совместное распределение монет между транспортами.
+
+    Транспорты, чью самостоятельно выбранную монету больше никто
+    не выбрал, сохраняют ее. Для остальных (выбравших одну монету
+    на нескольких) отбираются ближайшие монеты, ценность пары
+    транспорт–монета — очки в секунду пути (см. travel_seconds
+    и SETTLE_SECONDS): монета позади быстро летящего транспорта или
+    против поля аномалий стоит меньше такой же впереди. Распределение,
+    при котором каждая монета достается не больше чем одному
+    транспорту, ищется аукционом Берцекаса: свободный транспорт
+    делает ставку на монету с наибольшей выгодой (ценность минус цена),
+    повышая ее цену на разницу с второй по выгоде монетой. У каждого
+    транспорта есть и вариант остаться без монеты (тогда он выбирает
+    цель сам), что ограничивает рост цен при нехватке монет.
+
+    Цены монет, распределенных в прошлом тике, сохраняются по их
+    координатам: монеты не перемещаются, поэтому следующий аукцион
+    начинается почти с равновесия и завершается за несколько ставок.
+
+    Атрибуты:
+    bids (int): Число ставок в последнем распределении.
+    """
+
+    def __init__(self, candidates=CANDIDATES_PER_TRANSPORT,
+                 radius=CANDIDATE_RADIUS, epsilon=AUCTION_EPSILON):
+        self.candidates = candidates
+        self.radius = radius
+        self.epsilon = epsilon
+        self._prices = {}
+        self.bids = 0
+
+    def assign(self, world, index, preferred=None):
+        """
+        Распределяет монеты между живыми транспортами.
+
+        Параметры:
+        world (World): Состояние мира.
+        index (WorldIndex): Пространственный индекс этого состояния.
+        preferred (dict): Идентификатор транспорта -> монета, выбранная
+        им самостоятельно; она получает надбавку PREFERRED_BONUS.
+
+        Возвращает:
+        dict: Идентификатор транспорта -> индекс монеты в world.bounties
+        для транспортов, получивших монету.
+        """
+        bounties = world.bounties
+        transports = [t for t in world.transports if t.status == 'alive']
+        preferred = preferred or {}
+        claims = collections.Counter(
+            preferred.get(transport.id) for transport in transports
+            )
+        result = {}
+        contested = []
+        for transport in transports:
+            target = preferred.get(transport.id)
+            if target is not None and target >= 0 and claims[target] == 1:
+                result[transport.id] = target
+            else:
+                contested.append(transport)
+        taken = set(result.values())
+        transports = contested
+        options = []
+        for transport in transports:
+            candidates, values = self._candidates(
+                world, transport, index, preferred.get(transport.id)
+                )
+            free = np.fromiter(
+                (bounty not in taken for bounty in candidates.tolist()),
+                dtype=bool, count=len(candidates)
+                )
+            options.append((candidates[free], values[free]))
+
+        prices = {}
+        keys = {}
+        for candidates, _ in options:
+            for bounty in candidates.tolist():
+                if bounty not in keys:
+                    key = (float(bounties.x[bounty]),
+                           float(bounties.y[bounty]))
+                    keys[bounty] = key
+                    prices[bounty] = self._prices.get(key, 0.0)
+
+        owner = {}
+        assigned = [None] * len(transports)
+        queue = list(range(len(transports)))
+        self.bids = 0
+        while queue and self.bids < MAX_BIDS:
+            person = queue.pop()
+            candidates, values = options[person]
+            if not len(candidates):
+                continue
+            profits = values - np.fromiter(
+                (prices[bounty] for bounty in candidates.tolist()),
+                dtype=float, count=len(candidates)
+                )
+            unassigned = values.min() - UNASSIGNED_PENALTY
+            order = np.argsort(-profits, kind='stable')
+            best = order[0]
+            if profits[best] <= unassigned:
+                continue
+            second = max(
+                profits[order[1]] if len(order) > 1 else unassigned,
+                unassigned
+                )
+            bounty = int(candidates[best])
+            prices[bounty] += profits[best] - second + self.epsilon
+            previous = owner.get(bounty)
+            if previous is not None:
+                assigned[previous] = None
+                queue.append(previous)
+            owner[bounty] = person
+            assigned[person] = bounty
+            self.bids += 1
+
+        self._prices = {keys[bounty]: prices[bounty] for bounty in owner}
+        for transport, bounty in zip(transports, assigned):
+            if bounty is not None:
+                result[transport.id] = bounty
+        return result
+
+    def _candidates(self, world, transport, index, preferred):
+        """
+        Отбирает ближайшие монеты транспорта и их ценность.
+
+        Возвращает:
+        tuple: Индексы монет и ценности (очки в секунду пути).
+        """
+        bounties = world.bounties
+        x = transport.x
+        y = transport.y
+        candidates, distances = index.bounties.within(x, y, self.radius)
+        if len(candidates) > self.candidates:
+            nearest = np.argpartition(distances, self.candidates)[
+                :self.candidates
+                ]
+            nearest.sort()
+            candidates = candidates[nearest]
+        elif not len(candidates):
+            bounty, _ = index.bounties.nearest(x, y)
+            if bounty < 0:
+                return candidates, distances
+            candidates = np.array([bounty])
+        if preferred is not None and preferred >= 0 and not (
+                candidates == preferred).any():
+            candidates = np.append(candidates, preferred)
+        seconds = travel_seconds(
+            transport, bounties.x[candidates], bounties.y[candidates],
+            world.max_accel, world.max_speed
+            )
+        values = bounties.points[candidates] / (seconds + SETTLE_SECONDS)
+        if preferred is not None and preferred >= 0:
+            values[candidates == preferred] += PREFERRED_BONUS
+        return candidates, values
@@ -0,0 +1,70 @@
+"""
+Сравнение скорости декодирования ответа сервера.
+
+Прежний путь — json.loads и World.from_response; decode_world без
+orjson совпадает с ним, поэтому разница видна только с orjson.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_decode.py
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import decoder  # noqa: E402
+from synthetic import load_mock, scale_response  # noqa: E402
+from world import World  # noqa: E402
+
+REPEAT = 7
+NUMBER = 20
+
+
+def decode_previous(raw):
+    """Прежний путь: json.loads и построение World из словарей."""
+    return World.from_response(json.loads(raw))
+
+
+def decode_stdlib(raw):
+    """Декодирует ответ через decode_world без orjson."""
+    fast = decoder.orjson
+    decoder.orjson = None
+    try:
+        return decoder.decode_world(raw)
+    finally:
+        decoder.orjson = fast
+
+
+def measure(function, raw):
+    """
+    Возвращает лучшее время одного вызова в миллисекундах.
+    """
+    best = min(timeit.repeat(
+        lambda: function(raw), repeat=REPEAT, number=NUMBER
+        ))
+    return best / NUMBER * 1000
+
+
+def main():
+    mock = load_mock()
+    payloads = {
+        'mock.json': json.dumps(mock).encode('utf-8'),
+        'x10': json.dumps(scale_response(mock, 10)).encode('utf-8'),
+        }
+    paths = {
+        'json.loads + from_response': decode_previous,
+        'decode_world (stdlib)': decode_stdlib,
+        }
+    if decoder.orjson is not None:
+        paths['decode_world (orjson)'] = decoder.decode_world
+
+    for name, raw in payloads.items():
+        print(f'{name}: {len(raw)} bytes')
+        for label, function in paths.items():
+            print(f'  {label:<26} {measure(function, raw):8.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Проверка модели поля аномалий по ответу сервера.
+
+Сервер сообщает для каждого транспорта anomalyAcceleration — суммарное
+ускорение от аномалий в его точке. Для каждого транспорта из mock.json
+печатается это значение и расчет field_at, затем среднеквадратичная
+невязка по всем компонентам; для сравнения — невязка степенных моделей
+strength * radius^alpha / d^beta с наилучшим множителем. Транспорт
+с заглушкой PLACEHOLDER вместо ускорения (в mock.json у него и скорость
+(-20, -20), и нулевое собственное ускорение) в невязку не входит.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_field.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from force_field import FieldGrid, field_at  # noqa: E402
+from synthetic import load_mock  # noqa: E402
+from world import World  # noqa: E402
+
+# Значение anomalyAcceleration у транспорта-заглушки в mock.json
+PLACEHOLDER = (-20.0, 20.0)
+# Показатели степенных моделей для сравнения: (alpha, beta)
+MODELS = ((2, 2), (0, 2), (0, 1), (1, 1))
+
+
+def power_field(anomalies, x, y, alpha, beta):
+    """
+    Поле модели strength * radius^alpha / d^beta с единичным множителем.
+    """
+    dx = anomalies.x[None, :] - x[:, None]
+    dy = anomalies.y[None, :] - y[:, None]
+    distance = np.hypot(dx, dy)
+    magnitude = np.where(
+        distance <= anomalies.effective_radius[None, :],
+        anomalies.strength * anomalies.radius ** alpha
+        / np.maximum(distance, anomalies.radius[None, :]) ** beta,
+        0.0
+        )
+    scale = magnitude / np.maximum(distance, 1e-12)
+    return (scale * dx).sum(axis=1), (scale * dy).sum(axis=1)
+
+
+def rms(residual):
+    return float(np.sqrt(np.mean(np.square(residual))))
+
+
+def main():
+    world = World.from_response(load_mock())
+    anomalies = world.anomalies
+    transports = [
+        transport for transport in world.transports
+        if (transport.anomaly_ax, transport.anomaly_ay) != PLACEHOLDER
+        ]
+    skipped = len(world.transports) - len(transports)
+    x = np.array([transport.x for transport in transports], dtype=float)
+    y = np.array([transport.y for transport in transports], dtype=float)
+    reported = np.array([
+        (transport.anomaly_ax, transport.anomaly_ay)
+        for transport in transports
+        ]).reshape(-1)
+
+    model_ax, model_ay = field_at(anomalies, x, y)
+    grid = FieldGrid(world.map_width, world.map_height)
+    grid.update(anomalies)
+    grid_ax, grid_ay = grid.sample(x, y)
+    print(f'Транспортов {len(transports)} (заглушек пропущено {skipped})')
+    for i, transport in enumerate(transports):
+        print(
+            f'  ({transport.x:5}, {transport.y:5}): '
+            f'сервер ({transport.anomaly_ax:6.2f}, '
+            f'{transport.anomaly_ay:6.2f}), '
+            f'field_at ({model_ax[i]:6.2f}, {model_ay[i]:6.2f}), '
+            f'FieldGrid ({grid_ax[i]:6.2f}, {grid_ay[i]:6.2f})'
+            )
+    model = np.column_stack((model_ax, model_ay)).reshape(-1)
+    grid_model = np.column_stack((grid_ax, grid_ay)).reshape(-1)
+    print(f'Невязка field_at {rms(model - reported):.3f}, '
+          f'FieldGrid {rms(grid_model - reported):.3f}')
+
+    print('Степенные модели с наилучшим множителем:')
+    for alpha, beta in MODELS:
+        power = np.column_stack(
+            power_field(anomalies, x, y, alpha, beta)
+            ).reshape(-1)
+        factor = float(power @ reported / (power @ power))
+        print(
+            f'  strength * radius^{alpha} / d^{beta}: '
+            f'множитель {factor:.4g}, '
+            f'невязка {rms(factor * power - reported):.3f}, '
+            f'с множителем 1 {rms(power - reported):.3f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+Проверка и замер геометрического ядра calculations.py.
+
+Сначала на случайных векторах (включая нулевые, коллинеарные
+и противоположные) проверяется, что функции со словарями дают те же
+значения, что и прежние реализации, пороги углов через косинусы —
+те же решения, что сравнение углов в градусах, а пакетные варианты —
+те же значения, что и функции для одного вектора. Затем сравнивается
+время вызова со словарями, с числами и пакетного варианта.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_geometry.py
+"""
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from calculations import (calculate_angle_between_vectors,  # noqa: E402
+                          clamp_length, clamp_length_many, cos_between,
+                          cos_between_many, cos_threshold, limit_length,
+                          limit_length_many, normalize_max_vector,
+                          normalize_vector)
+
+SAMPLES = 100000
+THRESHOLDS = (15, 20, 30, 45)
+
+
+def reference_angle(v1, v2):
+    """Прежняя реализация calculate_angle_between_vectors."""
+    dot_product = v1['x'] * v2['x'] + v1['y'] * v2['y']
+    magnitude_v1 = math.sqrt(v1['x'] ** 2 + v1['y'] ** 2)
+    magnitude_v2 = math.sqrt(v2['x'] ** 2 + v2['y'] ** 2)
+    if magnitude_v1 == 0 or magnitude_v2 == 0:
+        return math.degrees(0)
+    cos_angle = dot_product / (magnitude_v1 * magnitude_v2)
+    cos_angle = max(min(cos_angle, 1), -1)
+    return math.degrees(math.acos(cos_angle))
+
+
+def reference_normalize(vector, max_length):
+    """Прежняя реализация normalize_vector."""
+    length = math.sqrt(vector['x'] ** 2 + vector['y'] ** 2)
+    if length > 0:
+        scaling_factor = min(max_length / length, 1)
+        return {
+            'x': vector['x'] * scaling_factor,
+            'y': vector['y'] * scaling_factor
+        }
+    return {'x': 0, 'y': 0}
+
+
+def reference_normalize_max(vector, max_length):
+    """Прежняя реализация normalize_max_vector."""
+    length = math.sqrt(vector['x'] ** 2 + vector['y'] ** 2)
+    if length > max_length:
+        scaling_factor = max_length / length
+        return {
+            'x': vector['x'] * scaling_factor,
+            'y': vector['y'] * scaling_factor
+        }
+    return vector
+
+
+def random_vector(rng):
+    """Случайный вектор с долей вырожденных случаев."""
+    kind = rng.random()
+    if kind < 0.05:
+        return {'x': 0, 'y': 0}
+    if kind < 0.1:
+        return {'x': rng.choice((0.0, 1.0, -3.5)), 'y': 0.0}
+    if kind < 0.15:
+        return {'x': rng.randint(-20, 20), 'y': rng.randint(-20, 20)}
+    scale = 10 ** rng.uniform(-6, 4)
+    return {'x': rng.uniform(-1, 1) * scale, 'y': rng.uniform(-1, 1) * scale}
+
+
+def check(rng):
+    """
+    Сравнивает ядро с прежними реализациями.
+
+    Возвращает:
+    int: Число расхождений (должно быть 0).
+    """
+    mismatches = 0
+    first = [random_vector(rng) for _ in range(SAMPLES)]
+    second = []
+    for vector in first:
+        if rng.random() < 0.1:
+            # Коллинеарные и противоположные векторы
+            factor = rng.choice((1.0, -1.0, 2.5, -0.1))
+            second.append({'x': vector['x'] * factor,
+                           'y': vector['y'] * factor})
+        else:
+            second.append(random_vector(rng))
+
+    for v1, v2 in zip(first, second):
+        angle = reference_angle(v1, v2)
+        if calculate_angle_between_vectors(v1, v2) != angle:
+            mismatches += 1
+        cos_angle = cos_between(v1['x'], v1['y'], v2['x'], v2['y'])
+        for threshold in THRESHOLDS:
+            # Расхождение допустимо лишь в пределах округления у порога
+            if (angle > threshold) != (cos_angle < cos_threshold(threshold)):
+                if abs(angle - threshold) > 1e-9:
+                    mismatches += 1
+        max_length = rng.choice((1, 5, 0.5))
+        if normalize_vector(v1, max_length) != reference_normalize(
+                v1, max_length):
+            mismatches += 1
+        if normalize_max_vector(v1, max_length) != reference_normalize_max(
+                v1, max_length):
+            mismatches += 1
+
+    x1 = np.array([v['x'] for v in first], dtype=float)
+    y1 = np.array([v['y'] for v in first], dtype=float)
+    x2 = np.array([v['x'] for v in second], dtype=float)
+    y2 = np.array([v['y'] for v in second], dtype=float)
+    batched = cos_between_many(x1, y1, x2, y2)
+    single = np.array([
+        cos_between(a, b, c, d) for a, b, c, d in zip(x1, y1, x2, y2)
+        ])
+    mismatches += int(np.sum(np.abs(batched - single) > 1e-12))
+    lx, ly = limit_length_many(x1, y1, 1.0)
+    single = np.array([limit_length(a, b, 1.0) for a, b in zip(x1, y1)])
+    mismatches += int(np.sum(np.abs(lx - single[:, 0]) > 1e-12))
+    mismatches += int(np.sum(np.abs(ly - single[:, 1]) > 1e-12))
+    cx, cy = clamp_length_many(x1, y1, 1.0)
+    single = np.array([clamp_length(a, b, 1.0) for a, b in zip(x1, y1)])
+    mismatches += int(np.sum(np.abs(cx - single[:, 0]) > 1e-12))
+    mismatches += int(np.sum(np.abs(cy - single[:, 1]) > 1e-12))
+    return mismatches
+
+
+def measure(function, number):
+    """Время одного вызова в микросекундах."""
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) / number * 1e6
+
+
+def main():
+    rng = random.Random(0)
+    mismatches = check(rng)
+    print(f'Расхождений с прежней реализацией: {mismatches}')
+
+    vectors = [random_vector(rng) for _ in range(SAMPLES)]
+    pairs = list(zip(vectors, vectors[1:]))
+    tuples = [(a['x'], a['y'], b['x'], b['y']) for a, b in pairs]
+    columns = np.array(tuples, dtype=float).T.copy()
+    threshold = cos_threshold(20)
+    results = {
+        'dict angle > 20': measure(lambda: [
+            calculate_angle_between_vectors(a, b) > 20 for a, b in pairs
+            ], len(pairs)),
+        'cos_between < cos': measure(lambda: [
+            cos_between(*values) < threshold for values in tuples
+            ], len(tuples)),
+        'cos_between_many': measure(
+            lambda: cos_between_many(*columns) < threshold, len(tuples)
+            ),
+        }
+    for name, microseconds in results.items():
+        print(f'{name:<20} {microseconds:8.3f} мкс на пару')
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""
+Замеры стадий тика по отдельности и целиком на mock.json
+и синтетических мирах, увеличенных в 10 и 100 раз.
+
+Результаты выводятся таблицей и сохраняются в JSON; при наличии
+базового файла выполняется сравнение с ним.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_pipeline.py [--output results.json]
+    python benchmarks/bench_pipeline.py --save        # обновить базу
+    python benchmarks/bench_pipeline.py --fail        # код 1 при регрессии
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from decoder import decode_world  # noqa: E402
+from logger import Telemetry, log  # noqa: E402
+from map_render import MapRenderer, draw_transport_actions, get_map  # noqa
+from mock_viewer import make_viewer  # noqa: E402
+from motion_control import control_transports  # noqa: E402
+from rewind_client import RewindClient  # noqa: E402
+from spatial_index import WorldIndex  # noqa: E402
+from synthetic import load_mock, scale_response  # noqa: E402
+
+BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'baseline.json'
+    )
+# Допустимое замедление относительно базы, после которого стадия
+# считается регрессией
+REGRESSION_THRESHOLD = 0.25
+# Примерное время замера одной стадии в секундах
+TARGET_SECONDS = 0.5
+REPEAT = 5
+# Увеличение мира и число транспортов в нем
+SCALES = (('mock', 1), ('x10', 10), ('x100', 100))
+
+
+def measure(function):
+    """
+    Замеряет функцию без аргументов.
+
+    Число вызовов в серии подбирается так, чтобы все серии заняли около
+    TARGET_SECONDS.
+
+    Возвращает:
+    dict: Минимальное и медианное время одного вызова в миллисекундах
+    и число вызовов в серии.
+    """
+    start = time.perf_counter()
+    function()
+    once = max(time.perf_counter() - start, 1e-6)
+    number = max(1, int(TARGET_SECONDS / REPEAT / once))
+    samples = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        samples.append((time.perf_counter() - start) / number * 1000)
+    return {
+        'min_ms': min(samples),
+        'median_ms': statistics.median(samples),
+        'number': number,
+        }
+
+
+def stages(raw, null_client, socket_client):
+    """
+    Готовит замеряемые стадии для одного мира.
+
+    Параметры:
+    raw (bytes): Тело ответа сервера.
+    null_client (RewindClient): Клиент с приемником без разбора.
+    socket_client (RewindClient): Клиент с разбирающим приемником.
+
+    Возвращает:
+    dict: Имя стадии -> функция без аргументов.
+    """
+    world = decode_world(raw)
+    index = WorldIndex(world)
+    commands = control_transports(world, index)
+    retained = MapRenderer(null_client)
+    telemetry = Telemetry()
+
+    def render(client):
+        get_map(client, world)
+        draw_transport_actions(client, world, commands)
+
+    def end_to_end():
+        tick_world = decode_world(raw)
+        tick_index = WorldIndex(tick_world)
+        tick_commands = control_transports(tick_world, tick_index)
+        telemetry.log(tick_world, null_client)
+        retained.draw(tick_world, tick_commands)
+
+    return {
+        'decode': lambda: decode_world(raw),
+        'index': lambda: WorldIndex(world),
+        'control_transports': lambda: control_transports(world, index),
+        'get_map/null': lambda: render(null_client),
+        'get_map/socket': lambda: render(socket_client),
+        'map_renderer/null': lambda: retained.draw(world, commands),
+        'log/null': lambda: log(world, null_client),
+        'telemetry/null': lambda: telemetry.log(world, null_client),
+        'end_to_end/null': end_to_end,
+        }
+
+
+def run(only=None):
+    """
+    Выполняет все замеры.
+
+    Параметры:
+    only (str): Подстрока имени замера, чтобы выполнить только часть.
+
+    Возвращает:
+    dict: Описание окружения и результаты по ключам 'мир/стадия'.
+    """
+    servers = [make_viewer(parse=False), make_viewer(parse=True)]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    clients = [
+        RewindClient(*server.server_address, batch=True)
+        for server in servers
+        ]
+
+    mock = load_mock()
+    results = {}
+    try:
+        for name, factor in SCALES:
+            response = (
+                mock if factor == 1
+                else scale_response(mock, factor, scale_transports=True)
+                )
+            raw = json.dumps(response).encode('utf-8')
+            for stage, function in stages(raw, *clients).items():
+                key = f'{name}/{stage}'
+                if only and only not in key:
+                    continue
+                results[key] = measure(function)
+                print(f'{key:<32} {results[key]["median_ms"]:10.3f} ms')
+    finally:
+        for client in clients:
+            client.close()
+        for server in servers:
+            server.shutdown()
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            },
+        'results': results,
+        }
+
+
+def compare(report, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Сравнивает результаты с базой по медианному времени.
+
+    Параметры:
+    report (dict): Текущие результаты (см. run).
+    baseline (dict): Базовые результаты того же формата.
+    threshold (float): Допустимое относительное замедление.
+
+    Возвращает:
+    list: Ключи замеров, замедлившихся больше чем на threshold.
+    """
+    regressions = []
+    print(f'\n{"stage":<32} {"base ms":>10} {"now ms":>10} {"ratio":>7}')
+    for key, result in report['results'].items():
+        base = baseline['results'].get(key)
+        if base is None:
+            continue
+        ratio = result['median_ms'] / base['median_ms']
+        mark = ''
+        if ratio > 1 + threshold:
+            regressions.append(key)
+            mark = '  REGRESSION'
+        print(f'{key:<32} {base["median_ms"]:10.3f} '
+              f'{result["median_ms"]:10.3f} {ratio:7.2f}{mark}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--output', help='куда сохранить результаты JSON')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save', action='store_true',
+                        help='сохранить результаты как базу')
+    parser.add_argument('--fail', action='store_true',
+                        help='завершиться с кодом 1 при регрессии')
+    parser.add_argument('--threshold', type=float,
+                        default=REGRESSION_THRESHOLD)
+    parser.add_argument('--only', help='подстрока имени замера')
+    args = parser.parse_args()
+
+    report = run(args.only)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    if args.save:
+        with open(args.baseline, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f'База сохранена: {args.baseline}')
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f'\nРегрессии: {", ".join(regressions)}')
+            if args.fail:
+                return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
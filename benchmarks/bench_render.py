@@ -0,0 +1,94 @@
+"""
+Сравнение стоимости отрисовки кадра: отправка каждого примитива
+отдельно, пакетная отправка кадра одним буфером и отрисовка
+с сохранением состояния между кадрами (MapRenderer).
+
+Кадры — последовательные тики локального симулятора, поэтому объекты
+движутся, а монеты собираются и появляются, как в игре. Кадры
+отправляются в локальный приемник из mock_viewer.py; для каждого
+способа печатается время отрисовки, число чтений приемника и объем
+кадра в байтах.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_render.py
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logger import log  # noqa: E402
+from map_render import MapRenderer, get_map  # noqa: E402
+from mock_viewer import make_viewer  # noqa: E402
+from motion_control import control_transports  # noqa: E402
+from rewind_client import RewindClient  # noqa: E402
+from simulator import Simulator  # noqa: E402
+from synthetic import load_mock, scale_response  # noqa: E402
+
+FRAMES = 50
+
+
+def simulate(response):
+    """
+    Возвращает FRAMES последовательных состояний мира и команд.
+    """
+    simulator = Simulator(response)
+    world = simulator.world()
+    frames = []
+    for _ in range(FRAMES):
+        commands = control_transports(world)
+        frames.append((world, commands))
+        world = simulator.fetch(commands)
+    return frames
+
+
+def measure(viewer, frames, batch, retained=False):
+    """
+    Возвращает среднее время отрисовки кадра в миллисекундах,
+    число чтений приемника и число байтов на кадр.
+    """
+    host, port = viewer.server_address
+    client = RewindClient(host, port, batch=batch)
+    renderer = MapRenderer(client)
+    received = viewer.frames
+    recv_calls = viewer.recv_calls
+    bytes_received = viewer.bytes_received
+    start = time.perf_counter()
+    for world, commands in frames:
+        log(world, client)
+        if retained:
+            renderer.draw(world, commands)
+        else:
+            get_map(client, world)
+    elapsed = time.perf_counter() - start
+    viewer.wait_frames(received + len(frames))
+    client.close()
+    return (
+        elapsed / len(frames) * 1000,
+        (viewer.recv_calls - recv_calls) / len(frames),
+        (viewer.bytes_received - bytes_received) / len(frames)
+        )
+
+
+def main():
+    viewer = make_viewer()
+    threading.Thread(target=viewer.serve_forever, daemon=True).start()
+    mock = load_mock()
+    for name, response in (('mock.json', mock),
+                           ('x10', scale_response(mock, 10))):
+        frames = simulate(response)
+        print(f'{name}: {len(frames[0][0].bounties)} bounties, '
+              f'{FRAMES} ticks')
+        for label, batch, retained in (('per-primitive', False, False),
+                                       ('batched', True, False),
+                                       ('retained', True, True)):
+            ms, reads, size = measure(viewer, frames, batch, retained)
+            print(f'  {label:<14} {ms:8.3f} ms/frame, '
+                  f'{reads:8.1f} reads/frame, {size / 1024:8.1f} KiB/frame')
+    viewer.shutdown()
+
+
+if __name__ == '__main__':
+    main()
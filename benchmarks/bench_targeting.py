@@ -0,0 +1,128 @@
+"""
+Сравнение выбора точек атаки: прежний choose_attack и AttackOptimizer.
+
+Враги из mock.json размножаются и разбрасываются либо по всей карте
+(число врагов в радиусе атаки почти не растет), либо вокруг
+транспортов (растет вместе с общим числом). Для каждого
+размера ответа считается время выбора точек на тик и результат залпа
+всех транспортов: взрывы применяются к позициям врагов через тик, как
+в прицеливании, и суммируются награда за уничтоженных и урон.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_targeting.py
+"""
+import itertools
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from decoder import decode_world  # noqa: E402
+from motion_control import choose_attack  # noqa: E402
+from spatial_index import WorldIndex  # noqa: E402
+from synthetic import load_mock  # noqa: E402
+from targeting import LEAD_SECONDS, AttackOptimizer  # noqa: E402
+
+FACTORS = (1, 10, 100, 1000)
+# Разброс врагов вокруг транспортов
+SPREAD = 300
+NUMBER = 20
+
+
+def crowd(response, factor, around, seed=0):
+    """
+    Ответ, в котором враги размножены factor раз по карте
+    или вокруг транспортов (around).
+    """
+    rng = random.Random(seed)
+    transports = response['transports']
+    width = response['mapSize']['x']
+    height = response['mapSize']['y']
+    enemies = []
+    for _ in range(factor):
+        for enemy in response['enemies']:
+            clone = dict(enemy)
+            if around:
+                anchor = rng.choice(transports)
+                clone['x'] = anchor['x'] + rng.randint(-SPREAD, SPREAD)
+                clone['y'] = anchor['y'] + rng.randint(-SPREAD, SPREAD)
+            else:
+                clone['x'] = rng.randint(0, width)
+                clone['y'] = rng.randint(0, height)
+            clone['health'] = rng.choice((30, 60, 100))
+            enemies.append(clone)
+    scaled = dict(response)
+    scaled['enemies'] = enemies
+    for transport in scaled['transports']:
+        transport['attackCooldownMs'] = 0
+    return scaled
+
+
+def volley(world, attacks):
+    """
+    Применяет залп к врагам через тик.
+
+    Возвращает:
+    tuple: Награда за уничтоженных врагов и суммарный урон.
+    """
+    enemies = world.enemies
+    x = enemies.x + enemies.vx * LEAD_SECONDS
+    y = enemies.y + enemies.vy * LEAD_SECONDS
+    health = enemies.health.astype(float).copy()
+    alive = enemies.alive & (enemies.shield_left_ms <= LEAD_SECONDS * 1000)
+    damage = 0.0
+    for attack in attacks:
+        hit = alive & (health > 0) & (
+            np.hypot(x - attack['x'], y - attack['y'])
+            <= world.attack_explosion_radius
+            )
+        damage += float(np.minimum(health[hit], world.attack_damage).sum())
+        health[hit] -= world.attack_damage
+    killed = enemies.alive & (health <= 0)
+    return float(enemies.kill_bounty[killed].sum()), damage
+
+
+def main():
+    response = load_mock()
+    for around, factor in itertools.product((False, True), FACTORS):
+        if factor == FACTORS[0]:
+            print('Вокруг транспортов:' if around else 'По всей карте:')
+        world = decode_world(
+            json.dumps(crowd(response, factor, around)).encode()
+            )
+        index = WorldIndex(world)
+        optimizer = AttackOptimizer()
+
+        start = time.perf_counter()
+        for _ in range(NUMBER):
+            old = [
+                choose_attack(world, transport, index)
+                for transport in world.transports
+                ]
+        old_ms = (time.perf_counter() - start) / NUMBER * 1000
+        start = time.perf_counter()
+        for _ in range(NUMBER):
+            new = optimizer.plan(world)
+        new_ms = (time.perf_counter() - start) / NUMBER * 1000
+
+        old_bounty, old_damage = volley(
+            world, [attack for attack in old if attack is not None]
+            )
+        new_bounty, new_damage = volley(world, list(new.values()))
+        print(
+            f'  врагов {len(world.enemies):>5}: '
+            f'choose_attack {old_ms:6.2f} мс, награда {old_bounty:5g}, '
+            f'урон {old_damage:5g} | '
+            f'AttackOptimizer {new_ms:6.2f} мс, награда {new_bounty:5g}, '
+            f'урон {new_damage:5g}, '
+            f'по нескольким целям {optimizer.multi_hits // NUMBER}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+import json
+import os
+import random
+
+MOCK_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'mock.json'
+    )
+
+
+def load_mock():
+    """
+    Загружает ответ сервера из mock.json.
+
+    Возвращает:
+    dict: Разобранный ответ.
+    """
+    with open(MOCK_PATH, 'r') as file:
+        return json.load(file)
+
+
+def scale_response(response, factor, scale_transports=False, seed=0):
+    """
+    Создает синтетический ответ сервера, увеличенный в factor раз.
+
+    Монеты, враги и аномалии копируются factor раз, копии
+    разбрасываются по карте случайным образом (с фиксированным seed),
+    исходные объекты остаются на своих местах. При scale_transports
+    так же размножаются транспорты, каждому выдается новый id.
+
+    Параметры:
+    response (dict): Исходный ответ, например из mock.json.
+    factor (int): Коэффициент увеличения.
+    scale_transports (bool): Размножать ли собственные транспорты.
+    seed (int): Начальное значение генератора случайных чисел.
+
+    Возвращает:
+    dict: Новый ответ того же формата.
+    """
+    rng = random.Random(seed)
+    width = response['mapSize']['x']
+    height = response['mapSize']['y']
+
+    def spread(items, new_id=False):
+        result = [json.loads(json.dumps(item)) for item in items]
+        for _ in range(factor - 1):
+            for item in items:
+                clone = json.loads(json.dumps(item))
+                clone['x'] = rng.randint(0, width)
+                clone['y'] = rng.randint(0, height)
+                if new_id:
+                    clone['id'] = f'{rng.getrandbits(160):040x}'
+                result.append(clone)
+        return result
+
+    scaled = dict(response)
+    scaled['bounties'] = spread(response['bounties'])
+    scaled['enemies'] = spread(response['enemies'])
+    scaled['anomalies'] = spread(response['anomalies'], new_id=True)
+    if scale_transports:
+        scaled['transports'] = spread(response['transports'], new_id=True)
+    return scaled
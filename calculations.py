@@ -1,5 +1,140 @@
+"""
+Геометрия на плоскости.
+
+Ядро работает с координатами, переданными числами, и возвращает
+кортежи, а пакетные варианты (с окончанием _many) обрабатывают сразу
+N векторов, заданных массивами NumPy: косинус угла и ограничение
+длины. Сумма, разность и смена знака векторов в массивах — обычные
+поэлементные операции NumPy, отдельных функций для них нет. Углы
+сравниваются с порогами через косинусы (см. cos_threshold), без acos
+и перевода в градусы.
+
+Функции со словарями {'x', 'y'} сохранены для совместимости:
+calculate_angle_between_vectors, normalize_vector и normalize_max_vector
+вызывают ядро, а sum_vector, subtract_vector, vector_from_points
+и create_stop_acceleration складывают координаты сами.
+"""
 import math
 
+import numpy as np
+
+
+def cos_threshold(degrees):
+    """
+    Переводит порог угла в порог косинуса.
+
+    Угол между векторами больше degrees тогда и только тогда, когда
+    косинус угла меньше cos_threshold(degrees).
+
+    Параметры:
+    degrees (float): Порог угла в градусах (0–180).
+
+    Возвращает:
+    float: Косинус порога.
+    """
+    return math.cos(math.radians(degrees))
+
+
+def cos_between(x1, y1, x2, y2):
+    """
+    Косинус угла между векторами (x1, y1) и (x2, y2).
+
+    Возвращает:
+    float: Косинус в диапазоне [-1, 1]; 1, если один из векторов
+    нулевой (угол считается нулевым, как в
+    calculate_angle_between_vectors).
+    """
+    magnitude1 = math.sqrt(x1 ** 2 + y1 ** 2)
+    magnitude2 = math.sqrt(x2 ** 2 + y2 ** 2)
+    if magnitude1 == 0 or magnitude2 == 0:
+        return 1.0
+    cos_angle = (x1 * x2 + y1 * y2) / (magnitude1 * magnitude2)
+    return max(min(cos_angle, 1), -1)
+
+
+def limit_length(x, y, max_length):
+    """
+    Укорачивает вектор до max_length, если он длиннее.
+
+    Возвращает:
+    tuple: Координаты (x, y); нулевой вектор — (0, 0).
+    """
+    length = math.sqrt(x ** 2 + y ** 2)
+    if length > 0:
+        scaling_factor = min(max_length / length, 1)
+        return x * scaling_factor, y * scaling_factor
+    return 0, 0
+
+
+def clamp_length(x, y, max_length):
+    """
+    Как limit_length, но вектор не длиннее max_length (в том числе
+    нулевой) возвращается без изменений.
+
+    Возвращает:
+    tuple: Координаты (x, y).
+    """
+    length = math.sqrt(x ** 2 + y ** 2)
+    if length > max_length:
+        scaling_factor = max_length / length
+        return x * scaling_factor, y * scaling_factor
+    return x, y
+
+
+def cos_between_many(x1, y1, x2, y2):
+    """
+    Пакетный cos_between для N пар векторов.
+
+    Параметры:
+    x1, y1, x2, y2 (ndarray): Координаты векторов (совместимых форм).
+
+    Возвращает:
+    ndarray: Косинусы углов; 1 там, где один из векторов нулевой.
+    """
+    magnitude = np.sqrt(x1 * x1 + y1 * y1) * np.sqrt(x2 * x2 + y2 * y2)
+    dot = x1 * x2 + y1 * y2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cos_angle = np.where(magnitude > 0, dot / magnitude, 1.0)
+    return np.clip(cos_angle, -1.0, 1.0)
+
+
+def limit_length_many(x, y, max_length):
+    """
+    Пакетный limit_length для N векторов.
+
+    Параметры:
+    x, y (ndarray): Координаты векторов.
+    max_length (float or ndarray): Максимальная длина.
+
+    Возвращает:
+    tuple: Массивы координат (x, y).
+    """
+    length = np.sqrt(x * x + y * y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scaling_factor = np.where(
+            length > 0, np.minimum(max_length / length, 1), 0.0
+            )
+    return x * scaling_factor, y * scaling_factor
+
+
+def clamp_length_many(x, y, max_length):
+    """
+    Пакетный clamp_length для N векторов.
+
+    Параметры:
+    x, y (ndarray): Координаты векторов.
+    max_length (float or ndarray): Максимальная длина.
+
+    Возвращает:
+    tuple: Массивы координат (x, y).
+    """
+    length = np.sqrt(x * x + y * y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scaling_factor = np.where(
+            length > max_length, max_length / length, 1.0
+            )
+    return x * scaling_factor, y * scaling_factor
+
 
 def sum_vector(vector1, vector2):
     """
@@ -77,16 +212,8 @@ def calculate_angle_between_vectors(v1, v2):
     Возвращает:
     float: Угол между векторами в градусах.
     """
-    dot_product = v1['x'] * v2['x'] + v1['y'] * v2['y']
-    magnitude_v1 = math.sqrt(v1['x'] ** 2 + v1['y'] ** 2)
-    magnitude_v2 = math.sqrt(v2['x'] ** 2 + v2['y'] ** 2)
-
-    if magnitude_v1 == 0 or magnitude_v2 == 0:
-        return math.degrees(0)
-    cos_angle = dot_product / (magnitude_v1 * magnitude_v2)
-    cos_angle = max(min(cos_angle, 1), -1)
-    angle = math.acos(cos_angle)
-    return math.degrees(angle)
+    cos_angle = cos_between(v1['x'], v1['y'], v2['x'], v2['y'])
+    return math.degrees(math.acos(cos_angle))
 
 
 def normalize_vector(vector, max_length):
@@ -100,14 +227,8 @@ def normalize_vector(vector, max_length):
     Возвращает:
     dict: Нормализованный вектор.
     """
-    length = math.sqrt(vector['x'] ** 2 + vector['y'] ** 2)
-    if length > 0:
-        scaling_factor = min(max_length / length, 1)
-        return {
-            'x': vector['x'] * scaling_factor,
-            'y': vector['y'] * scaling_factor
-        }
-    return {'x': 0, 'y': 0}
+    x, y = limit_length(vector['x'], vector['y'], max_length)
+    return {'x': x, 'y': y}
 
 
 def normalize_max_vector(vector, max_length):
@@ -122,14 +243,8 @@ def normalize_max_vector(vector, max_length):
     dict: Либо нормализованный вектор, либо исходный,
     если его длина меньше или равна max_length.
     """
-    length = math.sqrt(vector['x'] ** 2 + vector['y'] ** 2)
-    if length > max_length:
-        scaling_factor = max_length / length
-        return {
-            'x': vector['x'] * scaling_factor,
-            'y': vector['y'] * scaling_factor
-        }
-    return vector
+    x, y = clamp_length(vector['x'], vector['y'], max_length)
+    return {'x': x, 'y': y}
 
 
 def create_stop_acceleration(velocity):
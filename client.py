@@ -1,139 +1,84 @@
-import json
+import functools
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-import _socket
 import requests
 from dotenv import load_dotenv
 
-from logger import log
-from map_render import draw_transport_actions, get_map
+from decoder import decode_world
+from http_session import GameSession
 from motion_control import control_transports
+from orchestrator import RoundOrchestrator
+from prediction import SpeculativeController
+from profiler import TickProfiler
+from render_backend import make_backend
+from spatial_index import WorldIndex
+from tick_clock import TickClock
 
 load_dotenv()
 api_token = os.getenv('API_TOKEN')
 
 
-class RewindClient():
-    RED = 0xff0000
-    GREEN = 0x00ff00
-    BLUE = 0x0000ff
-    PURPLE = 0xf000e9
-    YELLOW = 0xfff222
-    DARK_RED = 0x770000
-    DARK_GREEN = 0x007700
-    DARK_BLUE = 0x000077
-    DARK_PURPLE = 0x71006d
-    DARK_YELLOW = 0xA39B23
-    TRANSPARENT = 0x7f000000
-    INVISIBLE = 0x01000000
-
-    def __init__(self, host=None, port=None):
-        self._socket = _socket.socket()
-        self._socket.setsockopt(_socket.IPPROTO_TCP, _socket.TCP_NODELAY, True)
-        if host is None:
-            host = "127.0.0.1"
-            port = 9111
-        self._socket.connect((host, port))
-
-    @staticmethod
-    def _to_geojson(points):
-        flat = []
-        for p in points:
-            flat.append(p[0])
-            flat.append(p[1])
-        return flat
-
-    def _send(self, obj):
-        if self._socket:
-            self._socket.sendall(json.dumps(obj).encode('utf-8'))
-
-    def line(self, x1, y1, x2, y2, color):
-        self._send({
-            'type': 'polyline',
-            'points': [x1, y1, x2, y2],
-            'color': color
-        })
-
-    def polyline(self, points, color):
-        self._send({
-            'type': 'polyline',
-            'points': RewindClient._to_geojson(points),
-            'color': color
-        })
-
-    def circle(self, x, y, radius, color, fill=False):
-        self._send({
-            'type': 'circle',
-            'p': [x, y],
-            'r': radius,
-            'color': color,
-            'fill': fill
-        })
-
-    def rectangle(self, x1, y1, x2, y2, color, fill=False):
-        self._send({
-            'type': 'rectangle',
-            'tl': [x1, y1],
-            'br': [x2, y2],
-            'color': color,
-            'fill': fill
-        })
-
-    def triangle(self, p1, p2, p3, color, fill=False):
-        self._send({
-            'type': 'triangle',
-            'points': RewindClient._to_geojson([p1, p2, p3]),
-            'color': color,
-            'fill': fill
-        })
-
-    def circle_popup(self, x, y, radius, message):
-        self._send({
-            'type': 'popup',
-            'p': [x, y],
-            'r': radius,
-            'text': message
-        })
-
-    def rect_popup(self, tl, br, message):
-        self._send({
-            'type': 'popup',
-            'tl': RewindClient._to_geojson([tl]),
-            'br': RewindClient._to_geojson([br]),
-            'text': message
-        })
-
-    def message(self, msg):
-        self._send({
-            'type': 'message',
-            'message': msg
-        })
-
-    def set_options(self, layer=None, permanent=None):
-        data = {'type': 'options'}
-        if layer is not None:
-            data['layer'] = layer
-        if permanent is not None:
-            data['permanent'] = permanent
-        self._send(data)
-
-    def end_frame(self):
-        self._send({'type': 'end'})
-
-
-# Создание экземпляра клиента
-client = RewindClient()
+# Вывод кадров: 'socket' — Rewind Viewer (подключение при первом кадре,
+# переподключение в фоне), 'file' — запись потока кадров в файл,
+# 'null' — без отрисовки; задается RENDER_BACKEND в .env
+RENDER_BACKEND = os.getenv('RENDER_BACKEND', 'socket')
+backend = make_backend(RENDER_BACKEND)
+# Телеметрия тиков пишется в файл в цикле управления, в Rewind Viewer
+# уходит только сводка; файл открывается при запуске main
+TELEMETRY_PATH = 'telemetry.tlm'
+telemetry = None
 
 USE_TEST_SERVER = False
-
-if USE_TEST_SERVER:
+# Расчет команд следующего тика параллельно с запросом к серверу
+USE_PIPELINE = False
+# Локальная замена сервера из mock_server.py
+USE_MOCK_SERVER = False
+# Локальный симулятор игры из simulator.py вместо запросов к серверу
+USE_SIMULATOR = False
+# Расчет команд в пуле процессов из parallel_control.py
+USE_PARALLEL_CONTROL = False
+# Ускорения от планировщика с прогоном вариантов (planner.py)
+# с закреплением целей между тиками
+USE_PLANNER = False
+# Совместное распределение монет между транспортами (assignment.py);
+# с USE_PARALLEL_CONTROL и USE_PLANNER не используется
+USE_BOUNTY_ASSIGNER = False
+# Учет карты угроз от врагов (threat_map.py) при выборе целей и щита;
+# с USE_PARALLEL_CONTROL учитывается только при решении о щите
+USE_THREAT_MAP = False
+# Точки атаки с учетом радиуса взрыва (targeting.py); с любым способом
+# расчета команд заменяет атаки в готовых командах
+USE_ATTACK_OPTIMIZER = False
+# Ожидание начала раунда по расписанию с прогревом (orchestrator.py);
+# с USE_SIMULATOR не используется
+WAIT_FOR_ROUND = True
+
+if USE_MOCK_SERVER:
+    URL_ROUND = 'http://127.0.0.1:8000/rounds/magcarp'
+    URL_MOVE = 'http://127.0.0.1:8000/play/magcarp/player/move'
+elif USE_TEST_SERVER:
     URL_ROUND = 'https://games-test.datsteam.dev/rounds/magcarp'
     URL_MOVE = 'https://games-test.datsteam.dev/play/magcarp/player/move'
 else:
     URL_ROUND = 'https://games.datsteam.dev/rounds/magcarp'
     URL_MOVE = 'https://games.datsteam.dev/play/magcarp/player/move'
 
+# Гистограммы длительности стадий тика; PROFILE_SAMPLE_TICKS в .env
+# включает семплирующий профилировщик на указанное число тиков
+profiler = TickProfiler()
+PROFILE_SAMPLE_TICKS = int(os.getenv('PROFILE_SAMPLE_TICKS', 0))
+
+# Пул keep-alive соединений с таймаутами для запросов к серверу
+session = GameSession(api_token)
+
+# Запись ответов сервера и отправленных команд для воспроизведения
+# (python recorder.py session-...); включается RECORD_SESSION=1 в .env,
+# файлы сессии создаются при запуске main
+RECORD_SESSION = bool(int(os.getenv('RECORD_SESSION', 0)))
+recorder = None
+
 
 def fetch_rounds():
     """
@@ -147,7 +92,7 @@ def fetch_rounds():
     dict: Данные раундов в формате JSON или None в случае ошибки.
     """
     try:
-        response = requests.get(URL_ROUND, headers={'X-Auth-Token': api_token})
+        response = session.get(URL_ROUND)
         response.raise_for_status()
         return response.json()
     except requests.RequestException as e:
@@ -162,27 +107,39 @@ def fetch_map_data(transports):
 
     Отправляет POST-запрос на API для обновления данных о
     транспортах на основе их текущих действий.
-    В случае успешного запроса возвращает обновленные данные карты в
-    формате JSON, при возникновении HTTP-ошибки печатает сообщение и
-    тело ответа, и возвращает None.
+    В случае успешного запроса возвращает обновленное состояние мира,
+    при возникновении HTTP-ошибки печатает сообщение и
+    тело ответа, и возвращает None. При превышении таймаута, обрыве
+    соединения или другой ошибке запроса также возвращает None.
 
     Параметры:
     transports (list): Список данных о транспортах.
 
     Возвращает:
-    dict: Обновленные данные карты в формате JSON или None в случае ошибки.
+    World: Обновленное состояние мира или None в случае ошибки.
     """
     try:
         data = {'transports': transports}
-        response = requests.post(
-            URL_MOVE, json=data, headers={'X-Auth-Token': api_token}
-            )
+        with profiler.stage('network'):
+            response = session.post(URL_MOVE, data)
         response.raise_for_status()
-        return response.json()
+        if recorder is not None:
+            with profiler.stage('record'):
+                recorder.record(response.content, transports)
+        with profiler.stage('decode'):
+            return decode_world(response.content)
     except requests.HTTPError as e:
         print(f"HTTP ошибка: {e}")
         print(f"Тело ответа сервера: {response.text}")
         return None
+    except (requests.Timeout, requests.ConnectionError) as e:
+        print(f"Сервер не ответил вовремя: {e}")
+        return None
+    except requests.RequestException as e:
+        # Прочие ошибки запроса (ответ оборван, перенаправления и т. п.)
+        # пропускают тик, но не останавливают цикл
+        print(f"Ошибка запроса хода: {e}")
+        return None
 
 
 def fetch_map_data_mock(transports):
@@ -196,11 +153,211 @@ def fetch_map_data_mock(transports):
     transports (list): Список данных о транспортах.
 
     Возвращает:
-    dict: Данные карты, загруженные из mock.json.
+    World: Состояние мира, загруженное из mock.json.
+    """
+    with open('./mock.json', 'rb') as file:
+        return decode_world(file.read())
+
+
+# Карта угроз, выбор точек атаки и исходная функция расчета команд
+# для USE_THREAT_MAP и USE_ATTACK_OPTIMIZER
+threat_map = None
+attacker = None
+plan_commands = control_transports
+
+
+if USE_SIMULATOR:
+    from simulator import Simulator
+
+    # Команды применяются к локальной модели игры
+    simulator = Simulator.from_mock()
+    fetch_map_data = simulator.fetch
+
+
+def render_tick(world, transports):
+    """
+    Логирует и отрисовывает состояние мира и команды транспортов.
+
+    Параметры:
+    world (World): Текущее состояние мира.
+    transports (list): Команды транспортов для отображения действий.
+    """
+    with profiler.stage('log'):
+        backend.message(telemetry.summary(world))
+
+    # Отображение карты и действий транспортов; рамка остается
+    # на постоянном слое, неизменившиеся объекты не кодируются заново
+    with profiler.stage('render'):
+        backend.draw(world, transports)
+
+
+def control_with_options(world, index):
+    """
+    Рассчитывает команды с учетом карты угроз и выбором точек атаки.
+
+    Карта угроз создается по размерам карты первого ответа и дальше
+    обновляется инкрементально; атаки в готовых командах заменяются
+    выбранными AttackOptimizer.
+
+    Параметры:
+    world (World): Текущее состояние мира.
+    index (WorldIndex): Пространственный индекс этого состояния.
+
+    Возвращает:
+    list: Команды в порядке world.transports.
+    """
+    global threat_map
+    if USE_THREAT_MAP:
+        if threat_map is None:
+            from threat_map import ThreatMap
+
+            threat_map = ThreatMap(world.map_width, world.map_height)
+        threat_map.update(world)
+    commands = plan_commands(world, index, threat=threat_map)
+    if attacker is not None:
+        attacker.apply(world, commands)
+    return commands
+
+
+def warm_up():
+    """
+    Прогревает клиент перед первым ходом раунда.
+
+    Запрос расписания открывает соединение (и TLS-сессию) с хостом
+    сервера в пуле сессии; ответ из mock.json проходит через декодер,
+    построение индекса и расчет команд выбранным способом, поэтому
+    импорты, первые выделения памяти и процессы пула готовы до начала
+    раунда. Карта угроз после прогрева сбрасывается: размеры карты
+    раунда могут отличаться от mock.json.
     """
-    with open('./mock.json', 'r') as file:
-        map_data = json.load(file)
-        return map_data
+    global threat_map
+    fetch_rounds()
+    world = fetch_map_data_mock([])
+    control_transports(world, WorldIndex(world))
+    threat_map = None
+
+
+# Отрисовка и логирование в отдельном потоке с пропуском устаревших
+# кадров; создается в main, только если вывод кадров включен
+renderer = None
+
+
+def _dropped_frames():
+    """Число пропущенных кадров (0 без отрисовки)."""
+    return renderer.dropped if renderer is not None else 0
+
+
+def run_serial():
+    """
+    Последовательный цикл: запрос, расчет команд, отрисовка, пауза.
+
+    Пауза рассчитывается часами тиков так, чтобы следующий запрос
+    пришел на сервер сразу после границы тика.
+    """
+    clock = TickClock()
+    transports = []
+    tick = 0
+    while True:
+        start = time.time()
+        sent = time.monotonic()
+        world = fetch_map_data(transports)
+        if world is None:
+            # Повтор последних команд на следующей итерации
+            time.sleep(0.1)
+            continue
+        clock.observe(sent, time.monotonic(), world)
+
+        with profiler.stage('index'):
+            index = WorldIndex(world)
+        with profiler.stage('control'):
+            transports = control_transports(world, index)
+        # Телеметрия пишется здесь, а не в потоке отрисовки, который
+        # пропускает кадры
+        with profiler.stage('telemetry'):
+            telemetry.record(world)
+        if renderer is not None:
+            with profiler.stage('handoff'):
+                renderer.submit(world, transports)
+
+        tick += 1
+        with profiler.stage('sleep'):
+            clock.wait(session.last_latency or 0)
+        profiler.tick()
+        end = time.time()
+        print(
+            f'tick time: {end - start}, period: {clock.period:.3f}, '
+            f'phase error: {clock.phase_error}, '
+            f'dropped frames: {_dropped_frames()}'
+            )
+
+
+def run_pipelined():
+    """
+    Конвейерный цикл: расчет команд идет параллельно с запросом.
+
+    Пока запрос move с командами находится в пути, состояние
+    экстраполируется на тик вперед и по нему заранее рассчитываются
+    ускорения; логирование и отрисовка идут в своем потоке. После
+    получения ответа прогноз только проверяется и при необходимости
+    исправляется. Запросы отправляются по часам тиков, как
+    в последовательном цикле, а прогноз идет на измеренный период.
+    Прогноз и проверка идут тем способом расчета команд, который
+    выбран в main (планировщик, пул процессов, карта угроз и т. д.).
+    """
+    speculative = SpeculativeController(control_transports)
+    clock = TickClock()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        transports = []
+        world = None
+        while world is None:
+            world = fetch_map_data(transports)
+            if world is None:
+                time.sleep(0.1)
+        index = WorldIndex(world)
+        transports = control_transports(world, index)
+        telemetry.record(world)
+        tick = 0
+        while True:
+            start = time.time()
+            # Запрос уходит к границе тика, как в последовательном цикле:
+            # раньше сервер вернул бы то же состояние
+            with profiler.stage('sleep'):
+                clock.wait(session.last_latency or 0)
+            sent = time.monotonic()
+            request = executor.submit(fetch_map_data, transports)
+
+            # Работа, перекрывающаяся с сетевым запросом; ответ придет
+            # через тик, длительность которого измеряют часы
+            if renderer is not None:
+                with profiler.stage('handoff'):
+                    renderer.submit(world, transports)
+            with profiler.stage('speculate'):
+                speculative.speculate(world, transports, dt=clock.period)
+
+            with profiler.stage('wait'):
+                next_world = request.result()
+            received = time.time()
+            if next_world is None:
+                # Повтор последних команд на следующей итерации
+                continue
+
+            clock.observe(sent, time.monotonic(), next_world)
+            world = next_world
+            with profiler.stage('index'):
+                index = WorldIndex(world)
+            with profiler.stage('resolve'):
+                transports = speculative.resolve(world, index)
+            with profiler.stage('telemetry'):
+                telemetry.record(world)
+
+            tick += 1
+            profiler.tick()
+            print(
+                f'tick time: {time.time() - start}, '
+                f'response to command: {time.time() - received}, '
+                f'phase error: {clock.phase_error}, '
+                f'dropped frames: {_dropped_frames()}'
+                )
 
 
 def main():
@@ -212,7 +369,8 @@ def main():
     Цикл продолжается до тех пор, пока не будет
     прерван пользователем (KeyboardInterrupt).
     Каждую итерацию программа рассчитывает действия транспортов,
-    обновляет данные карты и выводит их.
+    обновляет данные карты и выводит их. При USE_PIPELINE расчет
+    команд и отрисовка выполняются, пока запрос находится в пути.
     Прерывается с обработкой ошибок и закрытием сокета клиента.
 
     Исключения:
@@ -220,41 +378,84 @@ def main():
     Exception: Обрабатывает все остальные исключения,
     печатает сообщение об ошибке.
     """
-    transports = []
-    tick = 0
+    global control_transports, plan_commands, attacker, recorder
+    global telemetry, renderer
+    from logger import Telemetry
+
+    telemetry = Telemetry(TELEMETRY_PATH)
+    if RECORD_SESSION:
+        from recorder import Recorder
+
+        recorder = Recorder(time.strftime('session-%Y%m%d-%H%M%S'))
+    parallel = None
+    if USE_PARALLEL_CONTROL:
+        # Пул запускается здесь, а не при импорте модуля: процессы,
+        # создаваемые через spawn, импортируют client.py заново
+        from parallel_control import ParallelController
+
+        parallel = ParallelController()
+        control_transports = parallel.control
+    elif USE_PLANNER:
+        from planner import RolloutPlanner
+        from target_cache import TargetCache
+
+        control_transports = RolloutPlanner(cache=TargetCache()).control
+    elif USE_BOUNTY_ASSIGNER:
+        from assignment import BountyAssigner
+
+        control_transports = functools.partial(
+            control_transports, assigner=BountyAssigner()
+            )
+    if USE_THREAT_MAP or USE_ATTACK_OPTIMIZER:
+        if USE_ATTACK_OPTIMIZER:
+            from targeting import AttackOptimizer
+
+            attacker = AttackOptimizer()
+        plan_commands = control_transports
+        control_transports = control_with_options
+    if backend.enabled:
+        # Без вывода кадров поток отрисовки не создается, и кадры
+        # из цикла управления не передаются вовсе
+        from render_worker import RenderWorker
+
+        renderer = RenderWorker(render_tick)
+        renderer.start()
+    if PROFILE_SAMPLE_TICKS:
+        profiler.start_sampling(PROFILE_SAMPLE_TICKS)
     try:
-        while True:
-            start = time.time()
-            response = fetch_map_data(transports)
-
-            log(response, client)
-
-            # Установка постоянных опций для клиента
-            client.set_options(permanent=True)
-            client.rectangle(
-                0, 0, response["mapSize"]["x"], response["mapSize"]["y"],
-                client.GREEN
+        if WAIT_FOR_ROUND and not USE_SIMULATOR:
+            orchestrator = RoundOrchestrator(fetch_rounds, warm_up)
+            round_info = orchestrator.wait()
+            print(
+                f'Раунд {round_info.get("name")}: прогрев '
+                f'{orchestrator.warmup_seconds:.3f} с, запуск с опозданием '
+                f'{orchestrator.late * 1000:.1f} мс'
                 )
-            client.set_options(permanent=False)
-
-            # Получение и отображение карты
-            get_map(client, response)
-            transports = control_transports(response)
-
-            # Отрисовка действий транспорта
-            draw_transport_actions(client, response, transports)
-
-            tick += 1
-            time.sleep(0.1)
-            end = time.time()
-            print(f'tick time: {end - start}')
+        if USE_PIPELINE:
+            run_pipelined()
+        else:
+            run_serial()
     except KeyboardInterrupt:
         print("Клиент остановлен пользователем.")
     except Exception as e:
         print(f"Произошла ошибка: {e}")
     finally:
-        # Закрытие сокета клиента
-        client._socket.close()
+        # Остановка отрисовки, закрытие вывода кадров и соединений
+        if renderer is not None:
+            renderer.stop()
+            print(f'Отрисовка: {renderer.stats()}, '
+                  f'вывод: {backend.stats()}')
+        profiler.stop_sampling()
+        print(profiler.report())
+        if parallel is not None:
+            print(f'Пул: тиков {parallel.ticks}, '
+                  f'резервных команд {parallel.fallbacks}')
+            parallel.close()
+        telemetry.close()
+        if recorder is not None:
+            recorder.close()
+        backend.close()
+        session.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,46 @@
+import json
+
+from world import World
+
+try:
+    import orjson
+except ImportError:
+    # Резервный путь на стандартной библиотеке
+    orjson = None
+
+
+def loads(raw):
+    """
+    Разбирает JSON из байтов ответа сервера.
+
+    Если установлен orjson, используется он, иначе стандартный
+    модуль json.
+
+    Параметры:
+    raw (bytes): Тело ответа.
+
+    Возвращает:
+    dict: Разобранный документ.
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def decode_world(raw):
+    """
+    Декодирует тело ответа эндпоинта move сразу в состояние мира.
+
+    Документ целиком разбирается в словари (orjson, если установлен,
+    иначе стандартный json — тогда это прежний путь json.loads
+    и World.from_response); из него в столбцы NumPy переносятся только
+    поля, перечисленные в схемах World (FIELDS у Bounties, Enemies
+    и Anomalies). Выигрыш по времени дает только orjson.
+
+    Параметры:
+    raw (bytes): Тело ответа.
+
+    Возвращает:
+    World: Состояние мира для текущего тика.
+    """
+    return World.from_response(loads(raw))
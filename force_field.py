@@ -0,0 +1,249 @@
+import numpy as np
+
+# Коэффициент модели поля: ускорение от аномалии равно
+# FIELD_SCALE * strength / d (подобран по anomalyAcceleration
+# транспортов в ответе сервера, см. benchmarks/bench_field.py)
+FIELD_SCALE = 1.17
+# Шаг сетки поля в единицах карты
+FIELD_CELL = 50.0
+# Сколько точек обрабатывается за один проход (ограничивает память
+# под матрицу точки × аномалии)
+CHUNK_POINTS = 4096
+# Через сколько инкрементальных обновлений сетка пересчитывается целиком,
+# чтобы не копилась ошибка округления
+REBUILD_EVERY = 64
+
+
+def field_at(anomalies, x, y):
+    """
+    Суммарное ускорение от всех аномалий в заданных точках.
+
+    Аномалия действует в пределах effectiveRadius с ускорением
+    FIELD_SCALE * strength / d: к центру при strength > 0 и от центра
+    при strength < 0; внутри ядра расстояние считается равным radius.
+
+    Параметры:
+    anomalies (Anomalies): Столбцы аномалий.
+    x, y (ndarray): Координаты точек.
+
+    Возвращает:
+    tuple: Компоненты ускорения (ax, ay) в точках.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    ax = np.zeros(x.shape)
+    ay = np.zeros(x.shape)
+    if not len(anomalies) or not x.size:
+        return ax, ay
+    flat_x = x.reshape(-1)
+    flat_y = y.reshape(-1)
+    flat_ax = ax.reshape(-1)
+    flat_ay = ay.reshape(-1)
+    for start in range(0, flat_x.size, CHUNK_POINTS):
+        end = start + CHUNK_POINTS
+        flat_ax[start:end], flat_ay[start:end] = _field(
+            anomalies.x, anomalies.y, anomalies.radius,
+            anomalies.effective_radius, anomalies.strength,
+            flat_x[start:end], flat_y[start:end]
+            )
+    return ax, ay
+
+
+def _field(ox, oy, radius, effective_radius, strength, x, y):
+    """
+    Ускорение в точках (x, y) от аномалий, заданных столбцами.
+    """
+    dx = ox[None, :] - x[:, None]
+    dy = oy[None, :] - y[:, None]
+    scale = _scale(
+        dx, dy, radius[None, :], effective_radius[None, :],
+        strength[None, :]
+        )
+    return (scale * dx).sum(axis=1), (scale * dy).sum(axis=1)
+
+
+def _scale(dx, dy, radius, effective_radius, strength):
+    """
+    Множитель смещения (dx, dy) к центру аномалии, дающий ускорение;
+    аргументы согласованы по форме.
+    """
+    distance = np.hypot(dx, dy)
+    magnitude = np.where(
+        distance <= effective_radius,
+        FIELD_SCALE * strength / np.maximum(distance, radius),
+        0.0
+        )
+    # Деление на расстояние дает единичный вектор к центру аномалии
+    return np.divide(
+        magnitude, distance, out=np.zeros_like(magnitude),
+        where=distance > 0
+        )
+
+
+class FieldGrid:
+    """
+    Поле аномалий, заранее рассчитанное в узлах регулярной сетки.
+
+    update пересчитывает только узлы в пределах effectiveRadius
+    изменившихся аномалий: вклад старого положения вычитается, вклад
+    нового добавляется; неподвижные аномалии не пересчитываются.
+    Если изменилась хотя бы половина аномалий, сетка строится заново.
+    sample возвращает билинейную интерполяцию по узлам — это дешево
+    для любого числа точек, но вблизи ядра аномалии, где поле меняется
+    резко, менее точно, чем field_at.
+
+    Параметры:
+    map_width, map_height (float): Размеры карты.
+    cell (float): Шаг сетки.
+
+    Атрибуты:
+    ax, ay (ndarray): Компоненты поля в узлах, размер (ny + 1, nx + 1).
+    updated (int): Сколько узлов пересчитано последним update.
+    """
+
+    def __init__(self, map_width, map_height, cell=FIELD_CELL):
+        self.cell = cell
+        self.nx = int(np.ceil(map_width / cell))
+        self.ny = int(np.ceil(map_height / cell))
+        self.ax = np.zeros((self.ny + 1, self.nx + 1))
+        self.ay = np.zeros((self.ny + 1, self.nx + 1))
+        self._anomalies = {}
+        self._updates = 0
+        self.updated = 0
+
+    def update(self, anomalies):
+        """
+        Приводит сетку к новому состоянию аномалий.
+
+        Параметры:
+        anomalies (Anomalies): Текущие аномалии (с идентификаторами).
+        """
+        current = {
+            anomaly_id: values for anomaly_id, values in zip(
+                anomalies.ids, zip(
+                    anomalies.x.tolist(), anomalies.y.tolist(),
+                    anomalies.radius.tolist(),
+                    anomalies.effective_radius.tolist(),
+                    anomalies.strength.tolist()
+                    )
+                )
+            }
+        previous = self._anomalies
+        removed = [
+            values for anomaly_id, values in previous.items()
+            if current.get(anomaly_id) != values
+            ]
+        added = [
+            values for anomaly_id, values in current.items()
+            if previous.get(anomaly_id) != values
+            ]
+        self._updates += 1
+        self.updated = 0
+        # Вычитание и добавление стоят двух расчетов на аномалию, поэтому
+        # если изменилась хотя бы половина, дешевле пересчитать все
+        if (self._updates % REBUILD_EVERY == 0
+                or 2 * len(added) >= len(current)):
+            self.ax[:] = 0
+            self.ay[:] = 0
+            for values in current.values():
+                self._apply(values, 1.0)
+        else:
+            for values in removed:
+                self._apply(values, -1.0)
+            for values in added:
+                self._apply(values, 1.0)
+        self._anomalies = current
+
+    def _apply(self, values, sign):
+        """
+        Добавляет (sign = 1) или вычитает (sign = -1) вклад аномалии
+        в узлах, попадающих в ее радиус действия.
+        """
+        x, y, radius, effective_radius, strength = values
+        cell = self.cell
+        col0 = max(int(np.ceil((x - effective_radius) / cell)), 0)
+        col1 = min(int(np.floor((x + effective_radius) / cell)), self.nx)
+        row0 = max(int(np.ceil((y - effective_radius) / cell)), 0)
+        row1 = min(int(np.floor((y + effective_radius) / cell)), self.ny)
+        if col0 > col1 or row0 > row1:
+            return
+        # Смещения от узлов к центру: строки — y, столбцы — x
+        dx = x - np.arange(col0, col1 + 1)[None, :] * cell
+        dy = y - np.arange(row0, row1 + 1)[:, None] * cell
+        scale = sign * _scale(dx, dy, radius, effective_radius, strength)
+        self.ax[row0:row1 + 1, col0:col1 + 1] += scale * dx
+        self.ay[row0:row1 + 1, col0:col1 + 1] += scale * dy
+        self.updated += scale.size
+
+    def sample(self, x, y):
+        """
+        Интерполирует поле в точках.
+
+        Параметры:
+        x, y (ndarray): Координаты точек (вне карты — значения на краю).
+
+        Возвращает:
+        tuple: Компоненты ускорения (ax, ay) в точках.
+        """
+        gx = np.clip(np.asarray(x, dtype=float) / self.cell, 0, self.nx)
+        gy = np.clip(np.asarray(y, dtype=float) / self.cell, 0, self.ny)
+        col = np.minimum(gx.astype(int), self.nx - 1)
+        row = np.minimum(gy.astype(int), self.ny - 1)
+        fx = gx - col
+        fy = gy - row
+        w00 = (1 - fx) * (1 - fy)
+        w01 = fx * (1 - fy)
+        w10 = (1 - fx) * fy
+        w11 = fx * fy
+        result = []
+        for grid in (self.ax, self.ay):
+            result.append(
+                grid[row, col] * w00 + grid[row, col + 1] * w01
+                + grid[row + 1, col] * w10 + grid[row + 1, col + 1] * w11
+                )
+        return tuple(result)
+
+
+def predict_paths(field, x, y, vx, vy, ax, ay, max_speed, steps, dt):
+    """
+    Прогнозирует траектории многих транспортов или вариантов движения
+    одним векторизованным расчетом.
+
+    На каждом шаге к постоянному собственному ускорению добавляется
+    поле аномалий в текущей точке, скорость ограничивается max_speed,
+    положение меняется так же, как в prediction.extrapolate.
+
+    Параметры:
+    field (FieldGrid): Сетка поля аномалий.
+    x, y, vx, vy (ndarray): Начальные положения и скорости, размер (K,).
+    ax, ay (ndarray): Собственные ускорения, размер (K,).
+    max_speed (float): Максимальная скорость.
+    steps (int): Число шагов.
+    dt (float): Длительность шага в секундах.
+
+    Возвращает:
+    tuple: Положения (xs, ys) после каждого шага, размер (steps, K).
+    """
+    x = np.array(x, dtype=float)
+    y = np.array(y, dtype=float)
+    vx = np.array(vx, dtype=float)
+    vy = np.array(vy, dtype=float)
+    xs = np.empty((steps,) + x.shape)
+    ys = np.empty((steps,) + x.shape)
+    for step in range(steps):
+        field_ax, field_ay = field.sample(x, y)
+        total_ax = ax + field_ax
+        total_ay = ay + field_ay
+        x += vx * dt + total_ax * dt * dt / 2
+        y += vy * dt + total_ay * dt * dt / 2
+        vx += total_ax * dt
+        vy += total_ay * dt
+        speed = np.hypot(vx, vy)
+        scale = np.where(
+            speed > max_speed, max_speed / np.maximum(speed, 1e-12), 1.0
+            )
+        vx *= scale
+        vy *= scale
+        xs[step] = x
+        ys[step] = y
+    return xs, ys
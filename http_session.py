@@ -0,0 +1,98 @@
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Предельное время установки соединения и ожидания ответа (секунды)
+CONNECT_TIMEOUT = 1.0
+READ_TIMEOUT = 2.0
+# Число соединений, удерживаемых в пуле для одного хоста
+POOL_SIZE = 2
+# Сколько последних задержек хранится для статистики
+LATENCY_HISTORY = 256
+
+
+class GameSession:
+    """
+    HTTP-сессия для эндпоинтов игры с пулом keep-alive соединений.
+
+    Соединение (и TLS-сессия) с сервером переиспользуется между тиками,
+    заголовок авторизации формируется один раз, а каждый запрос
+    ограничен таймаутами на соединение и чтение, чтобы зависший запрос
+    не останавливал бота. Задержка каждого запроса сохраняется.
+
+    Параметры:
+    token (str): Токен авторизации X-Auth-Token.
+    connect_timeout (float): Таймаут установки соединения в секундах.
+    read_timeout (float): Таймаут ожидания ответа в секундах.
+    """
+
+    def __init__(self, token, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT):
+        self._session = requests.Session()
+        if token:
+            self._session.headers['X-Auth-Token'] = token
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=0
+            )
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+        self.timeout = (connect_timeout, read_timeout)
+        self.latencies = deque(maxlen=LATENCY_HISTORY)
+        self.last_latency = None
+
+    def _request(self, method, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._session.request(
+                method, url, timeout=self.timeout, **kwargs
+                )
+        finally:
+            self.last_latency = time.perf_counter() - start
+            self.latencies.append(self.last_latency)
+
+    def get(self, url):
+        """
+        Выполняет GET-запрос через пул соединений.
+
+        Параметры:
+        url (str): Адрес запроса.
+
+        Возвращает:
+        requests.Response: Ответ сервера.
+        """
+        return self._request('GET', url)
+
+    def post(self, url, payload):
+        """
+        Выполняет POST-запрос с JSON-телом через пул соединений.
+
+        Параметры:
+        url (str): Адрес запроса.
+        payload (dict): Тело запроса.
+
+        Возвращает:
+        requests.Response: Ответ сервера.
+        """
+        return self._request('POST', url, json=payload)
+
+    def latency_stats(self):
+        """
+        Сводка по задержкам последних запросов.
+
+        Возвращает:
+        dict: Количество запросов, средняя и максимальная задержка
+        в секундах, либо пустой словарь, если запросов не было.
+        """
+        if not self.latencies:
+            return {}
+        return {
+            'count': len(self.latencies),
+            'mean': sum(self.latencies) / len(self.latencies),
+            'max': max(self.latencies),
+            }
+
+    def close(self):
+        """Закрывает все соединения пула."""
+        self._session.close()
@@ -1,9 +1,36 @@
-def log(response, client):
+import json
+import struct
+import time
+from operator import attrgetter
+
+import numpy as np
+
+# Число тиков в кольцевом буфере; заполненный буфер дописывается в файл
+# одним блоком
+RING_TICKS = 256
+# Число мест под транспорты в буфере
+MAX_TRANSPORTS = 16
+# Как часто пересчитывается сводка для Rewind Viewer (секунды)
+SUMMARY_SECONDS = 1.0
+# Признак начала блока в файле телеметрии
+BLOCK_MAGIC = b'TLM1'
+
+# Столбцы по тикам и по транспортам
+TICK_COLUMNS = ('tick', 'time', 'points')
+TRANSPORT_COLUMNS = (
+    'x', 'y', 'vx', 'vy', 'self_ax', 'self_ay', 'anomaly_ax', 'anomaly_ay',
+    'health', 'death_count', 'attack_cooldown_ms', 'shield_left_ms',
+    'shield_cooldown_ms'
+    )
+_transport_values = attrgetter(*TRANSPORT_COLUMNS)
+
+
+def log(world, client):
     """
     Логирует информацию о текущем состоянии игры и транспортах.
 
     Параметры:
-    - response (dict): Ответ сервера, содержащий
+    - world (World): Состояние мира, содержащее
     информацию об игровых параметрах и транспортах.
     - client (object): Клиент для вывода сообщений в систему или интерфейс.
 
@@ -35,40 +62,281 @@ def log(response, client):
     Функция выводит информацию в системный лог или
     интерфейс через объект `client`.
     """
-    client.message(f'POINST {response["points"]}')
-    client.message(f'attackCooldownMs {response["attackCooldownMs"]}')
-    client.message(f'attackDamage {response["attackDamage"]}')
+    client.message(f'POINST {world.points}')
+    client.message(f'attackCooldownMs {world.attack_cooldown_ms}')
+    client.message(f'attackDamage {world.attack_damage}')
     client.message(
-        f'attackExplosionRadius {response["attackExplosionRadius"]}'
+        f'attackExplosionRadius {world.attack_explosion_radius}'
         )
-    client.message(f'attackRange {response["attackRange"]}')
-    client.message(f'maxAccel {response["maxAccel"]}')
-    client.message(f'maxSpeed {response["maxSpeed"]}')
+    client.message(f'attackRange {world.attack_range}')
+    client.message(f'maxAccel {world.max_accel}')
+    client.message(f'maxSpeed {world.max_speed}')
 
-    for i, transport in enumerate(response["transports"]):
+    for i, transport in enumerate(world.transports):
         client.message('---------------------------------')
         client.message(f'Transport {i+1}:')
-        client.message(f'ID {transport["id"]}')
-        client.message(f'Status {transport["status"]}')
-        client.message(f'Health {transport["health"]} / 100')
-        client.message(f'Position: (x: {transport["x"]}, y: {transport["y"]})')
+        client.message(f'ID {transport.id}')
+        client.message(f'Status {transport.status}')
+        client.message(f'Health {transport.health} / 100')
+        client.message(f'Position: (x: {transport.x}, y: {transport.y})')
         client.message(
-            f'Velocity: (x: {transport["velocity"]["x"]}, '
-            f'y: {transport["velocity"]["y"]})'
+            f'Velocity: (x: {transport.vx}, y: {transport.vy})'
             )
         client.message(
-            f'Self Acceleration: (x: {transport["selfAcceleration"]["x"]}, '
-            f'y: {transport["selfAcceleration"]["y"]})'
+            f'Self Acceleration: (x: {transport.self_ax}, '
+            f'y: {transport.self_ay})'
             )
         client.message(
             f'Anomaly Acceleration: ( '
-            f'x: {transport["anomalyAcceleration"]["x"]}, '
-            f'y: {transport["anomalyAcceleration"]["y"]})'
+            f'x: {transport.anomaly_ax}, '
+            f'y: {transport.anomaly_ay})'
             )
-        client.message(f'Attack Cooldown: {transport["attackCooldownMs"]} ms')
+        client.message(f'Attack Cooldown: {transport.attack_cooldown_ms} ms')
         client.message(
             f'Shield Cooldown: '
-            f'{transport["shieldLeftMs"]}/{transport["shieldCooldownMs"]} ms'
+            f'{transport.shield_left_ms}/{transport.shield_cooldown_ms} ms'
             )
-        client.message(f'Death Count: {transport["deathCount"]}')
+        client.message(f'Death Count: {transport.death_count}')
         client.message('---------------------------------')
+
+
+class Telemetry:
+    """
+    Структурированная телеметрия вместо построчных сообщений.
+
+    Состояние каждого тика (очки и значения транспортов) записывается
+    в заранее выделенный кольцевой буфер NumPy: по строке на тик
+    и по столбцу на каждое место транспорта. Когда буфер заполняется,
+    он одним блоком дописывается в файл, где каждое поле хранится
+    отдельным непрерывным столбцом; файл читается функцией
+    read_telemetry. Файл дописывается между запусками, поэтому каждый
+    блок помечается началом сессии (session), а счетчик тиков в новой
+    сессии начинается с 0. В Rewind Viewer уходит одно короткое сообщение
+    со сводкой, которая пересчитывается не чаще SUMMARY_SECONDS.
+
+    Параметры:
+    path (str): Путь к файлу телеметрии либо None, чтобы не писать файл.
+    ring_ticks (int): Размер кольцевого буфера в тиках.
+    max_transports (int): Число мест под транспорты; транспорты сверх
+    этого числа не записываются.
+    summary_seconds (float): Период пересчета сводки в секундах.
+
+    Атрибуты:
+    session (float): Метка сессии — время создания объекта (time.time).
+    ticks (int): Сколько тиков записано.
+    ids (list): Идентификаторы транспортов по местам в буфере.
+    """
+
+    def __init__(self, path=None, ring_ticks=RING_TICKS,
+                 max_transports=MAX_TRANSPORTS,
+                 summary_seconds=SUMMARY_SECONDS):
+        self.path = path
+        self.ring_ticks = ring_ticks
+        self.max_transports = max_transports
+        self.summary_seconds = summary_seconds
+        self.session = time.time()
+        self.columns = {
+            name: np.zeros(ring_ticks) for name in TICK_COLUMNS
+            }
+        self.columns['present'] = np.zeros(
+            (ring_ticks, max_transports), dtype=bool
+            )
+        self._values = np.zeros(
+            (ring_ticks, max_transports, len(TRANSPORT_COLUMNS))
+            )
+        for position, name in enumerate(TRANSPORT_COLUMNS):
+            self.columns[name] = self._values[:, :, position]
+        self.ids = []
+        self._slots = {}
+        self.ticks = 0
+        self._flushed = 0
+        self._file = open(path, 'ab') if path is not None else None
+        self._summary = None
+        self._summary_at = float('-inf')
+
+    def record(self, world):
+        """
+        Записывает состояние тика в кольцевой буфер.
+
+        Параметры:
+        world (World): Состояние мира.
+        """
+        row = self.ticks % self.ring_ticks
+        columns = self.columns
+        columns['tick'][row] = self.ticks
+        columns['time'][row] = time.time()
+        columns['points'][row] = world.points
+
+        present = columns['present'][row]
+        present[:] = False
+        values = self._values[row]
+        for transport in world.transports:
+            slot = self._slot(transport.id)
+            if slot is None:
+                continue
+            present[slot] = True
+            values[slot] = _transport_values(transport)
+
+        self.ticks += 1
+        if self.ticks - self._flushed == self.ring_ticks:
+            self.flush()
+
+    def _slot(self, transport_id):
+        slot = self._slots.get(transport_id)
+        if slot is None and len(self.ids) < self.max_transports:
+            slot = self._slots[transport_id] = len(self.ids)
+            self.ids.append(transport_id)
+        return slot
+
+    def recent(self, name, count):
+        """
+        Возвращает последние значения столбца в порядке записи.
+
+        Параметры:
+        name (str): Имя столбца.
+        count (int): Число тиков (не больше размера буфера).
+
+        Возвращает:
+        ndarray: Копия последних count строк столбца.
+        """
+        count = min(count, self.ticks, self.ring_ticks)
+        rows = np.arange(self.ticks - count, self.ticks) % self.ring_ticks
+        return self.columns[name][rows]
+
+    def flush(self):
+        """
+        Дописывает в файл еще не сохраненные тики одним блоком.
+        """
+        count = self.ticks - self._flushed
+        if count == 0 or self._file is None:
+            self._flushed = self.ticks
+            return
+        start = self._flushed % self.ring_ticks
+        rows = np.arange(start, start + count) % self.ring_ticks
+        slots = len(self.ids)
+        arrays = []
+        header = {
+            'rows': count, 'session': self.session, 'ids': self.ids,
+            'columns': []
+            }
+        for name, column in self.columns.items():
+            array = np.ascontiguousarray(column[rows][:, :slots]
+                                         if column.ndim == 2
+                                         else column[rows])
+            header['columns'].append(
+                [name, array.dtype.str, list(array.shape)]
+                )
+            arrays.append(array)
+        encoded = json.dumps(header).encode('utf-8')
+        self._file.write(BLOCK_MAGIC + struct.pack('<I', len(encoded)))
+        self._file.write(encoded)
+        for array in arrays:
+            self._file.write(array.tobytes())
+        self._file.flush()
+        self._flushed = self.ticks
+
+    def summary(self, world):
+        """
+        Возвращает короткую сводку, пересчитывая ее не чаще
+        summary_seconds.
+
+        Параметры:
+        world (World): Текущее состояние мира.
+
+        Возвращает:
+        str: Сводка по очкам и транспортам.
+        """
+        now = time.monotonic()
+        if now - self._summary_at >= self.summary_seconds:
+            transports = world.transports
+            alive = sum(t.status == 'alive' for t in transports)
+            health = sum(t.health for t in transports)
+            deaths = sum(t.death_count for t in transports)
+            self._summary = (
+                f'tick {self.ticks} points {world.points} '
+                f'alive {alive}/{len(transports)} '
+                f'health {health} deaths {deaths}'
+                )
+            self._summary_at = now
+        return self._summary
+
+    def log(self, world, client):
+        """
+        Записывает тик и отправляет сводку одним сообщением.
+
+        Параметры:
+        world (World): Состояние мира.
+        client (object): Клиент Rewind Viewer.
+        """
+        self.record(world)
+        client.message(self.summary(world))
+
+    def close(self):
+        """Сохраняет оставшиеся тики и закрывает файл."""
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_telemetry(path):
+    """
+    Читает файл телеметрии.
+
+    Блоки с разным набором транспортов приводятся к общему списку
+    идентификаторов; отсутствующие значения равны 0, а столбец
+    'present' показывает, был ли транспорт в тике.
+
+    Параметры:
+    path (str): Путь к файлу телеметрии.
+
+    Возвращает:
+    tuple: Список идентификаторов транспортов и словарь столбцов:
+    одномерных по тикам и двумерных (тики × транспорты). Столбец
+    'session' содержит метку сессии каждого тика (0 для блоков,
+    записанных без нее).
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    blocks = []
+    ids = []
+    position = 0
+    while position < len(data):
+        if data[position:position + 4] != BLOCK_MAGIC:
+            raise ValueError(f'Поврежденный блок телеметрии: {position}')
+        (length,) = struct.unpack_from('<I', data, position + 4)
+        position += 8
+        header = json.loads(data[position:position + length])
+        position += length
+        columns = {}
+        for name, dtype, shape in header['columns']:
+            array = np.frombuffer(
+                data, dtype=dtype, count=int(np.prod(shape)),
+                offset=position
+                ).reshape(shape)
+            position += array.nbytes
+            columns[name] = array
+        for transport_id in header['ids']:
+            if transport_id not in ids:
+                ids.append(transport_id)
+        blocks.append((header, columns))
+
+    result = {}
+    for name in (*TICK_COLUMNS, 'present', *TRANSPORT_COLUMNS):
+        parts = []
+        for header, columns in blocks:
+            column = columns[name]
+            if column.ndim == 2:
+                aligned = np.zeros((len(column), len(ids)), column.dtype)
+                aligned[:, [ids.index(i) for i in header['ids']]] = column
+                column = aligned
+            parts.append(column)
+        result[name] = (
+            np.concatenate(parts) if parts
+            else np.zeros(0)
+            )
+    result['session'] = np.concatenate([
+        np.full(header['rows'], header.get('session', 0.0))
+        for header, _ in blocks
+        ]) if blocks else np.zeros(0)
+    return ids, result
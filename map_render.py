@@ -1,6 +1,12 @@
-def get_map(client, response):
+from json.encoder import encode_basestring_ascii
+
+from rewind_client import (CIRCLE, CIRCLE_POPUP, LINE, RECTANGLE,
+                           RewindClient)
+
+
+def get_map(client, world):
     """
-    Визуализирует карту с разными объектами на основе данных ответа сервера.
+    Визуализирует карту с разными объектами на основе состояния мира.
 
     Метод использует утилиту Rewind Viewer
     (https://github.com/kswaldemar/rewind-viewer) для создания и отрисовки
@@ -15,183 +21,342 @@ def get_map(client, response):
     Параметры:
     client (object): Объект клиента, предоставляющий методы для
     графической визуализации (например, `circle`, `rectangle`, `line` и т.д.).
-    response (dict): Словарь с данными о состоянии карты,
-    содержащий списки аномалий, врагов, монет, транспортов и разыскиваемых.
-
-    Ключевые категории из `response`:
-    - 'anomalies': Список аномалий на карте с координатами и радиусами.
-    - 'bounties': Список монет с координатами и очками.
-    - 'enemies': Список врагов с координатами, уровнем здоровья и щитом.
-    - 'transports': Список транспортов с координатами,
+    world (World): Состояние мира, содержащее аномалии, врагов, монеты,
+    транспорты и разыскиваемые цели.
+
+    Ключевые категории из `world`:
+    - anomalies: Аномалии на карте с координатами и радиусами.
+    - bounties: Монеты с координатами и очками.
+    - enemies: Враги с координатами, уровнем здоровья и щитом.
+    - transports: Транспорты с координатами,
        скоростью, ускорением и состоянием здоровья.
-    - 'wantedList': Список разыскиваемых целей с координатами.
+    - wanted: Разыскиваемые цели с координатами.
     """
 
-    if response is not None:
+    if world is not None:
         # Отрисовка аномалий
-        for anomaly in response['anomalies']:
+        anomalies = world.anomalies
+        for anomaly_id, x, y, radius, effective_radius in zip(
+                anomalies.ids, anomalies.x.tolist(), anomalies.y.tolist(),
+                anomalies.radius.tolist(),
+                anomalies.effective_radius.tolist()):
             client.set_options(layer=1)
-            client.circle(
-                anomaly['x'], anomaly['y'],
-                anomaly['radius'], client.DARK_PURPLE
-                )
-            client.circle(
-                anomaly['x'], anomaly['y'],
-                anomaly["effectiveRadius"], client.PURPLE
-                )
-            client.circle_popup(
-                anomaly['x'], anomaly['y'],
-                anomaly['radius'], f'Anomaly {anomaly['id']}'
-                )
+            client.circle(x, y, radius, client.DARK_PURPLE)
+            client.circle(x, y, effective_radius, client.PURPLE)
+            client.circle_popup(x, y, radius, f'Anomaly {anomaly_id}')
 
         # Отрисовка монет
-        for bounty in response['bounties']:
+        bounties = world.bounties
+        for x, y, radius, points in zip(
+                bounties.x.tolist(), bounties.y.tolist(),
+                bounties.radius.tolist(), bounties.points.tolist()):
             client.set_options(layer=2)
-            client.circle(
-                bounty['x'], bounty['y'],
-                bounty['radius'], client.YELLOW
-                )
-            client.circle_popup(
-                bounty['x'], bounty['y'],
-                bounty['radius'], f'Bounty - {bounty['points']}'
-                )
+            client.circle(x, y, radius, client.YELLOW)
+            client.circle_popup(x, y, radius, f'Bounty - {points:g}')
 
         # Отрисовка врагов
-        for enemy in response['enemies']:
+        enemies = world.enemies
+        for x, y, health, shield_left_ms in zip(
+                enemies.x.tolist(), enemies.y.tolist(),
+                enemies.health.tolist(), enemies.shield_left_ms.tolist()):
             client.set_options(layer=3)
-            client.rectangle(
-                enemy['x'] - 10, enemy['y'] - 10,
-                enemy['x'] + 10, enemy['y'] + 10, client.RED
-                )
-            client.circle_popup(enemy['x'], enemy['y'], 10, 'enemy')
+            client.rectangle(x - 10, y - 10, x + 10, y + 10, client.RED)
+            client.circle_popup(x, y, 10, 'enemy')
 
             # Отрисовка полоски здоровья врага
-            health_x_start = enemy['x'] - 15
-            health_y = enemy['y'] - 15
-            health_length = 30
-            health_current_length = (enemy['health'] / 100) * health_length
-            client.rectangle(
-                health_x_start, health_y,
-                health_x_start + health_current_length, health_y + 5,
-                client.RED
-                )
-            client.rectangle(
-                health_x_start + health_current_length, health_y,
-                health_x_start + health_length, health_y + 5, client.DARK_RED
-                )
+            _draw_health_bar(client, x, y, health)
 
             # Отрисовка отображения щита врага, если он активен
-            if (enemy['shieldLeftMs'] > 0):
-                client.rectangle(
-                    enemy['x'] - 5, enemy['y'] - 5,
-                    enemy['x'] + 5, enemy['y'] + 5, client.PURPLE
-                    )
+            if (shield_left_ms > 0):
+                client.rectangle(x - 5, y - 5, x + 5, y + 5, client.PURPLE)
 
         # Отрисовка собственных транспортов
-        for transport in response['transports']:
+        for transport in world.transports:
+            x = transport.x
+            y = transport.y
             client.set_options(layer=4)
-            client.rectangle(
-                transport['x'] - 10, transport['y'] - 10,
-                transport['x'] + 10, transport['y'] + 10, client.DARK_GREEN
-                )
-            client.circle_popup(
-                transport['x'], transport['y'],
-                10, f'Transport {transport['id']}'
-                )
+            client.rectangle(x - 10, y - 10, x + 10, y + 10, client.DARK_GREEN)
+            client.circle_popup(x, y, 10, f'Transport {transport.id}')
 
             # Отрисовка полоски здоровья транспорта
-            health_x_start = transport['x'] - 15
-            health_y = transport['y'] - 15
-            health_length = 30
-            health_current_length = (transport['health'] / 100) * health_length
-            client.rectangle(
-                health_x_start, health_y,
-                health_x_start + health_current_length, health_y + 5,
-                client.RED
-                )
-            client.rectangle(
-                health_x_start + health_current_length, health_y,
-                health_x_start + health_length, health_y + 5, client.DARK_RED
-                )
+            _draw_health_bar(client, x, y, transport.health)
 
             # Отрисовка отображения щита транспорта, если он активен
-            if (transport['shieldLeftMs'] > 0):
-                client.rectangle(
-                    transport['x'] - 5, transport['y'] - 5,
-                    transport['x'] + 5, transport['y'] + 5, client.PURPLE
-                    )
+            if (transport.shield_left_ms > 0):
+                client.rectangle(x - 5, y - 5, x + 5, y + 5, client.PURPLE)
 
             # Отрисовка вектора ускорения транспорта
-            self_accel_end_x = (
-                transport['x'] + transport['selfAcceleration']['x']
-                )
-            self_accel_end_y = (
-                transport['y'] + transport['selfAcceleration']['y']
-                )
             client.line(
-                transport['x'], transport['y'],
-                self_accel_end_x, self_accel_end_y, client.DARK_GREEN
+                x, y, x + transport.self_ax, y + transport.self_ay,
+                client.DARK_GREEN
                 )
 
             # Отрисовка вектора ускорения получаемого от аномалий
-            self_accel_end_x = (
-                transport['x'] + transport['anomalyAcceleration']['x']
-                )
-            self_accel_end_y = (
-                transport['y'] + transport['anomalyAcceleration']['y']
-                )
             client.line(
-                transport['x'], transport['y'],
-                self_accel_end_x, self_accel_end_y, client.DARK_PURPLE
+                x, y, x + transport.anomaly_ax, y + transport.anomaly_ay,
+                client.DARK_PURPLE
                 )
 
             # Отрисовка вектора скорости транспорта
-            self_accel_end_x = transport['x'] + transport['velocity']['x']
-            self_accel_end_y = transport['y'] + transport['velocity']['y']
             client.line(
-                transport['x'], transport['y'],
-                self_accel_end_x, self_accel_end_y, client.BLUE
+                x, y, x + transport.vx, y + transport.vy, client.BLUE
                 )
 
         # Отрисовка разыскиваемых целей
-        for wanted in response['wantedList']:
+        for x, y in zip(world.wanted.x.tolist(), world.wanted.y.tolist()):
             client.set_options(layer=5)
-            client.circle(wanted['x'], wanted['y'], 0.5, client.DARK_RED)
-            client.circle_popup(wanted['x'], wanted['y'], 10, 'wanted')
+            client.circle(x, y, 0.5, client.DARK_RED)
+            client.circle_popup(x, y, 10, 'wanted')
 
     # Завершение кадра для отображения
     client.end_frame()
 
 
-def draw_transport_actions(client, response, transports_commands):
+def _draw_health_bar(client, x, y, health):
+    """
+    Отрисовывает полоску здоровья над объектом.
+
+    Параметры:
+    client (object): Объект клиента для визуализации.
+    x, y (float): Координаты центра объекта.
+    health (float): Уровень здоровья из 100.
+    """
+    health_x_start = x - 15
+    health_y = y - 15
+    health_length = 30
+    health_current_length = (health / 100) * health_length
+    client.rectangle(
+        health_x_start, health_y,
+        health_x_start + health_current_length, health_y + 5,
+        client.RED
+        )
+    client.rectangle(
+        health_x_start + health_current_length, health_y,
+        health_x_start + health_length, health_y + 5, client.DARK_RED
+        )
+
+
+def draw_transport_actions(client, world, transports_commands):
     """
     Отрисовывает действия транспортов на основе передаваемых команд.
 
     Параметры:
     client (object): Объект клиента для визуализации графических объектов.
-    response (dict): Ответ с данными о транспортах (координаты, id и т.д.).
+    world (World): Состояние мира с транспортами (координаты, id и т.д.).
     transports_commands (list): Список команд для транспортов.
 
     Логика:
     - Если команда относится к атаке, то отображается траектория выстрела от
       текущего транспорта до атакуемой цели.
     """
-    for transport in response['transports']:
-        transport_id = transport['id']
-        transport_x = transport['x']
-        transport_y = transport['y']
-
-        # Обрабатываются команды для каждого транспорта
-        for command in transports_commands:
-            if command['id'] == transport_id and 'attack' in command:
-
-                # Передаются координаты цели для атаки
-                attack_x, attack_y = (
-                    command['attack']['x'], command['attack']['y']
-                    )
-
-                # Отображается вектор выстрела
-                client.line(
-                    transport_x, transport_y, attack_x, attack_y,
-                    client.DARK_PURPLE
-                    )
+    commands_by_id = {
+        command['id']: command for command in transports_commands
+        }
+    for transport in world.transports:
+        command = commands_by_id.get(transport.id)
+        if command is not None and 'attack' in command:
+
+            # Передаются координаты цели для атаки
+            attack_x, attack_y = (
+                command['attack']['x'], command['attack']['y']
+                )
+
+            # Отображается вектор выстрела
+            client.line(
+                transport.x, transport.y, attack_x, attack_y,
+                client.DARK_PURPLE
+                )
+
+
+class MapRenderer:
+    """
+    Отрисовка карты с сохранением состояния между кадрами.
+
+    Рамка карты рисуется на постоянном слое (permanent), который
+    просмотрщик показывает в каждом кадре: она отправляется один раз
+    и повторно — только при изменении размеров карты. Протокол Rewind
+    Viewer не умеет удалять примитивы с постоянного слоя, поэтому
+    объекты, которые исчезают (монеты, аномалии, враги), передаются
+    каждый кадр на обычных слоях.
+
+    Закодированные примитивы этих объектов запоминаются по значениям,
+    от которых зависит вид, поэтому неизменившиеся объекты (в том числе
+    неподвижные монеты) не кодируются заново, а слой отправляется одной
+    строкой. Слой выбирается один раз на группу объектов.
+
+    Атрибуты:
+    encoded (int): Сколько объектов было закодировано заново.
+    reused (int): Сколько объектов взято из прошлого кадра.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self._border = None
+        self._drawn = {}
+        self.encoded = 0
+        self.reused = 0
+
+    def draw(self, world, transports_commands=()):
+        """
+        Отрисовывает кадр и завершает его.
+
+        Параметры:
+        world (World): Состояние мира.
+        transports_commands (list): Команды транспортов для отображения
+        атак.
+        """
+        client = self.client
+
+        # Рамка карты на постоянном слое
+        border = (world.map_width, world.map_height)
+        if border != self._border:
+            client.set_options(permanent=True)
+            client.rectangle(0, 0, *border, client.GREEN)
+            client.set_options(permanent=False)
+            self._border = border
+
+        anomalies = world.anomalies
+        self._draw_layer(1, zip(
+            anomalies.ids, anomalies.x.tolist(), anomalies.y.tolist(),
+            anomalies.radius.tolist(), anomalies.effective_radius.tolist()
+            ), _encode_anomaly)
+
+        bounties = world.bounties
+        self._draw_layer(2, zip(
+            bounties.x.tolist(), bounties.y.tolist(),
+            bounties.radius.tolist(), bounties.points.tolist()
+            ), _encode_bounty)
+
+        enemies = world.enemies
+        self._draw_layer(3, zip(
+            enemies.x.tolist(), enemies.y.tolist(), enemies.health.tolist(),
+            (enemies.shield_left_ms > 0).tolist()
+            ), _encode_enemy)
+
+        client.set_options(layer=4)
+        client.raw(_encode_transports(world, transports_commands))
+
+        wanted = world.wanted
+        self._draw_layer(
+            5, zip(wanted.x.tolist(), wanted.y.tolist()), _encode_wanted
+            )
+
+        client.end_frame()
+
+    def _draw_layer(self, layer, keys, encode):
+        """
+        Отправляет слой одной строкой, кодируя только новые объекты.
+
+        Параметры:
+        layer (int): Номер слоя.
+        keys (iterable): Кортежи значений, определяющих вид объектов.
+        encode (callable): Кодирует объект по его кортежу.
+        """
+        previous = self._drawn.get(layer, {})
+        current = {}
+        for key in keys:
+            text = previous.get(key)
+            if text is None:
+                text = encode(*key)
+                self.encoded += 1
+            else:
+                self.reused += 1
+            current[key] = text
+        self._drawn[layer] = current
+        self.client.set_options(layer=layer)
+        self.client.raw(''.join(current.values()))
+
+
+def _encode_health_bar(x, y, health):
+    health_x_start = x - 15
+    health_y = y - 15
+    health_length = 30
+    health_current_length = (health / 100) * health_length
+    return (
+        RECTANGLE % (
+            health_x_start, health_y,
+            health_x_start + health_current_length, health_y + 5,
+            RewindClient.RED, 'false'
+            )
+        + RECTANGLE % (
+            health_x_start + health_current_length, health_y,
+            health_x_start + health_length, health_y + 5,
+            RewindClient.DARK_RED, 'false'
+            )
+        )
+
+
+def _encode_anomaly(anomaly_id, x, y, radius, effective_radius):
+    return (
+        CIRCLE % (x, y, radius, RewindClient.DARK_PURPLE, 'false')
+        + CIRCLE % (x, y, effective_radius, RewindClient.PURPLE, 'false')
+        + CIRCLE_POPUP % (
+            x, y, radius, encode_basestring_ascii(f'Anomaly {anomaly_id}')
+            )
+        )
+
+
+def _encode_bounty(x, y, radius, points):
+    return (
+        CIRCLE % (x, y, radius, RewindClient.YELLOW, 'false')
+        + CIRCLE_POPUP % (x, y, radius, f'"Bounty - {points:g}"')
+        )
+
+
+def _encode_enemy(x, y, health, shielded):
+    text = (
+        RECTANGLE % (x - 10, y - 10, x + 10, y + 10, RewindClient.RED,
+                     'false')
+        + CIRCLE_POPUP % (x, y, 10, '"enemy"')
+        + _encode_health_bar(x, y, health)
+        )
+    if shielded:
+        text += RECTANGLE % (x - 5, y - 5, x + 5, y + 5,
+                             RewindClient.PURPLE, 'false')
+    return text
+
+
+def _encode_wanted(x, y):
+    return (
+        CIRCLE % (x, y, 0.5, RewindClient.DARK_RED, 'false')
+        + CIRCLE_POPUP % (x, y, 10, '"wanted"')
+        )
+
+
+def _encode_transports(world, transports_commands):
+    """
+    Кодирует собственные транспорты, их векторы и выстрелы из команд.
+    """
+    commands_by_id = {
+        command['id']: command for command in transports_commands
+        }
+    parts = []
+    for transport in world.transports:
+        x = transport.x
+        y = transport.y
+        parts.append(
+            RECTANGLE % (x - 10, y - 10, x + 10, y + 10,
+                         RewindClient.DARK_GREEN, 'false')
+            + CIRCLE_POPUP % (x, y, 10, encode_basestring_ascii(
+                f'Transport {transport.id}'
+                ))
+            + _encode_health_bar(x, y, transport.health)
+            )
+        if transport.shield_left_ms > 0:
+            parts.append(RECTANGLE % (x - 5, y - 5, x + 5, y + 5,
+                                      RewindClient.PURPLE, 'false'))
+        parts.append(
+            LINE % (x, y, x + transport.self_ax, y + transport.self_ay,
+                    RewindClient.DARK_GREEN)
+            + LINE % (x, y, x + transport.anomaly_ax,
+                      y + transport.anomaly_ay, RewindClient.DARK_PURPLE)
+            + LINE % (x, y, x + transport.vx, y + transport.vy,
+                      RewindClient.BLUE)
+            )
+        command = commands_by_id.get(transport.id)
+        if command is not None and 'attack' in command:
+            parts.append(LINE % (
+                x, y, command['attack']['x'], command['attack']['y'],
+                RewindClient.DARK_PURPLE
+                ))
+    return ''.join(parts)
@@ -0,0 +1,103 @@
+"""
+Локальная замена игрового сервера для отладки без доступа к API.
+
+Отдает mock.json на POST /play/magcarp/player/move и расписание
+из одного активного раунда на GET /rounds/magcarp.
+
+Запуск:
+    python mock_server.py [--port 8000] [--delay 0.05]
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MOVE_PATH = '/play/magcarp/player/move'
+ROUND_PATH = '/rounds/magcarp'
+
+
+class MockGameHandler(BaseHTTPRequestHandler):
+    """
+    Обработчик запросов к локальному серверу.
+
+    Поддерживает keep-alive (HTTP/1.1), чтобы на нем можно было проверять
+    переиспользование соединений клиентом.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def _reply(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != ROUND_PATH:
+            self._reply(404, b'{"error": "not found"}')
+            return
+        now = datetime.now(timezone.utc)
+        rounds = {
+            'gameName': 'magcarp',
+            'now': now.isoformat(),
+            'rounds': [{
+                'name': 'mock round',
+                'startAt': self.server.started_at.isoformat(),
+                'endAt': (
+                    self.server.started_at + timedelta(hours=1)
+                    ).isoformat(),
+                'duration': 3600,
+                'status': 'active',
+                'repeat': 0,
+                }],
+            }
+        self._reply(200, json.dumps(rounds).encode('utf-8'))
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        if self.path != MOVE_PATH:
+            self._reply(404, b'{"error": "not found"}')
+            return
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        self._reply(200, self.server.payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(port=0, delay=0.0, mock_path='mock.json'):
+    """
+    Создает локальный сервер, не запуская его.
+
+    Параметры:
+    port (int): Порт; 0 — выбрать свободный.
+    delay (float): Искусственная задержка ответа на move в секундах.
+    mock_path (str): Путь к файлу с ответом сервера.
+
+    Возвращает:
+    ThreadingHTTPServer: Сервер; адрес доступен в server_address.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), MockGameHandler)
+    with open(mock_path, 'rb') as file:
+        server.payload = file.read()
+    server.delay = delay
+    server.started_at = datetime.now(timezone.utc)
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--delay', type=float, default=0.0)
+    args = parser.parse_args()
+    server = make_server(args.port, args.delay)
+    print(f'Mock-сервер: http://127.0.0.1:{server.server_address[1]}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,126 @@
+"""
+Локальная замена Rewind Viewer для отладки и замеров без окна просмотра.
+
+Принимает поток JSON-объектов на TCP-порту, разбирает его и считает
+кадры, примитивы и полученные байты. Без разбора (parse=False) только
+считает байты — как приемник, не влияющий на замеры.
+
+Запуск:
+    python mock_viewer.py [--port 9111]
+"""
+import argparse
+import codecs
+import json
+import socketserver
+import time
+
+# Размер блока чтения из сокета
+CHUNK_SIZE = 1 << 16
+
+
+class MockViewerHandler(socketserver.BaseRequestHandler):
+    """
+    Обработчик соединения: разбирает склеенные JSON-объекты и считает
+    статистику в атрибутах сервера.
+    """
+
+    def handle(self):
+        decoder = json.JSONDecoder()
+        text = codecs.getincrementaldecoder('utf-8')()
+        pending = ''
+        while True:
+            chunk = self.request.recv(CHUNK_SIZE)
+            if not chunk:
+                break
+            server = self.server
+            server.recv_calls += 1
+            server.bytes_received += len(chunk)
+            if not server.parse:
+                continue
+            pending += text.decode(chunk)
+            position = 0
+            while True:
+                while position < len(pending) and pending[position].isspace():
+                    position += 1
+                try:
+                    obj, position = decoder.raw_decode(pending, position)
+                except json.JSONDecodeError:
+                    break
+                server.primitives += 1
+                if obj.get('type') == 'end':
+                    server.frames += 1
+                    server.last_frame_at = time.monotonic()
+            pending = pending[position:]
+
+
+class MockViewer(socketserver.ThreadingTCPServer):
+    """
+    TCP-сервер со счетчиками полученных данных.
+
+    Параметры:
+    address (tuple): Адрес (host, port).
+    parse (bool): Разбирать ли объекты; без разбора frames
+    и primitives не считаются.
+
+    Атрибуты:
+    frames (int): Число полученных кадров (объектов end).
+    primitives (int): Число полученных объектов, включая end.
+    bytes_received (int): Число полученных байтов.
+    recv_calls (int): Число непустых чтений из сокета.
+    last_frame_at (float): Время (time.monotonic) последнего end.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, parse=True):
+        super().__init__(address, MockViewerHandler)
+        self.parse = parse
+        self.frames = 0
+        self.primitives = 0
+        self.bytes_received = 0
+        self.recv_calls = 0
+        self.last_frame_at = None
+
+    def wait_frames(self, count, timeout=5.0):
+        """
+        Ждет, пока не будет получено count кадров.
+
+        Возвращает:
+        bool: True, если кадры получены до истечения таймаута.
+        """
+        deadline = time.monotonic() + timeout
+        while self.frames < count:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+
+def make_viewer(port=0, parse=True):
+    """
+    Создает локальный приемник кадров, не запуская его.
+
+    Параметры:
+    port (int): Порт; 0 — выбрать свободный.
+    parse (bool): Разбирать ли полученные объекты.
+
+    Возвращает:
+    MockViewer: Сервер; адрес доступен в server_address.
+    """
+    return MockViewer(('127.0.0.1', port), parse)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--port', type=int, default=9111)
+    args = parser.parse_args()
+    viewer = make_viewer(args.port)
+    print(f'Mock-viewer: 127.0.0.1:{viewer.server_address[1]}')
+    try:
+        viewer.serve_forever()
+    except KeyboardInterrupt:
+        print(
+            f'Кадров: {viewer.frames}, объектов: {viewer.primitives}, '
+            f'байтов: {viewer.bytes_received}'
+            )
@@ -1,27 +1,42 @@
 import math
 
-from calculations import (sum_vector, subtract_vector, vector_from_points,
-                          calculate_distance, calculate_angle_between_vectors,
-                          normalize_vector, normalize_max_vector,
-                          create_stop_acceleration)
+import numpy as np
+
+from calculations import (clamp_length, cos_between, cos_threshold,
+                          limit_length)
+from scoring import CAPTURE_DISTANCE, choose_eligible
+from spatial_index import WorldIndex
 
 
 MIN_HEALTH_FOR_SHIELD = 50
+# Сколько очков монеты стоит единица опасности (урона врагов) в ее
+# клетке при выборе цели с картой угроз
+THREAT_WEIGHT = 1.0
+# Косинусы порогов угла: 20° — между направлением на монету и радиус-
+# вектором транспорта (выбор коэффициента торможения), 30° — между
+# скоростью и направлением на монету (разворот с полной остановкой)
+TURN_COS = cos_threshold(20)
+STOP_COS = cos_threshold(30)
 
 
-def control_transports(data):
+def control_transports(world, index=None, assigner=None, cache=None,
+                       threat=None):
     """
     Управляет транспортами на основе их текущего состояния и окружения.
 
     Параметры:
-    data (dict): Данные о транспортах, аномалиях, врагах и монетах.
-                 Ожидаются ключи:
-                 -'transports'
-                 -'bounties'
-                 -'enemies'
-                 -'maxAccel'
-                 -'attackRange'
-                 -'attackDamage'.
+    world (World): Состояние мира с транспортами, монетами, врагами
+    и параметрами игры (maxAccel, attackRange, attackDamage).
+    index (WorldIndex): Пространственный индекс текущего ответа
+    (опционально, строится при отсутствии).
+    assigner (BountyAssigner): Совместное распределение монет между
+    транспортами (опционально); без него и для транспортов, не
+    получивших монету, цель выбирается каждым транспортом отдельно.
+    cache (TargetCache): Закрепление целей между тиками (опционально);
+    через него выбираются цели, не назначенные assigner.
+    threat (ThreatMap): Карта угроз этого состояния (опционально):
+    опасные монеты выбираются реже, а щит включается и тогда, когда
+    враги рядом могут уничтожить транспорт.
 
     Возвращает:
     list: Список команд для транспортов, каждая из которых включает:
@@ -30,134 +45,262 @@ def control_transports(data):
           - 'id': Идентификатор транспорта.
           - 'attack': Команда атаки, если враг выбран (опционально).
     """
-    transports_commands = []
+    if index is None:
+        index = WorldIndex(world)
+    targets = {}
+    if cache is not None or assigner is not None or threat is not None:
+        choose = choose_target if cache is None else cache.choose
+        targets = {
+            transport.id: choose(
+                transport, _direction(transport), world.bounties, index,
+                threat
+                )
+            for transport in world.transports
+            }
+    if assigner is not None:
+        targets = assigner.assign(world, index, targets)
+    return [
+        control_transport(
+            world, transport, index, targets.get(transport.id), threat
+            )[0]
+        for transport in world.transports
+        ]
 
-    # Инициализация команд для текущего транспорта
-    for transport in data['transports']:
-        command = {
-            "acceleration": {"x": 0, "y": 0},
-            "activateShield": False,
-            "id": transport["id"]
-        }
 
-        # Текущие вектора ускорения
-        currentVector = transport["velocity"]
-        anomalyVector = transport["anomalyAcceleration"]
+def control_transport(world, transport, index, target=None, threat=None):
+    """
+    Рассчитывает команду для одного транспорта.
 
-        # Общий вектор ускорения
-        total_acceleration = sum_vector(currentVector, anomalyVector)
+    Параметры:
+    world (World): Состояние мира.
+    transport (Transport): Управляемый транспорт.
+    index (WorldIndex): Пространственный индекс текущего ответа.
+    target (int): Индекс назначенной монеты в world.bounties
+    (опционально, иначе выбирается по правилам угла и дистанции).
+    threat (ThreatMap): Карта угроз (опционально, для решения о щите).
 
-        # Поиск ближайшей монеты
-        nearest_bounty = None
-        min_distance = float('inf')
-        max_points = float('-inf')
-        bounty_with_max_points = None
+    Возвращает:
+    tuple: Команда для транспорта (см. control_transports) и координаты
+    целевой монеты (x, y) либо None, если монет нет.
+    """
+    acceleration, target = plan_motion(world, transport, index, target)
+    command = build_command(world, transport, index, acceleration, threat)
+    return command, target
 
-        for bounty in data['bounties']:
-            distance_to_bounty = calculate_distance(
-                transport['x'], transport['y'], bounty['x'], bounty['y']
-                )
 
-            # Вычисление вектора к текущей монете
-            directionVectorToBounty = vector_from_points(transport, bounty)
+def build_command(world, transport, index, acceleration, threat=None):
+    """
+    Собирает команду транспорта по готовому ускорению.
 
-            # Условия для нахождения ближайшей монеты с учётом угла
-            if distance_to_bounty < min_distance:
-                min_distance = distance_to_bounty
-                nearest_bounty = bounty
+    Решения о щите и атаке принимаются по переданному состоянию мира.
 
-            # Проверка угла между векторами
-            angle_between_temp = calculate_angle_between_vectors(
-                total_acceleration, directionVectorToBounty
-                )
+    Параметры:
+    world (World): Состояние мира.
+    transport (Transport): Управляемый транспорт.
+    index (WorldIndex): Пространственный индекс текущего ответа.
+    acceleration (dict): Вектор ускорения {'x', 'y'}.
+    threat (ThreatMap): Карта угроз (опционально).
+
+    Возвращает:
+    dict: Команда для транспорта (см. control_transports).
+    """
+    danger = 0.0
+    if threat is not None:
+        danger = threat.danger(transport.x, transport.y)
+    command = {
+        "acceleration": acceleration,
+        "activateShield": need_shield(transport, danger),
+        "id": transport.id
+    }
+    attack = choose_attack(world, transport, index)
+    if attack is not None:
+        command["attack"] = attack
+    return command
+
+
+def plan_motion(world, transport, index, target=None):
+    """
+    Выбирает целевую монету и рассчитывает ускорение для движения к ней.
+
+    Параметры:
+    world (World): Состояние мира.
+    transport (Transport): Управляемый транспорт.
+    index (WorldIndex): Пространственный индекс текущего ответа.
+    target (int): Индекс уже назначенной монеты (опционально).
+
+    Возвращает:
+    tuple: Вектор ускорения {'x', 'y'} и координаты целевой монеты
+    (x, y) либо None, если монет нет.
+    """
+    bounties = world.bounties
+    vx = transport.vx
+    vy = transport.vy
+
+    # Общий вектор ускорения
+    total_acceleration = _direction(transport)
+    total_x, total_y = total_acceleration
 
-            # Определение монеты с наибольшими очками, доступной для сбора
-            if (
-                abs(angle_between_temp) <= 15 and distance_to_bounty <= 200
-                ) or (
-                    angle_between_temp <= 45 and distance_to_bounty <= 50
-                    ):
-                if bounty['points'] - distance_to_bounty > max_points:
-                    max_points = bounty['points'] - distance_to_bounty
-                    bounty_with_max_points = bounty
-
-        # Вычисление итогового направления для движения
-        directionVector = vector_from_points(
-            {"x": transport["x"], "y": transport["y"]}, bounty_with_max_points
-            if bounty_with_max_points else nearest_bounty
+    if target is None:
+        target = choose_target(transport, total_acceleration, bounties, index)
+    if target < 0:
+        return {'x': 0, 'y': 0}, None
+    target_x = float(bounties.x[target])
+    target_y = float(bounties.y[target])
+
+    # Вычисление итогового направления для движения
+    direction_x = target_x - transport.x
+    direction_y = target_y - transport.y
+    coef = math.sqrt(vx ** 2 + vy ** 2) / world.max_accel / (
+        1.2 if cos_between(
+            direction_x, direction_y, transport.x, transport.y
+            ) < TURN_COS else 2
+        )
+    normalizedCf = max(coef, 1)
+
+    # Корректировка ускорения
+    if limit_length(direction_x, direction_y, 1) == limit_length(
+            total_x, total_y, 1
+            ):
+        acceleration = {'x': 0, 'y': 0}
+    else:
+        x, y = clamp_length(
+            direction_x - total_x * normalizedCf,
+            direction_y - total_y * normalizedCf,
+            world.max_accel
             )
-        coef = math.sqrt(
-            transport['velocity']['x'] ** 2 + transport['velocity']['y'] ** 2
-            ) / data["maxAccel"] / (
-                1.2 if calculate_angle_between_vectors(
-                    directionVector, transport
-                    ) > 20 else 2
-                )
-        normalizedCf = max(coef, 1)
-
-        # Корректировка ускорения
-        resultWithCoef = subtract_vector(
-            directionVector,
-            {"x": total_acceleration["x"]*normalizedCf,
-             "y": total_acceleration["y"] * normalizedCf}
-             )
-        if normalize_vector(
-            directionVector, 1) == normalize_vector(
-                total_acceleration, 1
-                ):
-            command["acceleration"] = {'x': 0, 'y': 0}
-        else:
-            command["acceleration"] = normalize_max_vector(
-                resultWithCoef, data['maxAccel']
-                )
+        acceleration = {'x': x, 'y': y}
+
+    # Корректировка ускорения, если текущая скорость выше желаемой
+    velocity_magnitude = math.sqrt(vx ** 2 + vy ** 2)
+    if velocity_magnitude > world.max_accel:
+        if cos_between(vx, vy, direction_x, direction_y) < STOP_COS:
+            x, y = limit_length(-vx, -vy, world.max_accel)
+            acceleration = {'x': x, 'y': y}
+
+    return acceleration, (target_x, target_y)
+
+
+def _direction(transport):
+    """
+    Вектор движения транспорта (x, y): сумма скорости и ускорения
+    от аномалий.
+    """
+    return (transport.vx + transport.anomaly_ax,
+            transport.vy + transport.anomaly_ay)
+
+
+def choose_target(transport, direction, bounties, index, threat=None):
+    """
+    Выбирает монету по правилам угла и дистанции среди кандидатов
+    в радиусе захвата, иначе ближайшую монету.
+
+    Параметры:
+    transport (Transport): Управляемый транспорт.
+    direction (tuple): Вектор движения (x, y).
+    bounties (Bounties): Монеты.
+    index (WorldIndex): Пространственный индекс текущего ответа.
+    threat (ThreatMap): Карта угроз (опционально).
+
+    Возвращает:
+    int: Индекс монеты либо -1, если монет нет.
+    """
+    candidates, _ = index.bounties.within(
+        transport.x, transport.y, CAPTURE_DISTANCE
+        )
+    target = choose_eligible(
+        np.array([[transport.x, transport.y]], dtype=float),
+        np.array([direction], dtype=float),
+        np.column_stack((bounties.x[candidates], bounties.y[candidates])),
+        bounty_values(bounties, candidates, threat)
+        )[0]
+    if target >= 0:
+        return int(candidates[target])
+    target, _ = index.bounties.nearest(transport.x, transport.y)
+    return target
+
+
+def bounty_values(bounties, candidates, threat=None):
+    """
+    Ценность монет-кандидатов: очки за вычетом опасности их клеток.
+
+    Параметры:
+    bounties (Bounties): Монеты.
+    candidates (ndarray): Индексы кандидатов.
+    threat (ThreatMap): Карта угроз (опционально; без нее — очки).
+
+    Возвращает:
+    ndarray: Ценности кандидатов.
+    """
+    points = bounties.points[candidates]
+    if threat is None:
+        return points
+    return points - THREAT_WEIGHT * threat.danger_many(
+        bounties.x[candidates], bounties.y[candidates]
+        )
+
+
+def need_shield(transport, danger=0.0):
+    """
+    Проверяет, нужно ли активировать щит транспорта.
 
-        # Корректировка ускорения, если текущая скорость выше желаемой
-        velocity_magnitude = math.sqrt(
-            transport['velocity']['x'] ** 2 + transport['velocity']['y'] ** 2
+    Параметры:
+    transport (Transport): Транспорт.
+    danger (float): Урон, который могут нанести враги в клетке
+    транспорта (см. ThreatMap).
+
+    Возвращает:
+    bool: True при готовом щите и низком здоровье либо угрозе,
+    достаточной для уничтожения транспорта.
+    """
+    # Активация щита при низком здоровье или смертельной угрозе
+    return ((transport.health <= MIN_HEALTH_FOR_SHIELD
+             or danger >= transport.health)
+            and transport.shield_cooldown_ms == 0)
+
+
+def choose_attack(world, transport, index):
+    """
+    Выбирает точку атаки для транспорта.
+
+    Предпочтение отдается первому врагу без щита, которого можно
+    уничтожить одним выстрелом, иначе ближайшему врагу без щита
+    в радиусе атаки. Точка прицеливания смещается по скорости врага.
+
+    Параметры:
+    world (World): Состояние мира.
+    transport (Transport): Атакующий транспорт.
+    index (WorldIndex): Пространственный индекс текущего ответа.
+
+    Возвращает:
+    dict: Координаты атаки {'x', 'y'} либо None.
+    """
+    enemies = world.enemies
+
+    # Поиск врага для атаки
+    chosen_enemy = -1
+    min_distance = float('inf')
+    if transport.attack_cooldown_ms == 0:
+        in_range, distances = index.enemies.within(
+            transport.x, transport.y, world.attack_range
             )
-        if velocity_magnitude > data["maxAccel"]:
-            angle_between = calculate_angle_between_vectors(
-                transport['velocity'], directionVector
-                )
-            if angle_between > 30:
-                stop_accel = create_stop_acceleration(transport['velocity'])
-                command["acceleration"] = normalize_vector(
-                    stop_accel, data['maxAccel']
-                    )
-
-        # Активация щита при низком здоровье
-        if (transport["health"] <= MIN_HEALTH_FOR_SHIELD
-                and transport["shieldCooldownMs"] == 0):
-            command["activateShield"] = True
-
-        # Поиск врага для атаки
-        chosen_enemy = None
-        min_distance = float('inf')
-        if transport["attackCooldownMs"] == 0:
-            for enemy in data['enemies']:
-                distance_to_enemy = calculate_distance(
-                    transport['x'], transport['y'], enemy['x'], enemy['y']
-                    )
-                if (distance_to_enemy <= data['attackRange']
-                        and enemy["shieldLeftMs"] == 0):
-                    if enemy["health"] <= data["attackDamage"]:
-                        chosen_enemy = enemy
-                        break
-                    if distance_to_enemy < min_distance:
-                        min_distance = distance_to_enemy
-                        chosen_enemy = enemy
-
-        # Атака выбранного врага
-        if chosen_enemy:
-            x = chosen_enemy['x']
-            y = chosen_enemy['y']
-            evy = chosen_enemy["velocity"]["y"]
-            evx = chosen_enemy["velocity"]['x']
-            rx = round(x + (evx / 3))
-            ry = round(y + (evy / 3))
-            command["attack"] = {"x": rx, "y": ry}
-
-        # Добавление команды для транспорта
-        transports_commands.append(command)
-
-    return transports_commands
+        for enemy_index, distance_to_enemy in zip(
+                in_range.tolist(), distances.tolist()):
+            if enemies.shield_left_ms[enemy_index] == 0:
+                if enemies.health[enemy_index] <= world.attack_damage:
+                    chosen_enemy = enemy_index
+                    break
+                if distance_to_enemy < min_distance:
+                    min_distance = distance_to_enemy
+                    chosen_enemy = enemy_index
+
+    if chosen_enemy < 0:
+        return None
+
+    # Атака выбранного врага
+    x = enemies.x[chosen_enemy]
+    y = enemies.y[chosen_enemy]
+    evy = enemies.vy[chosen_enemy]
+    evx = enemies.vx[chosen_enemy]
+    rx = round(x + (evx / 3))
+    ry = round(y + (evy / 3))
+    return {"x": int(rx), "y": int(ry)}
@@ -0,0 +1,149 @@
+"""
+Ожидание раунда и прогрев клиента перед первым ходом.
+
+Расписание раундов запрашивается с нарастающей паузой при ошибках.
+До начала ближайшего раунда клиент спит, не нагружая сервер,
+за WARMUP_SECONDS до начала выполняет прогрев (соединения, декодер,
+индексы, расчет команд по mock.json), а затем дожидается момента
+начала с точностью до SPIN_SECONDS, чтобы первые тики раунда шли
+уже с полной скоростью.
+"""
+import re
+import time
+from datetime import datetime
+
+# Пауза между запросами расписания: начальная, множитель при ошибке
+# или отсутствии раундов и наибольшая (секунды)
+POLL_SECONDS = 1.0
+BACKOFF = 2.0
+MAX_POLL_SECONDS = 30.0
+# За сколько секунд до начала раунда выполняется прогрев
+WARMUP_SECONDS = 5.0
+# Последний участок ожидания проходит в активном цикле, а не в sleep,
+# точность которого — единицы миллисекунд
+SPIN_SECONDS = 0.002
+# Статус идущего раунда в расписании
+ACTIVE_STATUS = 'active'
+
+
+def parse_time(text):
+    """
+    Разбирает время из расписания (ISO 8601, в том числе с 'Z'
+    и долями секунды длиннее микросекунд).
+
+    Параметры:
+    text (str): Строка времени.
+
+    Возвращает:
+    datetime: Время с часовым поясом.
+    """
+    text = text.replace('Z', '+00:00')
+    text = re.sub(r'(\.\d{6})\d+', r'\1', text)
+    return datetime.fromisoformat(text)
+
+
+def next_round(schedule):
+    """
+    Выбирает идущий либо ближайший будущий раунд.
+
+    Параметры:
+    schedule (dict): Ответ GET /rounds с полями now и rounds.
+
+    Возвращает:
+    tuple: Раунд (dict) и число секунд до его начала по часам сервера
+    (0 для идущего), либо (None, None), если раундов впереди нет.
+    """
+    now = parse_time(schedule['now'])
+    best = None
+    for round_info in schedule.get('rounds') or []:
+        start = parse_time(round_info['startAt'])
+        end = parse_time(round_info['endAt'])
+        if round_info.get('status') == ACTIVE_STATUS or start <= now < end:
+            return round_info, 0.0
+        if start > now and (best is None or start < best[1]):
+            best = (round_info, start)
+    if best is None:
+        return None, None
+    return best[0], (best[1] - now).total_seconds()
+
+
+class RoundOrchestrator:
+    """
+    Ожидание начала раунда с прогревом.
+
+    Момент начала переводится в часы time.monotonic: время now
+    из расписания относится к середине запроса, поэтому смещение
+    до startAt отсчитывается от нее. Пока до начала больше
+    WARMUP_SECONDS, расписание перезапрашивается не реже раза
+    в MAX_POLL_SECONDS (раунд могут перенести); затем вызывается
+    warm_up, и остаток ожидания проходит без запросов.
+
+    Параметры:
+    fetch_rounds (callable): Запрос расписания; возвращает ответ
+    сервера (dict) либо None при ошибке.
+    warm_up (callable): Прогрев клиента без аргументов.
+
+    Атрибуты:
+    polls (int): Число запросов расписания.
+    failures (int): Сколько из них завершились ошибкой.
+    warmup_seconds (float): Длительность прогрева.
+    late (float): Насколько позже начала раунда вернулся wait
+    (секунды; 0, если раунд уже шел).
+    """
+
+    def __init__(self, fetch_rounds, warm_up):
+        self._fetch_rounds = fetch_rounds
+        self._warm_up = warm_up
+        self.polls = 0
+        self.failures = 0
+        self.warmup_seconds = None
+        self.late = None
+
+    def wait(self):
+        """
+        Ждет начала раунда и прогревает клиент.
+
+        Возвращает:
+        dict: Раунд из расписания.
+        """
+        delay = POLL_SECONDS
+        while True:
+            sent = time.monotonic()
+            schedule = self._fetch_rounds()
+            received = time.monotonic()
+            self.polls += 1
+            round_info = None
+            if schedule is None:
+                self.failures += 1
+            else:
+                round_info, offset = next_round(schedule)
+            if round_info is None:
+                time.sleep(delay)
+                delay = min(delay * BACKOFF, MAX_POLL_SECONDS)
+                continue
+            delay = POLL_SECONDS
+
+            start = (sent + received) / 2 + offset
+            if start - received > WARMUP_SECONDS:
+                # Повторный запрос до прогрева: расписание могло измениться
+                _sleep_until(min(
+                    start - WARMUP_SECONDS, received + MAX_POLL_SECONDS
+                    ))
+                continue
+
+            began = time.monotonic()
+            self._warm_up()
+            self.warmup_seconds = time.monotonic() - began
+            _sleep_until(start)
+            self.late = max(time.monotonic() - start, 0.0)
+            return round_info
+
+
+def _sleep_until(moment):
+    """Спит до момента time.monotonic, последние SPIN_SECONDS — активно."""
+    while True:
+        remaining = moment - time.monotonic()
+        if remaining <= 0:
+            return
+        if remaining > SPIN_SECONDS:
+            time.sleep(remaining - SPIN_SECONDS)
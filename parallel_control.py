@@ -0,0 +1,343 @@
+"""
+Расчет команд транспортов в нескольких процессах.
+
+Каждый тик столбцы состояния мира (монеты, враги, разыскиваемые цели,
+аномалии) один раз записываются в общую память, а процессам пула
+передаются только ее имя, размеры столбцов, общие параметры
+и транспорты их части. Процесс собирает World из представлений общей
+памяти без копирования, строит индекс один раз на тик и рассчитывает
+команды своих транспортов функцией evaluate. Команды собираются
+в порядке world.transports независимо от порядка завершения процессов;
+транспорты, для которых процессы не успели к сроку, управляются
+жадным control_transport в основном процессе.
+
+Блок общей памяти перезаписывается каждый тик, а опоздавшую задачу
+прошлого тика отменить нельзя, поэтому в начале блока хранится номер
+публикации: задача проверяет его до и после расчета и возвращает None
+вместо команд, если блок уже переписан (мир мог быть прочитан
+наполовину старым).
+"""
+import concurrent.futures
+import os
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from motion_control import control_transport, need_shield
+from spatial_index import WorldIndex
+from world import Anomalies, Bounties, Enemies, World
+
+# Сколько времени тика отводится процессам пула (секунды)
+DEADLINE_SECONDS = 0.05
+# По умолчанию одно ядро остается основному процессу
+WORKERS = max((os.cpu_count() or 1) - 1, 1)
+# Во сколько раз емкость общей памяти превышает нужную при выделении
+GROWTH = 2
+# Число ячеек заголовка перед столбцами (номер публикации)
+HEADER = 1
+# Столбцы в общей памяти; идентификаторы аномалий передаются отдельно
+BOUNTY_COLUMNS = Bounties.__slots__
+ENEMY_COLUMNS = Enemies.__slots__
+ANOMALY_COLUMNS = Anomalies.__slots__[1:]
+# Атрибуты World, передаваемые как есть (без столбцов и транспортов)
+SCALAR_FIELDS = tuple(
+    name for name in World.__slots__
+    if name not in ('transports', 'enemies', 'wanted', 'bounties',
+                    'anomalies')
+    )
+
+
+def greedy_plan(world, index, transport):
+    """
+    Оценка плана по умолчанию: команда жадного управления.
+
+    Функции оценки вызываются в процессах пула, поэтому должны быть
+    определены на уровне модуля.
+
+    Параметры:
+    world (World): Состояние мира из общей памяти.
+    index (WorldIndex): Его пространственный индекс.
+    transport (Transport): Управляемый транспорт.
+
+    Возвращает:
+    dict: Команда для транспорта.
+    """
+    return control_transport(world, transport, index)[0]
+
+
+class SharedWorld:
+    """
+    Публикация столбцов состояния мира в общей памяти.
+
+    Столбцы записываются подряд в один массив float64 после заголовка
+    из HEADER ячеек; при нехватке места выделяется новый блок с запасом
+    GROWTH, старый удаляется (процессы, уже подключенные к нему,
+    дочитывают его до отключения). На время записи номер публикации
+    в заголовке обнуляется и записывается снова после столбцов, так
+    что процесс видит свой номер, только пока блок не начали менять.
+
+    Атрибуты:
+    generation (int): Номер последней публикации.
+    """
+
+    def __init__(self):
+        self._memory = None
+        self._array = None
+        self.generation = 0
+
+    def publish(self, world):
+        """
+        Записывает столбцы состояния.
+
+        Параметры:
+        world (World): Состояние мира.
+
+        Возвращает:
+        tuple: Описание публикации для процессов: имя блока, номер
+        и длины столбцов (монеты, враги, разыскиваемые, аномалии).
+        """
+        lengths = (
+            len(world.bounties), len(world.enemies), len(world.wanted),
+            len(world.anomalies)
+            )
+        size = HEADER + (
+            lengths[0] * len(BOUNTY_COLUMNS)
+            + (lengths[1] + lengths[2]) * len(ENEMY_COLUMNS)
+            + lengths[3] * len(ANOMALY_COLUMNS)
+            )
+        if self._array is None or len(self._array) < size:
+            self.close()
+            capacity = max(size * GROWTH, 1)
+            self._memory = shared_memory.SharedMemory(
+                create=True, size=capacity * 8
+                )
+            self._array = np.ndarray(
+                capacity, dtype=np.float64, buffer=self._memory.buf
+                )
+
+        self.generation += 1
+        self._array[0] = 0
+        offset = HEADER
+        for columns, names in (
+                (world.bounties, BOUNTY_COLUMNS),
+                (world.enemies, ENEMY_COLUMNS),
+                (world.wanted, ENEMY_COLUMNS),
+                (world.anomalies, ANOMALY_COLUMNS)):
+            count = len(columns)
+            for name in names:
+                self._array[offset:offset + count] = getattr(columns, name)
+                offset += count
+        self._array[0] = self.generation
+        return self._memory.name, self.generation, lengths
+
+    def close(self):
+        """Освобождает блок общей памяти."""
+        if self._memory is None:
+            return
+        self._array = None
+        self._memory.close()
+        self._memory.unlink()
+        self._memory = None
+
+
+# Состояние процесса пула: подключенный блок и мир последней публикации
+_attached = {'name': None, 'memory': None, 'generation': None}
+
+
+def _attach(descriptor, scalars, anomaly_ids):
+    """
+    Собирает World из общей памяти (в процессе пула).
+
+    Мир и индекс кэшируются до следующей публикации, поэтому все части
+    одного тика, попавшие в процесс, разделяют их.
+    """
+    name, generation, lengths = descriptor
+    if _attached['generation'] == generation and _attached['name'] == name:
+        return _attached['world'], _attached['index']
+    if _attached['name'] != name:
+        _attached.pop('world', None)
+        _attached.pop('index', None)
+        if _attached['memory'] is not None:
+            _attached['memory'].close()
+        _attached['memory'] = shared_memory.SharedMemory(name=name)
+        _attached['name'] = name
+        # Блоком владеет основной процесс: без этого трекер ресурсов
+        # процесса пула удалил бы блок (или предупреждал) при выходе
+        resource_tracker.unregister(
+            _attached['memory']._name, 'shared_memory'
+            )
+
+    size = len(_attached['memory'].buf) // 8
+    array = np.ndarray(
+        size, dtype=np.float64, buffer=_attached['memory'].buf
+        )
+    _attached['array'] = array
+    offset = HEADER
+    groups = []
+    for count, names in zip(lengths, (
+            BOUNTY_COLUMNS, ENEMY_COLUMNS, ENEMY_COLUMNS, ANOMALY_COLUMNS)):
+        columns = []
+        for _ in names:
+            columns.append(array[offset:offset + count])
+            offset += count
+        groups.append(columns)
+    bounties, enemies, wanted, anomalies = groups
+    enemies[-1] = enemies[-1].astype(bool)
+    wanted[-1] = wanted[-1].astype(bool)
+
+    world = World(
+        transports=[], bounties=Bounties(*bounties),
+        enemies=Enemies(*enemies), wanted=Enemies(*wanted),
+        anomalies=Anomalies(anomaly_ids, *anomalies), **scalars
+        )
+    index = WorldIndex(world)
+    _attached.update(generation=generation, world=world, index=index)
+    return world, index
+
+
+def _current(descriptor):
+    """
+    Проверяет, что блок еще хранит публикацию из описания (в процессе
+    пула, подключенном к этому блоку).
+    """
+    return _attached['array'][0] == descriptor[1]
+
+
+def _evaluate(descriptor, scalars, anomaly_ids, transports, evaluate):
+    """
+    Рассчитывает команды части транспортов (в процессе пула).
+
+    Возвращает:
+    list: Команды транспортов части либо None, если публикация
+    устарела до или во время расчета.
+    """
+    world, index = _attach(descriptor, scalars, anomaly_ids)
+    if not _current(descriptor):
+        # Опоздавшая задача прошлого тика: мир и индекс могли быть
+        # собраны из переписанного блока
+        _attached['generation'] = None
+        return None
+    try:
+        commands = [
+            evaluate(world, index, transport) for transport in transports
+            ]
+    except Exception:
+        if _current(descriptor):
+            raise
+        commands = None
+    if not _current(descriptor):
+        _attached['generation'] = None
+        return None
+    return commands
+
+
+def _ready(_):
+    return os.getpid()
+
+
+class ParallelController:
+    """
+    Расчет команд в пуле процессов со сроком и резервом.
+
+    Транспорты делятся между процессами по кругу (i-й транспорт —
+    в часть i % workers), результаты частей раскладываются обратно
+    по позициям. Если часть не завершилась за deadline секунд или
+    упала, ее транспорты управляются жадным control_transport.
+
+    Параметры:
+    workers (int): Число процессов.
+    deadline (float): Срок расчета в секундах от начала control.
+    evaluate (callable): Функция (world, index, transport) -> команда,
+    определенная на уровне модуля.
+
+    Атрибуты:
+    ticks (int): Число вызовов control.
+    fallbacks (int): Сколько команд рассчитано резервным способом.
+    errors (int): Число частей, завершившихся исключением.
+    """
+
+    def __init__(self, workers=WORKERS, deadline=DEADLINE_SECONDS,
+                 evaluate=greedy_plan):
+        self.workers = workers
+        self.deadline = deadline
+        self.evaluate = evaluate
+        self._executor = concurrent.futures.ProcessPoolExecutor(workers)
+        self._shared = SharedWorld()
+        self.ticks = 0
+        self.fallbacks = 0
+        self.errors = 0
+        # Процессы запускаются заранее, а не в первом тике
+        list(self._executor.map(_ready, range(workers)))
+
+    def control(self, world, index=None, threat=None):
+        """
+        Рассчитывает команды транспортов (замена control_transports).
+
+        Карта угроз в процессы не передается: цели в них выбираются
+        без нее, а решение о щите по ней принимается здесь, в основном
+        процессе, для всех команд.
+
+        Параметры:
+        world (World): Состояние мира.
+        index (WorldIndex): Пространственный индекс (для резерва).
+        threat (ThreatMap): Карта угроз (опционально).
+
+        Возвращает:
+        list: Команды в порядке world.transports.
+        """
+        deadline = time.monotonic() + self.deadline
+        self.ticks += 1
+        transports = world.transports
+        descriptor = self._shared.publish(world)
+        scalars = {name: getattr(world, name) for name in SCALAR_FIELDS}
+
+        futures = {}
+        for part in range(min(self.workers, len(transports))):
+            positions = range(part, len(transports), self.workers)
+            future = self._executor.submit(
+                _evaluate, descriptor, scalars, world.anomalies.ids,
+                [transports[position] for position in positions],
+                self.evaluate
+                )
+            futures[future] = positions
+
+        done, pending = concurrent.futures.wait(
+            futures, timeout=max(deadline - time.monotonic(), 0)
+            )
+        commands = [None] * len(transports)
+        for future in done:
+            if future.exception() is not None:
+                self.errors += 1
+                continue
+            if future.result() is None:
+                # Публикация устарела: транспорты уйдут в резерв
+                continue
+            for position, command in zip(futures[future], future.result()):
+                commands[position] = command
+        for future in pending:
+            future.cancel()
+
+        missing = [
+            position for position, command in enumerate(commands)
+            if command is None
+            ]
+        if missing:
+            if index is None:
+                index = WorldIndex(world)
+            for position in missing:
+                commands[position] = control_transport(
+                    world, transports[position], index, threat=threat
+                    )[0]
+            self.fallbacks += len(missing)
+        if threat is not None:
+            for transport, command in zip(transports, commands):
+                command['activateShield'] = need_shield(
+                    transport, threat.danger(transport.x, transport.y)
+                    )
+        return commands
+
+    def close(self):
+        """Останавливает пул и освобождает общую память."""
+        self._executor.shutdown(cancel_futures=True)
+        self._shared.close()
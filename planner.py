@@ -0,0 +1,321 @@
+import math
+import time
+
+import numpy as np
+
+from force_field import FieldGrid
+from motion_control import build_command, choose_target, plan_motion
+from prediction import TICK_SECONDS
+
+# Жесткий бюджет планирования на тик (секунды)
+BUDGET_SECONDS = 0.02
+# Сколько первых тиков держится проверяемое ускорение; дальше
+# транспорт ведет себя как преследователь, и прогноз идет крупными
+# шагами: при maxAccel порядка 10 разворот занимает десятки тиков
+HOLD_TICKS = 3
+# Первые тики прогноза считаются с шагом тика, и сбор монеты
+# проверяется в точках тиков, как на сервере
+FINE_TICKS = 15
+HORIZON_SECONDS = 20.0
+COARSE_SECONDS = 1.0
+# Число направлений ускорения в первом проходе и кандидатов
+# в каждом следующем (уточняющем) проходе
+DIRECTIONS = 16
+REFINE_CANDIDATES = 16
+# Начальный разброс уточнения: угол (радианы) и доля maxAccel;
+# с каждым проходом разброс уменьшается вдвое
+REFINE_ANGLE = math.pi / 8
+REFINE_MAGNITUDE = 0.25
+# Оценка исхода: награда за сбор монеты, штраф за каждую секунду
+# до сбора и за выход за пределы карты
+REACH_REWARD = 10000.0
+SECOND_PENALTY = 300.0
+OUTSIDE_PENALTY = 100000.0
+# Насколько вариант должен быть лучше ускорения plan_motion, чтобы
+# заменить его (модель не знает о врагах и смене цели)
+KEEP_MARGIN = 300.0
+# Доля, на которую оценка длительности прохода снижается за тик
+PASS_DECAY = 0.1
+
+
+class RolloutPlanner:
+    """
+    Планировщик ускорений с прогоном вариантов вперед и бюджетом времени.
+
+    Для каждого транспорта цель выбирается как обычно (choose_target
+    либо TargetCache), а ускорение — перебором: каждый вариант держится
+    HOLD_TICKS тиков, затем транспорт разгоняется к цели и тормозит так,
+    чтобы подойти к монете со скоростью не выше радиуса сбора за тик.
+    Движение прогоняется на HORIZON_SECONDS по той же модели, что
+    в prediction.extrapolate, с ограничением maxSpeed и полем аномалий
+    (FieldGrid.sample по сетке, обновляемой раз в тик; аномалии
+    на горизонте считаются неподвижными): первые
+    FINE_TICKS тиков — с шагом тика и проверкой сбора в точках тиков,
+    как на сервере, дальше — шагами COARSE_SECONDS. Чем раньше собрана
+    монета, тем выше оценка; несобравшие варианты сравниваются по
+    наименьшему расстоянию до нее.
+
+    Все транспорты и варианты считаются одним векторизованным прогоном.
+    Первый проход — ускорение из plan_motion, ноль и DIRECTIONS
+    направлений с maxAccel; пока остается бюджет, следующие проходы
+    уточняют лучший вариант каждого транспорта со все меньшим разбросом.
+    Ускорение plan_motion заменяется, только если вариант лучше него
+    больше чем на KEEP_MARGIN. Проход запускается, только если по оценке
+    длительности прошлых проходов он успеет до конца бюджета, и
+    прерывается (без учета его результатов), если срок все же истек;
+    при нехватке времени остается ускорение plan_motion.
+
+    Параметры:
+    budget (float): Бюджет на тик в секундах.
+    cache (TargetCache): Закрепление целей (опционально).
+    seed (int): Начальное значение генератора вариантов уточнения.
+
+    Атрибуты:
+    field (FieldGrid): Сетка поля аномалий (создается в первом тике).
+    passes (int): Число проходов в последнем тике.
+    evaluated (int): Число прогнанных вариантов в последнем тике.
+    """
+
+    def __init__(self, budget=BUDGET_SECONDS, cache=None, seed=0):
+        self.budget = budget
+        self.cache = cache
+        self._rng = np.random.default_rng(seed)
+        self._pass_seconds = 0.0
+        self.field = None
+        self.passes = 0
+        self.evaluated = 0
+
+    def control(self, world, index, threat=None):
+        """
+        Рассчитывает команды транспортов (замена control_transports).
+
+        Параметры:
+        world (World): Состояние мира.
+        index (WorldIndex): Пространственный индекс этого состояния.
+        threat (ThreatMap): Карта угроз этого состояния (опционально).
+
+        Возвращает:
+        list: Команды в порядке world.transports.
+        """
+        deadline = time.perf_counter() + self.budget
+        choose = choose_target if self.cache is None else self.cache.choose
+        bounties = world.bounties
+        accelerations = []
+        planned = []
+        for transport in world.transports:
+            direction = (transport.vx + transport.anomaly_ax,
+                         transport.vy + transport.anomaly_ay)
+            target = choose(transport, direction, bounties, index, threat)
+            acceleration, _ = plan_motion(world, transport, index, target)
+            accelerations.append(acceleration)
+            if target >= 0 and transport.status == 'alive':
+                planned.append((len(accelerations) - 1, transport, target))
+
+        self.passes = 0
+        self.evaluated = 0
+        if planned:
+            if self.field is None:
+                self.field = FieldGrid(world.map_width, world.map_height)
+            self.field.update(world.anomalies)
+            self._search(world, planned, accelerations, deadline)
+        return [
+            build_command(world, transport, index, acceleration, threat)
+            for transport, acceleration in zip(
+                world.transports, accelerations
+                )
+            ]
+
+    def _search(self, world, planned, accelerations, deadline):
+        """
+        Перебирает варианты ускорений, пока не истечет бюджет,
+        и записывает лучшие в accelerations.
+        """
+        count = len(planned)
+        max_accel = world.max_accel
+        state = np.array([
+            (t.x, t.y, t.vx, t.vy, world.bounties.x[target],
+             world.bounties.y[target],
+             world.bounties.radius[target] + world.transport_radius)
+            for _, t, target in planned
+            ], dtype=float).T
+        heuristic = np.array([
+            (accelerations[position]['x'], accelerations[position]['y'])
+            for position, _, _ in planned
+            ], dtype=float)
+
+        angles = np.linspace(0, 2 * math.pi, DIRECTIONS, endpoint=False)
+        ax = np.concatenate((
+            heuristic[:, :1], np.zeros((count, 1)),
+            np.broadcast_to(max_accel * np.cos(angles), (count, DIRECTIONS))
+            ), axis=1)
+        ay = np.concatenate((
+            heuristic[:, 1:], np.zeros((count, 1)),
+            np.broadcast_to(max_accel * np.sin(angles), (count, DIRECTIONS))
+            ), axis=1)
+
+        best_score = np.full(count, -np.inf)
+        best_ax = heuristic[:, 0].copy()
+        best_ay = heuristic[:, 1].copy()
+        spread = 1.0
+        # Оценка длительности прохода снижается каждый тик, чтобы
+        # одиночный выброс не отключал перебор надолго
+        self._pass_seconds *= 1 - PASS_DECAY
+        while True:
+            started = time.perf_counter()
+            # Следующий проход запускается, только если он успеет
+            if started + self._pass_seconds > deadline:
+                break
+            score = self._rollout(world, state, ax, ay, deadline)
+            if score is None:
+                break
+            if not self.passes:
+                # Первый столбец первого прохода — ускорение plan_motion
+                score[:, 0] += KEEP_MARGIN
+            choice = np.argmax(score, axis=1)
+            rows = np.arange(count)
+            improved = score[rows, choice] > best_score
+            best_score = np.where(improved, score[rows, choice], best_score)
+            best_ax = np.where(improved, ax[rows, choice], best_ax)
+            best_ay = np.where(improved, ay[rows, choice], best_ay)
+            self.passes += 1
+            self.evaluated += ax.size
+            # и сразу растет до замеренной длительности
+            self._pass_seconds = max(
+                self._pass_seconds, time.perf_counter() - started
+                )
+
+            # Уточнение вокруг лучших вариантов
+            angle = np.arctan2(best_ay, best_ax)[:, None] + (
+                self._rng.uniform(-1, 1, (count, REFINE_CANDIDATES))
+                * REFINE_ANGLE * spread
+                )
+            magnitude = np.clip(
+                np.hypot(best_ax, best_ay)[:, None] + (
+                    self._rng.uniform(-1, 1, (count, REFINE_CANDIDATES))
+                    * REFINE_MAGNITUDE * max_accel * spread
+                    ),
+                0, max_accel
+                )
+            ax = magnitude * np.cos(angle)
+            ay = magnitude * np.sin(angle)
+            spread /= 2
+
+        for (position, _, _), x, y in zip(planned, best_ax, best_ay):
+            accelerations[position] = {'x': float(x), 'y': float(y)}
+
+    def _rollout(self, world, state, first_ax, first_ay, deadline):
+        """
+        Прогоняет варианты вперед и оценивает их.
+
+        Параметры:
+        world (World): Состояние мира.
+        state (ndarray): Столбцы x, y, vx, vy, цель x, цель y и радиус
+        сбора для каждого транспорта, форма (7, T).
+        first_ax, first_ay (ndarray): Проверяемые ускорения, форма (T, K).
+        deadline (float): Момент perf_counter, после которого прогон
+        прерывается.
+
+        Возвращает:
+        ndarray: Оценки вариантов, форма (T, K), либо None, если прогон
+        прерван.
+        """
+        max_speed = world.max_speed
+        max_accel = world.max_accel
+        shape = first_ax.shape
+        x, y, vx, vy, target_x, target_y, reach = (
+            np.broadcast_to(column[:, None], shape).copy()
+            for column in state
+            )
+        # Скорость, при которой за тик транспорт смещается не больше
+        # радиуса сбора и потому не пролетает монету между тиками
+        arrival = reach / TICK_SECONDS
+        reached_at = np.full(shape, np.inf)
+        closest = np.hypot(target_x - x, target_y - y)
+        outside = np.zeros(shape, dtype=bool)
+        elapsed = 0.0
+        for step, dt in enumerate(_steps()):
+            if time.perf_counter() > deadline:
+                return None
+            field_ax, field_ay = self.field.sample(x, y)
+            if step < HOLD_TICKS:
+                ax, ay = first_ax, first_ay
+            else:
+                # Преследование: скорость к цели не выше той, с которой
+                # транспорт успеет замедлиться до arrival у монеты
+                dx = target_x - x
+                dy = target_y - y
+                distance = np.maximum(np.hypot(dx, dy), 1e-9)
+                speed = np.minimum(max_speed, np.sqrt(
+                    arrival * arrival + 2 * max_accel * distance
+                    ))
+                ax = (dx / distance * speed - vx) / dt - field_ax
+                ay = (dy / distance * speed - vy) / dt - field_ay
+                norm = np.hypot(ax, ay)
+                scale = np.where(
+                    norm > max_accel, max_accel / np.maximum(norm, 1e-12), 1.0
+                    )
+                ax = ax * scale
+                ay = ay * scale
+            total_ax = ax + field_ax
+            total_ay = ay + field_ay
+            next_x = x + vx * dt + total_ax * dt * dt / 2
+            next_y = y + vy * dt + total_ay * dt * dt / 2
+            vx = vx + total_ax * dt
+            vy = vy + total_ay * dt
+            speed = np.hypot(vx, vy)
+            scale = np.where(
+                speed > max_speed, max_speed / np.maximum(speed, 1e-12), 1.0
+                )
+            vx = vx * scale
+            vy = vy * scale
+
+            # Ближайшая к монете точка отрезка шага; монета считается
+            # собранной, если транспорт проходит ее не быстрее arrival
+            segment_x = next_x - x
+            segment_y = next_y - y
+            length = segment_x * segment_x + segment_y * segment_y
+            along = np.clip(
+                ((target_x - x) * segment_x + (target_y - y) * segment_y)
+                / np.maximum(length, 1e-12), 0, 1
+                )
+            distance = np.hypot(
+                x + segment_x * along - target_x,
+                y + segment_y * along - target_y
+                )
+            closest = np.minimum(closest, distance)
+            if step < FINE_TICKS:
+                distance = np.hypot(next_x - target_x, next_y - target_y)
+                passed = distance <= reach
+                along = 1.0
+            else:
+                passed = (distance <= reach) & (
+                    np.sqrt(length) <= arrival * dt
+                    )
+            reached_at = np.where(
+                passed & np.isinf(reached_at), elapsed + along * dt,
+                reached_at
+                )
+            x = next_x
+            y = next_y
+            elapsed += dt
+            outside |= (
+                (x < 0) | (y < 0) | (x > world.map_width)
+                | (y > world.map_height)
+                )
+
+        return np.where(
+            np.isfinite(reached_at),
+            REACH_REWARD - reached_at * SECOND_PENALTY,
+            -closest
+            ) - outside * OUTSIDE_PENALTY
+
+
+def _steps():
+    """
+    Длительности шагов прогноза: FINE_TICKS тиков, затем крупные шаги
+    до HORIZON_SECONDS.
+    """
+    steps = [TICK_SECONDS] * FINE_TICKS
+    remaining = HORIZON_SECONDS - TICK_SECONDS * FINE_TICKS
+    steps += [COARSE_SECONDS] * max(int(round(remaining / COARSE_SECONDS)), 0)
+    return steps
@@ -0,0 +1,240 @@
+import math
+
+import numpy as np
+
+from motion_control import build_command, control_transports, plan_motion
+from spatial_index import WorldIndex
+from world import Anomalies, Enemies, Transport
+
+# Номинальная длительность тика сервера в секундах; скорости в ответе
+# заданы в единицах карты за секунду (ср. упреждение v / 3 при атаке)
+TICK_SECONDS = 1 / 3
+# Допустимое расхождение прогноза и фактического состояния транспорта
+POSITION_TOLERANCE = 5.0
+VELOCITY_TOLERANCE = 2.0
+ACCELERATION_TOLERANCE = 1.0
+
+
+def extrapolate(world, commands, dt=TICK_SECONDS):
+    """
+    Экстраполирует состояние мира на dt секунд вперед.
+
+    Транспорты движутся с суммой отправленного ускорения и ускорения
+    от аномалий, скорость ограничивается maxSpeed. Враги, разыскиваемые
+    цели и аномалии смещаются по своим скоростям, таймеры щитов и
+    перезарядок уменьшаются. Монеты не изменяются.
+
+    Параметры:
+    world (World): Исходное состояние.
+    commands (list): Команды, отправленные серверу в этом тике.
+    dt (float): Шаг экстраполяции в секундах.
+
+    Возвращает:
+    World: Предсказанное состояние.
+    """
+    elapsed_ms = dt * 1000
+    commands_by_id = {command['id']: command for command in commands}
+    transports = []
+    for transport in world.transports:
+        command = commands_by_id.get(transport.id)
+        if command is not None:
+            self_ax = command['acceleration']['x']
+            self_ay = command['acceleration']['y']
+        else:
+            self_ax, self_ay = transport.self_ax, transport.self_ay
+        ax = self_ax + transport.anomaly_ax
+        ay = self_ay + transport.anomaly_ay
+
+        vx = transport.vx + ax * dt
+        vy = transport.vy + ay * dt
+        speed = math.hypot(vx, vy)
+        if speed > world.max_speed:
+            vx *= world.max_speed / speed
+            vy *= world.max_speed / speed
+
+        shield_left_ms = max(transport.shield_left_ms - elapsed_ms, 0)
+        shield_cooldown_ms = max(transport.shield_cooldown_ms - elapsed_ms, 0)
+        attack_cooldown_ms = max(transport.attack_cooldown_ms - elapsed_ms, 0)
+        if command is not None:
+            if command['activateShield'] and transport.shield_cooldown_ms == 0:
+                shield_left_ms = world.shield_time_ms
+                shield_cooldown_ms = world.shield_cooldown_ms
+            if 'attack' in command:
+                attack_cooldown_ms = world.attack_cooldown_ms
+
+        transports.append(Transport(
+            transport.id,
+            transport.x + transport.vx * dt + ax * dt * dt / 2,
+            transport.y + transport.vy * dt + ay * dt * dt / 2,
+            vx, vy, self_ax, self_ay,
+            transport.anomaly_ax, transport.anomaly_ay,
+            transport.health, transport.status, transport.death_count,
+            shield_left_ms, shield_cooldown_ms, attack_cooldown_ms
+            ))
+
+    return world.replace(
+        transports=transports,
+        enemies=_advance_enemies(world.enemies, dt),
+        wanted=_advance_enemies(world.wanted, dt),
+        anomalies=Anomalies(
+            world.anomalies.ids,
+            world.anomalies.x + world.anomalies.vx * dt,
+            world.anomalies.y + world.anomalies.vy * dt,
+            world.anomalies.radius, world.anomalies.effective_radius,
+            world.anomalies.strength,
+            world.anomalies.vx, world.anomalies.vy
+            )
+        )
+
+
+def _advance_enemies(enemies, dt):
+    return Enemies(
+        enemies.x + enemies.vx * dt, enemies.y + enemies.vy * dt,
+        enemies.vx, enemies.vy, enemies.health, enemies.kill_bounty,
+        np.maximum(enemies.shield_left_ms - dt * 1000, 0), enemies.alive
+        )
+
+
+class SpeculativeController:
+    """
+    Спекулятивный расчет команд следующего тика.
+
+    Пока запрос move находится в пути, speculate экстраполирует
+    последнее состояние на тик вперед и заранее рассчитывает ускорения
+    транспортов. Когда приходит фактическое состояние, resolve проверяет
+    прогноз: ускорение транспорта переиспользуется, если его положение
+    и скорость совпали с прогнозом в пределах допусков, а целевая монета
+    еще на карте; иначе ускорение пересчитывается. Щит и атака всегда
+    решаются по фактическому состоянию — это дешевые проверки.
+
+    Другой способ расчета команд (планировщик, распределение монет,
+    пул процессов, карта угроз, выбор точек атаки) решает за все
+    транспорты сразу, поэтому его команды по прогнозу переиспользуются
+    только целиком: если прогноз подтвержден для всех транспортов,
+    а монеты на карте не изменились. Иначе команды рассчитываются этим
+    же способом по фактическому состоянию.
+
+    Параметры:
+    control (callable): Расчет команд control(world, index) (по умолчанию
+    control_transports с проверкой прогноза по каждому транспорту).
+    position_tolerance (float): Допуск по положению транспорта.
+    velocity_tolerance (float): Допуск по скорости транспорта.
+
+    Атрибуты:
+    reused (int): Сколько раз прогноз был подтвержден.
+    recomputed (int): Сколько раз ускорение пришлось пересчитать.
+    """
+
+    def __init__(self, control=control_transports,
+                 position_tolerance=POSITION_TOLERANCE,
+                 velocity_tolerance=VELOCITY_TOLERANCE):
+        self.control = None if control is control_transports else control
+        self.position_tolerance = position_tolerance
+        self.velocity_tolerance = velocity_tolerance
+        self._plans = {}
+        self._speculated = None
+        self.reused = 0
+        self.recomputed = 0
+
+    def speculate(self, world, commands, dt=TICK_SECONDS):
+        """
+        Рассчитывает ускорения по экстраполированному состоянию.
+
+        Параметры:
+        world (World): Последнее полученное состояние.
+        commands (list): Команды, отправленные с текущим запросом.
+        dt (float): Ожидаемое время до следующего состояния в секундах.
+
+        Возвращает:
+        World: Предсказанное состояние.
+        """
+        predicted = extrapolate(world, commands, dt)
+        index = WorldIndex(predicted)
+        if self.control is not None:
+            self._speculated = (
+                predicted, self.control(predicted, index)
+                )
+            return predicted
+        self._plans = {
+            transport.id: (
+                transport, *plan_motion(predicted, transport, index)
+                )
+            for transport in predicted.transports
+            }
+        return predicted
+
+    def resolve(self, world, index):
+        """
+        Проверяет прогноз по фактическому состоянию и собирает команды.
+
+        Параметры:
+        world (World): Фактическое состояние, полученное от сервера.
+        index (WorldIndex): Пространственный индекс этого состояния.
+
+        Возвращает:
+        list: Команды для транспортов (см. control_transports).
+        """
+        if self.control is not None:
+            return self._resolve_control(world, index)
+        commands = []
+        for transport in world.transports:
+            plan = self._plans.get(transport.id)
+            if plan is not None and self._confirmed(plan, transport, index):
+                acceleration = plan[1]
+                self.reused += 1
+            else:
+                acceleration, _ = plan_motion(world, transport, index)
+                self.recomputed += 1
+            commands.append(
+                build_command(world, transport, index, acceleration)
+                )
+        self._plans = {}
+        return commands
+
+    def _resolve_control(self, world, index):
+        """Команды заданного способа расчета: по прогнозу или заново."""
+        speculated = self._speculated
+        self._speculated = None
+        if speculated is not None:
+            predicted, commands = speculated
+            expected = {
+                transport.id: transport for transport in predicted.transports
+                }
+            confirmed = (
+                len(expected) == len(world.transports)
+                and np.array_equal(predicted.bounties.x, world.bounties.x)
+                and np.array_equal(predicted.bounties.y, world.bounties.y)
+                and all(
+                    transport.id in expected
+                    and self._matches(expected[transport.id], transport)
+                    for transport in world.transports
+                    )
+                )
+            if confirmed:
+                self.reused += len(commands)
+                return commands
+        self.recomputed += len(world.transports)
+        return self.control(world, index)
+
+    def _confirmed(self, plan, transport, index):
+        predicted, _, target = plan
+        if target is None:
+            return False
+        if not self._matches(predicted, transport):
+            return False
+        still_there, _ = index.bounties.within(target[0], target[1], 0)
+        return len(still_there) > 0
+
+    def _matches(self, predicted, transport):
+        """Совпадает ли транспорт с прогнозом в пределах допусков."""
+        if math.hypot(predicted.x - transport.x,
+                      predicted.y - transport.y) > self.position_tolerance:
+            return False
+        if math.hypot(predicted.vx - transport.vx,
+                      predicted.vy - transport.vy) > self.velocity_tolerance:
+            return False
+        if math.hypot(predicted.anomaly_ax - transport.anomaly_ax,
+                      predicted.anomaly_ay - transport.anomaly_ay
+                      ) > ACCELERATION_TOLERANCE:
+            return False
+        return True
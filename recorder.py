@@ -0,0 +1,209 @@
+"""
+Запись игровых сессий и их воспроизведение.
+
+Recorder дописывает каждый ответ сервера и отправленные с запросом
+команды в файл кадров <path>.frames, а смещения кадров — в индекс
+<path>.index с записями фиксированного размера. Replayer отображает оба
+файла в память (mmap) и дает доступ к любому тику за O(1).
+
+Запуск:
+    python recorder.py SESSION                 # прогон бота по записи
+    python recorder.py SESSION --render        # с отрисовкой в viewer
+    python recorder.py SESSION --dump 120 > tick.json
+"""
+import argparse
+import json
+import mmap
+import os
+import sys
+import time
+
+import numpy as np
+
+from decoder import decode_world, loads
+
+# Запись индекса: смещение кадра, длины ответа и команд, время получения
+INDEX_DTYPE = np.dtype([
+    ('offset', '<u8'), ('response', '<u4'), ('commands', '<u4'),
+    ('time', '<f8')
+    ])
+
+
+class Recorder:
+    """
+    Запись ответов сервера и команд в файл кадров с индексом.
+
+    Кадр — это тело ответа как есть и следом команды, отправленные
+    в запросе, получившем этот ответ, в виде JSON. Оба файла только
+    дописываются и сбрасываются на диск после каждого кадра, поэтому
+    запись переживает аварийное завершение бота.
+
+    Параметры:
+    path (str): Путь к сессии без расширения.
+
+    Атрибуты:
+    frames (int): Сколько кадров записано этим объектом.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._frames = open(path + '.frames', 'ab')
+        self._index = open(path + '.index', 'ab')
+        self._offset = self._frames.tell()
+        self._record = np.zeros(1, dtype=INDEX_DTYPE)
+        self.frames = 0
+
+    def record(self, raw, commands):
+        """
+        Дописывает кадр.
+
+        Параметры:
+        raw (bytes): Тело ответа сервера.
+        commands (list): Команды, отправленные в запросе.
+        """
+        encoded = json.dumps(commands, separators=(',', ':')).encode()
+        self._frames.write(raw)
+        self._frames.write(encoded)
+        self._frames.flush()
+        record = self._record
+        record['offset'] = self._offset
+        record['response'] = len(raw)
+        record['commands'] = len(encoded)
+        record['time'] = time.time()
+        self._index.write(record.tobytes())
+        self._index.flush()
+        self._offset += len(raw) + len(encoded)
+        self.frames += 1
+
+    def close(self):
+        """Закрывает файлы записи."""
+        self._frames.close()
+        self._index.close()
+
+
+class Replayer:
+    """
+    Воспроизведение записанной сессии через отображение файлов в память.
+
+    Параметры:
+    path (str): Путь к сессии без расширения.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path + '.frames', 'rb')
+        if os.fstat(self._file.fileno()).st_size:
+            self._data = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ
+                )
+        else:
+            self._data = b''
+        size = os.path.getsize(path + '.index')
+        count = size // INDEX_DTYPE.itemsize
+        if count:
+            self.index = np.memmap(
+                path + '.index', dtype=INDEX_DTYPE, mode='r',
+                shape=(count,)
+                )
+        else:
+            self.index = np.zeros(0, dtype=INDEX_DTYPE)
+        self._position = 0
+
+    def __len__(self):
+        return len(self.index)
+
+    def raw(self, tick):
+        """
+        Возвращает тело ответа сервера для тика.
+
+        Параметры:
+        tick (int): Номер тика в записи.
+
+        Возвращает:
+        bytes: Тело ответа.
+        """
+        record = self.index[tick]
+        start = int(record['offset'])
+        return self._data[start:start + int(record['response'])]
+
+    def world(self, tick):
+        """Возвращает состояние мира (World) для тика."""
+        return decode_world(self.raw(tick))
+
+    def commands(self, tick):
+        """
+        Возвращает команды, отправленные в запросе, получившем ответ тика.
+        """
+        record = self.index[tick]
+        start = int(record['offset']) + int(record['response'])
+        return loads(self._data[start:start + int(record['commands'])])
+
+    def fetch(self, transports):
+        """
+        Замена fetch_map_data: возвращает следующий записанный тик.
+
+        Параметры:
+        transports (list): Команды (не влияют на запись).
+
+        Возвращает:
+        World: Состояние следующего тика либо None в конце записи.
+        """
+        if self._position >= len(self):
+            return None
+        world = self.world(self._position)
+        self._position += 1
+        return world
+
+    def close(self):
+        """Освобождает отображение и файл."""
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self.index = None
+        self._file.close()
+
+
+def main():
+    from motion_control import control_transports
+
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+        )
+    parser.add_argument('path', help='путь к сессии без расширения')
+    parser.add_argument('--dump', type=int, metavar='TICK',
+                        help='вывести ответ сервера для тика')
+    parser.add_argument('--render', action='store_true',
+                        help='отрисовывать тики в Rewind Viewer')
+    args = parser.parse_args()
+
+    replayer = Replayer(args.path)
+    if args.dump is not None:
+        sys.stdout.buffer.write(replayer.raw(args.dump))
+        return
+
+    renderer = None
+    if args.render:
+        from map_render import MapRenderer
+        from rewind_client import RewindClient
+        renderer = MapRenderer(RewindClient(batch=True))
+
+    from spatial_index import WorldIndex
+
+    differ = 0
+    start = time.perf_counter()
+    for tick in range(len(replayer)):
+        world = replayer.world(tick)
+        index = WorldIndex(world)
+        commands = control_transports(world, index)
+        if tick + 1 < len(replayer):
+            differ += commands != replayer.commands(tick + 1)
+        if renderer is not None:
+            renderer.draw(world, commands)
+    elapsed = time.perf_counter() - start
+    print(
+        f'Тиков: {len(replayer)}, {len(replayer) / elapsed:.0f} тиков/с, '
+        f'команды отличаются от записанных в {differ} тиках'
+        )
+
+
+if __name__ == '__main__':
+    main()
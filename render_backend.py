@@ -0,0 +1,262 @@
+"""
+Способы вывода кадров: Rewind Viewer по сокету, файл или никуда.
+
+Способ выбирается при запуске функцией make_backend. Модули
+визуализации (rewind_client, map_render) импортируются только
+при создании сокетного или файлового вывода, поэтому запуск без
+отрисовки их не загружает, а кадры не кодируются вовсе.
+"""
+import threading
+import time
+
+# Адрес Rewind Viewer
+VIEWER_HOST = '127.0.0.1'
+VIEWER_PORT = 9111
+# Таймаут подключения и отправки в Rewind Viewer (секунды): зависший
+# просмотрщик не задерживает поток отрисовки дольше
+VIEWER_TIMEOUT = 0.5
+# Пауза между попытками подключения (секунды)
+RECONNECT_SECONDS = 2.0
+# Файл кадров по умолчанию для файлового вывода
+FRAMES_PATH = 'frames.rewind'
+
+
+class NullBackend:
+    """
+    Вывод без отрисовки: кадры и сообщения отбрасываются.
+
+    Атрибуты:
+    enabled (bool): Нужны ли кадры этому выводу.
+    """
+
+    enabled = False
+
+    def message(self, text):
+        """Отбрасывает сообщение."""
+
+    def draw(self, world, transports):
+        """Отбрасывает кадр."""
+
+    def stats(self):
+        """Счетчики вывода (у пустого вывода их нет)."""
+        return {}
+
+    def close(self):
+        """Ничего не освобождает."""
+
+
+class FileBackend:
+    """
+    Запись кадров в файл в формате потока Rewind Viewer.
+
+    Файл содержит те же склеенные JSON-объекты, что ушли бы в сокет,
+    и может быть позже передан просмотрщику (например, через nc).
+
+    Параметры:
+    path (str): Путь к файлу кадров.
+
+    Атрибуты:
+    frames (int): Число записанных кадров.
+    """
+
+    enabled = True
+
+    def __init__(self, path=FRAMES_PATH):
+        from map_render import MapRenderer
+        from rewind_client import RewindClient
+
+        self._file = open(path, 'wb')
+        self.client = RewindClient(batch=True, sink=_FileSink(self._file))
+        self._map_renderer = MapRenderer(self.client)
+        self.frames = 0
+
+    def message(self, text):
+        """Добавляет сообщение к кадру."""
+        self.client.message(text)
+
+    def draw(self, world, transports):
+        """Записывает кадр."""
+        self._map_renderer.draw(world, transports)
+        self.frames += 1
+
+    def stats(self):
+        """Счетчики вывода."""
+        return {'frames': self.frames}
+
+    def close(self):
+        """Дописывает буфер и закрывает файл."""
+        self.client.close()
+
+
+class SocketBackend:
+    """
+    Отрисовка в Rewind Viewer с ленивым подключением.
+
+    Соединение не открывается при создании: первый кадр запускает
+    подключение в фоновом потоке, а пока его нет, кадры и сообщения
+    отбрасываются, и бот не ждет просмотрщик. При ошибке отправки
+    (просмотрщик закрыт или завис дольше VIEWER_TIMEOUT) соединение
+    закрывается и через RECONNECT_SECONDS открывается заново в фоне.
+    Кадр после переподключения рисуется целиком: постоянный слой
+    и кэш закодированных объектов относятся к прежнему соединению.
+
+    Параметры:
+    host (str): Адрес Rewind Viewer.
+    port (int): Порт Rewind Viewer.
+
+    Атрибуты:
+    frames (int): Число отправленных кадров.
+    skipped (int): Сколько кадров отброшено без соединения.
+    connects (int): Число успешных подключений.
+    failures (int): Число неудачных подключений и оборванных соединений.
+    """
+
+    enabled = True
+
+    def __init__(self, host=VIEWER_HOST, port=VIEWER_PORT):
+        from map_render import MapRenderer
+        from rewind_client import RewindClient
+
+        self._make_client = lambda: RewindClient(
+            host, port, batch=True, timeout=VIEWER_TIMEOUT
+            )
+        self._make_renderer = MapRenderer
+        self._lock = threading.Lock()
+        self._client = None
+        self._map_renderer = None
+        self._connecting = False
+        self._retry_at = 0.0
+        self._closed = False
+        self.frames = 0
+        self.skipped = 0
+        self.connects = 0
+        self.failures = 0
+
+    def message(self, text):
+        """Добавляет сообщение к кадру, если есть соединение."""
+        client = self._client
+        if client is not None:
+            self._send(client, client.message, text)
+
+    def draw(self, world, transports):
+        """Отправляет кадр либо отбрасывает его без соединения."""
+        if self._client is None:
+            self.skipped += 1
+            self._connect_later()
+            return
+        if self._send(
+                self._client, self._map_renderer.draw, world, transports):
+            self.frames += 1
+
+    def _send(self, client, method, *args):
+        """
+        Вызывает метод отрисовки; при ошибке сокета рвет соединение.
+
+        Возвращает:
+        bool: Успешна ли отправка.
+        """
+        try:
+            method(*args)
+        except OSError:
+            self.failures += 1
+            self._disconnect(client)
+            return False
+        return True
+
+    def _connect_later(self):
+        """Запускает фоновое подключение, если оно еще не идет."""
+        with self._lock:
+            if (self._connecting or self._closed
+                    or time.monotonic() < self._retry_at):
+                return
+            self._connecting = True
+        threading.Thread(
+            target=self._connect, name='viewer-connect', daemon=True
+            ).start()
+
+    def _connect(self):
+        try:
+            client = self._make_client()
+        except OSError:
+            client = None
+        with self._lock:
+            self._connecting = False
+            if client is None:
+                self.failures += 1
+                self._retry_at = time.monotonic() + RECONNECT_SECONDS
+                return
+            if self._closed:
+                client.close()
+                return
+            # Новое соединение получает новый MapRenderer: рамка
+            # и кэш объектов должны уйти в него заново
+            self._map_renderer = self._make_renderer(client)
+            self._client = client
+            self.connects += 1
+
+    def _disconnect(self, client):
+        with self._lock:
+            if self._client is not client:
+                return
+            self._client = None
+            self._map_renderer = None
+            self._retry_at = time.monotonic() + RECONNECT_SECONDS
+        try:
+            client.close()
+        except OSError:
+            pass
+
+    def stats(self):
+        """Счетчики вывода."""
+        return {
+            'frames': self.frames, 'skipped': self.skipped,
+            'connects': self.connects, 'failures': self.failures,
+            }
+
+    def close(self):
+        """Закрывает соединение и останавливает переподключения."""
+        with self._lock:
+            self._closed = True
+            client = self._client
+        if client is not None:
+            self._disconnect(client)
+
+
+class _FileSink:
+    """Приемник RewindClient, пишущий в файл вместо сокета."""
+
+    def __init__(self, file):
+        self._file = file
+
+    def sendall(self, data):
+        self._file.write(data)
+
+    def close(self):
+        self._file.close()
+
+
+# Способы вывода по именам для make_backend
+BACKENDS = {
+    'socket': SocketBackend,
+    'file': FileBackend,
+    'null': NullBackend,
+    }
+
+
+def make_backend(name):
+    """
+    Создает способ вывода по имени.
+
+    Параметры:
+    name (str): 'socket', 'file' или 'null'.
+
+    Возвращает:
+    object: Вывод с методами message, draw, stats и close.
+    """
+    factory = BACKENDS.get(name)
+    if factory is None:
+        raise ValueError(
+            f'Неизвестный способ отрисовки {name!r}, '
+            f'допустимы: {", ".join(BACKENDS)}'
+            )
+    return factory()
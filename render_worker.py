@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import deque
+
+# Сколько последних задержек отрисовки хранится для статистики
+LATENCY_HISTORY = 256
+# Сколько ждать завершения потока при остановке (секунды)
+STOP_TIMEOUT = 1.0
+
+
+class RenderWorker:
+    """
+    Отрисовка и логирование в отдельном потоке.
+
+    Цикл управления передает в submit неизменяемый снимок кадра
+    (состояние мира и команды) и сразу продолжает работу.
+    Между циклом и потоком отрисовки находится очередь из одного места:
+    если поток еще не забрал предыдущий кадр, тот заменяется новым
+    и считается пропущенным, поэтому медленный или приостановленный
+    Rewind Viewer не копит очередь и не замедляет бота.
+
+    Параметры:
+    render (callable): Функция render(world, transports),
+    выполняющая отрисовку кадра.
+
+    Атрибуты:
+    submitted (int): Сколько кадров передано в поток.
+    rendered (int): Сколько кадров отрисовано.
+    dropped (int): Сколько кадров заменено более новыми до отрисовки.
+    errors (int): Сколько отрисовок завершилось исключением.
+    last_error (Exception): Последнее исключение отрисовки либо None.
+    latencies (deque): Время от передачи кадра до конца его отрисовки
+    в секундах по последним кадрам.
+    """
+
+    def __init__(self, render):
+        self._render = render
+        self._condition = threading.Condition()
+        self._slot = None
+        self._running = False
+        self._thread = None
+        self.submitted = 0
+        self.rendered = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_error = None
+        self.latencies = deque(maxlen=LATENCY_HISTORY)
+
+    def start(self):
+        """Запускает поток отрисовки."""
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name='render', daemon=True
+            )
+        self._thread.start()
+
+    def submit(self, world, transports):
+        """
+        Передает кадр на отрисовку, не дожидаясь ее.
+
+        Параметры:
+        world (World): Состояние мира.
+        transports (list): Команды транспортов; список не должен
+        изменяться после передачи.
+        """
+        frame = (time.perf_counter(), world, transports)
+        with self._condition:
+            if self._slot is not None:
+                self.dropped += 1
+            self._slot = frame
+            self.submitted += 1
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._slot is None and self._running:
+                    self._condition.wait()
+                if self._slot is None:
+                    return
+                submitted_at, world, transports = self._slot
+                self._slot = None
+            try:
+                self._render(world, transports)
+            except Exception as e:
+                self.errors += 1
+                self.last_error = e
+            else:
+                self.rendered += 1
+            self.latencies.append(time.perf_counter() - submitted_at)
+
+    def stats(self):
+        """
+        Сводка по работе потока отрисовки.
+
+        Возвращает:
+        dict: Счетчики кадров и ошибок, средняя и максимальная
+        задержка отрисовки в секундах по последним кадрам.
+        """
+        latencies = list(self.latencies)
+        return {
+            'submitted': self.submitted,
+            'rendered': self.rendered,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'mean': sum(latencies) / len(latencies) if latencies else None,
+            'max': max(latencies) if latencies else None,
+            }
+
+    def stop(self):
+        """
+        Останавливает поток после отрисовки уже переданного кадра.
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(STOP_TIMEOUT)
@@ -0,0 +1,171 @@
+import json
+from json.encoder import encode_basestring_ascii
+
+import _socket
+
+_BOOL = {True: 'true', False: 'false'}
+
+# Шаблоны примитивов фиксированной формы (координаты и радиусы — %s,
+# цвет — %d, признак заливки — 'true' или 'false', текст — строка JSON)
+LINE = '{"type":"polyline","points":[%s,%s,%s,%s],"color":%d}'
+CIRCLE = '{"type":"circle","p":[%s,%s],"r":%s,"color":%d,"fill":%s}'
+RECTANGLE = (
+    '{"type":"rectangle","tl":[%s,%s],"br":[%s,%s],"color":%d,"fill":%s}'
+    )
+CIRCLE_POPUP = '{"type":"popup","p":[%s,%s],"r":%s,"text":%s}'
+
+
+class RewindClient():
+    """
+    Клиент Rewind Viewer (JSON-объекты поверх TCP).
+
+    В пакетном режиме (batch=True) примитивы кадра не отправляются
+    по одному, а дописываются в общий буфер кадра, который склеивается
+    и уходит одним вызовом sendall в end_frame. Примитивы фиксированной
+    формы кодируются вручную без json.dumps; координаты, радиусы и цвета
+    должны быть числами (int, float или скалярами NumPy).
+
+    Вместо сокета поток можно направить в другой приемник (sink) —
+    объект с методами sendall(bytes) и close(), например файл.
+    """
+
+    RED = 0xff0000
+    GREEN = 0x00ff00
+    BLUE = 0x0000ff
+    PURPLE = 0xf000e9
+    YELLOW = 0xfff222
+    DARK_RED = 0x770000
+    DARK_GREEN = 0x007700
+    DARK_BLUE = 0x000077
+    DARK_PURPLE = 0x71006d
+    DARK_YELLOW = 0xA39B23
+    TRANSPARENT = 0x7f000000
+    INVISIBLE = 0x01000000
+
+    def __init__(self, host=None, port=None, batch=False, sink=None,
+                 timeout=None):
+        if sink is not None:
+            self._socket = sink
+        else:
+            self._socket = _socket.socket()
+            self._socket.setsockopt(
+                _socket.IPPROTO_TCP, _socket.TCP_NODELAY, True
+                )
+            if host is None:
+                host = "127.0.0.1"
+                port = 9111
+            if timeout is not None:
+                self._socket.settimeout(timeout)
+            try:
+                self._socket.connect((host, port))
+            except OSError:
+                self._socket.close()
+                raise
+        self.batch = batch
+        self._buffer = []
+        self._options = {}
+        if batch:
+            # Запись в буфер кадра без промежуточного вызова метода
+            self._write = self._buffer.append
+
+    @staticmethod
+    def _to_geojson(points):
+        flat = []
+        for p in points:
+            flat.append(p[0])
+            flat.append(p[1])
+        return flat
+
+    def _write(self, text):
+        """
+        Отправляет закодированный объект.
+
+        В пакетном режиме заменяется на добавление в буфер кадра.
+        """
+        if self._socket:
+            self._socket.sendall(text.encode('utf-8'))
+
+    def _send(self, obj):
+        self._write(json.dumps(obj))
+
+    def raw(self, text):
+        """
+        Отправляет заранее закодированные объекты (см. шаблоны LINE,
+        CIRCLE, RECTANGLE, CIRCLE_POPUP) как есть.
+        """
+        self._write(text)
+
+    def flush(self):
+        """
+        Отправляет накопленный буфер кадра одним вызовом sendall.
+        """
+        if self._buffer and self._socket:
+            self._socket.sendall(''.join(self._buffer).encode('utf-8'))
+        self._buffer.clear()
+
+    def line(self, x1, y1, x2, y2, color):
+        self._write(LINE % (x1, y1, x2, y2, color))
+
+    def polyline(self, points, color):
+        self._write(
+            '{"type":"polyline","points":[%s],"color":%d}'
+            % (','.join(map(str, RewindClient._to_geojson(points))), color)
+            )
+
+    def circle(self, x, y, radius, color, fill=False):
+        self._write(CIRCLE % (x, y, radius, color, _BOOL[bool(fill)]))
+
+    def rectangle(self, x1, y1, x2, y2, color, fill=False):
+        self._write(
+            RECTANGLE % (x1, y1, x2, y2, color, _BOOL[bool(fill)])
+            )
+
+    def triangle(self, p1, p2, p3, color, fill=False):
+        self._write(
+            '{"type":"triangle","points":[%s],"color":%d,"fill":%s}'
+            % (','.join(map(str, RewindClient._to_geojson([p1, p2, p3]))),
+               color, _BOOL[bool(fill)])
+            )
+
+    def circle_popup(self, x, y, radius, message):
+        self._write(
+            CIRCLE_POPUP % (x, y, radius, encode_basestring_ascii(message))
+            )
+
+    def rect_popup(self, tl, br, message):
+        self._send({
+            'type': 'popup',
+            'tl': RewindClient._to_geojson([tl]),
+            'br': RewindClient._to_geojson([br]),
+            'text': message
+        })
+
+    def message(self, msg):
+        self._write(
+            '{"type":"message","message":%s}' % encode_basestring_ascii(msg)
+            )
+
+    def set_options(self, layer=None, permanent=None):
+        key = (layer, permanent)
+        text = self._options.get(key)
+        if text is None:
+            data = {'type': 'options'}
+            if layer is not None:
+                data['layer'] = layer
+            if permanent is not None:
+                data['permanent'] = permanent
+            text = self._options[key] = json.dumps(data)
+        self._write(text)
+
+    def end_frame(self):
+        self._write('{"type":"end"}')
+        self.flush()
+
+    def close(self):
+        """
+        Отправляет остаток буфера и закрывает соединение.
+        """
+        try:
+            self.flush()
+        finally:
+            self._socket.close()
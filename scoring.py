@@ -0,0 +1,117 @@
+import numpy as np
+
+from calculations import cos_between_many, cos_threshold
+
+# Правила выбора монеты: узкий конус на средней дистанции
+# и широкий конус вблизи транспорта
+CAPTURE_ANGLE = 15
+CAPTURE_DISTANCE = 200
+CLOSE_ANGLE = 45
+CLOSE_DISTANCE = 50
+# Те же пороги угла в виде косинусов
+CAPTURE_COS = cos_threshold(CAPTURE_ANGLE)
+CLOSE_COS = cos_threshold(CLOSE_ANGLE)
+
+
+def score_matrix(origins, directions, targets, points):
+    """
+    Вычисляет матрицы расстояний, углов и очков для всех пар
+    транспорт-монета за один векторизованный проход.
+
+    Параметры:
+    origins (ndarray): Координаты транспортов, форма (T, 2).
+    directions (ndarray): Векторы движения транспортов, форма (T, 2).
+    targets (ndarray): Координаты монет, форма (B, 2).
+    points (ndarray): Очки монет, форма (B,).
+
+    Возвращает:
+    tuple: Матрицы (distance, angle, score) формы (T, B), где angle —
+    угол в градусах между направлением движения и вектором на монету,
+    а score — разность очков монеты и расстояния до неё.
+    """
+    distance, cos_angle, score = _score_cos(
+        origins, directions, targets, points
+        )
+    angle = np.degrees(np.arccos(cos_angle))
+    return distance, angle, score
+
+
+def _score_cos(origins, directions, targets, points):
+    """
+    То же, что score_matrix, но вместо углов возвращает их косинусы.
+    """
+    dx = targets[:, 0][None, :] - origins[:, 0][:, None]
+    dy = targets[:, 1][None, :] - origins[:, 1][:, None]
+    distance = np.sqrt(dx * dx + dy * dy)
+    # Нулевой вектор дает нулевой угол, как в calculate_angle_between_vectors
+    cos_angle = cos_between_many(
+        directions[:, 0][:, None], directions[:, 1][:, None], dx, dy
+        )
+    score = points[None, :] - distance
+    return distance, cos_angle, score
+
+
+def select_targets(origins, directions, targets, points):
+    """
+    Выбирает целевую монету для каждого транспорта.
+
+    Монета считается доступной, если она лежит в пределах CAPTURE_ANGLE
+    и CAPTURE_DISTANCE либо CLOSE_ANGLE и CLOSE_DISTANCE от направления
+    движения. Среди доступных выбирается монета с наибольшей разностью
+    очков и расстояния, иначе — ближайшая. При равенстве побеждает монета,
+    стоящая раньше в списке.
+
+    Параметры:
+    origins (ndarray): Координаты транспортов, форма (T, 2).
+    directions (ndarray): Векторы движения транспортов, форма (T, 2).
+    targets (ndarray): Координаты монет, форма (B, 2).
+    points (ndarray): Очки монет, форма (B,).
+
+    Возвращает:
+    ndarray: Индексы выбранных монет, форма (T,), либо -1,
+    если монет на карте нет.
+    """
+    if len(targets) == 0:
+        return np.full(len(origins), -1, dtype=np.intp)
+
+    distance, cos_angle, score = _score_cos(
+        origins, directions, targets, points
+        )
+    best = _best_eligible(distance, cos_angle, score)
+    nearest = np.argmin(distance, axis=1)
+    return np.where(best >= 0, best, nearest)
+
+
+def choose_eligible(origins, directions, targets, points):
+    """
+    Выбирает лучшую доступную монету без подстановки ближайшей.
+
+    Используется вместе с пространственным индексом, когда targets —
+    уже отобранные кандидаты в пределах CAPTURE_DISTANCE, а поиск
+    ближайшей монеты выполняет сам индекс.
+
+    Параметры:
+    origins (ndarray): Координаты транспортов, форма (T, 2).
+    directions (ndarray): Векторы движения транспортов, форма (T, 2).
+    targets (ndarray): Координаты монет-кандидатов, форма (B, 2).
+    points (ndarray): Очки монет-кандидатов, форма (B,).
+
+    Возвращает:
+    ndarray: Индексы выбранных монет среди targets, форма (T,),
+    либо -1 для транспортов без доступных монет.
+    """
+    if len(targets) == 0:
+        return np.full(len(origins), -1, dtype=np.intp)
+    return _best_eligible(
+        *_score_cos(origins, directions, targets, points)
+        )
+
+
+def _best_eligible(distance, cos_angle, score):
+    eligible = (
+        (cos_angle >= CAPTURE_COS) & (distance <= CAPTURE_DISTANCE)
+        ) | (
+            (cos_angle >= CLOSE_COS) & (distance <= CLOSE_DISTANCE)
+            )
+    best = np.argmax(np.where(eligible, score, -np.inf), axis=1)
+    return np.where(eligible.any(axis=1), best, -1)
@@ -0,0 +1,416 @@
+"""
+Локальный детерминированный симулятор игры для работы без сервера.
+
+Начинает с состояния в формате ответа сервера (mock.json) и на каждый
+вызов step/fetch продвигает его на один тик с учетом переданных команд.
+
+Запуск (прогон бота без отрисовки, замер скорости и очков):
+    python simulator.py [--ticks 3000] [--seed 0]
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from decoder import loads
+from force_field import field_at
+from prediction import TICK_SECONDS
+from world import Anomalies, Bounties, Enemies, Transport, World
+
+# Как часто враги стреляют, если цель в радиусе атаки (миллисекунды)
+ENEMY_ATTACK_COOLDOWN_MS = 10000
+
+
+class Simulator:
+    """
+    Детерминированная модель игры DatsMagic.
+
+    Модель за один тик:
+    - ускорение из команды ограничивается maxAccel, щит включается,
+      если он готов, атака взрывается в точке цели, если цель в радиусе
+      attackRange и атака готова; враги без щита в радиусе
+      attackExplosionRadius получают урон, за уничтоженных начисляется
+      killBounty;
+    - аномалия действует в пределах effectiveRadius с ускорением
+      FIELD_SCALE * strength / d (к центру при strength > 0, от центра
+      при strength < 0), внутри ядра расстояние считается равным radius
+      (см. force_field.field_at);
+    - скорость ограничивается maxSpeed, положение меняется так же, как
+      в prediction.extrapolate, транспорт не выходит за края карты;
+    - монета собирается при касании транспортом и появляется в случайной
+      точке карты; враги и аномалии движутся по своим скоростям
+      и отражаются от краев;
+    - враг стреляет в ближайший транспорт в радиусе атаки, щит защищает
+      от урона, погибший транспорт возрождается в начальной точке через
+      reviveTimeoutSec.
+
+    Параметры:
+    response (dict): Начальное состояние в формате ответа сервера.
+    seed (int): Зерно генератора для появления монет.
+    dt (float): Длительность тика в секундах.
+
+    Атрибуты:
+    tick (int): Номер текущего тика.
+    points (float): Набранные очки.
+    """
+
+    def __init__(self, response, seed=0, dt=TICK_SECONDS):
+        self.dt = dt
+        self.tick = 0
+        self._rng = np.random.default_rng(seed)
+        self._params = {
+            key: value for key, value in response.items()
+            if not isinstance(value, list)
+            }
+        self.width = response['mapSize']['x']
+        self.height = response['mapSize']['y']
+        self.points = float(response['points'])
+        self.max_speed = response['maxSpeed']
+        self.max_accel = response['maxAccel']
+        self.attack_range = response['attackRange']
+        self.attack_damage = response['attackDamage']
+        self.explosion_radius = response['attackExplosionRadius']
+        self.transport_radius = response['transportRadius']
+
+        world = World.from_response(response)
+        transports = world.transports
+        self.ids = [t.id for t in transports]
+        self._t = {
+            name: np.array([getattr(t, name) for t in transports],
+                           dtype=float)
+            for name in Transport.__slots__
+            if name not in ('id', 'status')
+            }
+        self._t['alive'] = np.array(
+            [t.status == 'alive' for t in transports], dtype=bool
+            )
+        self._t['revive_ms'] = np.zeros(len(transports))
+        self._spawn = (self._t['x'].copy(), self._t['y'].copy())
+
+        self._enemies = _copy_columns(world.enemies)
+        self._enemies.alive = self._enemies.alive.copy()
+        self._enemy_attack_ms = np.zeros(len(world.enemies))
+        self._wanted = _copy_columns(world.wanted)
+        self._bounties = _copy_columns(world.bounties)
+        self._anomalies = _copy_columns(world.anomalies)
+        self._anomalies.ids = list(world.anomalies.ids)
+        self._update_anomaly_acceleration()
+
+    @classmethod
+    def from_mock(cls, path='mock.json', seed=0):
+        """
+        Создает симулятор из файла с ответом сервера.
+
+        Параметры:
+        path (str): Путь к файлу.
+        seed (int): Зерно генератора.
+
+        Возвращает:
+        Simulator: Симулятор в начальном состоянии.
+        """
+        with open(path, 'rb') as file:
+            return cls(loads(file.read()), seed)
+
+    def fetch(self, transports):
+        """
+        Замена fetch_map_data: применяет команды и возвращает новое
+        состояние.
+
+        Параметры:
+        transports (list): Команды транспортов (см. control_transports).
+
+        Возвращает:
+        World: Состояние после тика.
+        """
+        self.step(transports)
+        return self.world()
+
+    def step(self, commands):
+        """
+        Продвигает игру на один тик.
+
+        Параметры:
+        commands (list): Команды транспортов (см. control_transports).
+        """
+        dt = self.dt
+        elapsed_ms = dt * 1000
+        t = self._t
+        slots = {transport_id: i for i, transport_id in enumerate(self.ids)}
+
+        for command in commands:
+            i = slots.get(command['id'])
+            if i is None or not t['alive'][i]:
+                continue
+            ax = command['acceleration']['x']
+            ay = command['acceleration']['y']
+            norm = math.hypot(ax, ay)
+            if norm > self.max_accel:
+                ax *= self.max_accel / norm
+                ay *= self.max_accel / norm
+            t['self_ax'][i] = ax
+            t['self_ay'][i] = ay
+            shield_ready = t['shield_cooldown_ms'][i] == 0
+            if command.get('activateShield') and shield_ready:
+                t['shield_left_ms'][i] = self._params['shieldTimeMs']
+                t['shield_cooldown_ms'][i] = self._params['shieldCooldownMs']
+            attack = command.get('attack')
+            if attack is not None and t['attack_cooldown_ms'][i] == 0:
+                if math.hypot(attack['x'] - t['x'][i],
+                              attack['y'] - t['y'][i]) <= self.attack_range:
+                    self._explode(attack['x'], attack['y'])
+                    t['attack_cooldown_ms'][i] = (
+                        self._params['attackCooldownMs']
+                        )
+
+        # Движение транспортов
+        alive = t['alive']
+        ax = t['self_ax'] + t['anomaly_ax']
+        ay = t['self_ay'] + t['anomaly_ay']
+        vx = t['vx'] + ax * dt
+        vy = t['vy'] + ay * dt
+        speed = np.hypot(vx, vy)
+        scale = np.where(
+            speed > self.max_speed,
+            self.max_speed / np.maximum(speed, 1e-12), 1.0
+            )
+        x = t['x'] + t['vx'] * dt + ax * dt * dt / 2
+        y = t['y'] + t['vy'] * dt + ay * dt * dt / 2
+        vx *= scale
+        vy *= scale
+        outside_x = (x < 0) | (x > self.width)
+        outside_y = (y < 0) | (y > self.height)
+        vx[outside_x] = 0
+        vy[outside_y] = 0
+        t['x'] = np.where(alive, np.clip(x, 0, self.width), t['x'])
+        t['y'] = np.where(alive, np.clip(y, 0, self.height), t['y'])
+        t['vx'] = np.where(alive, vx, 0)
+        t['vy'] = np.where(alive, vy, 0)
+
+        for name in ('shield_left_ms', 'shield_cooldown_ms',
+                     'attack_cooldown_ms'):
+            t[name] = np.maximum(t[name] - elapsed_ms, 0)
+
+        self._collect_bounties()
+        self._move_bouncing(self._enemies)
+        self._move_bouncing(self._wanted)
+        self._move_bouncing(self._anomalies)
+        self._enemies.shield_left_ms = np.maximum(
+            self._enemies.shield_left_ms - elapsed_ms, 0
+            )
+        self._enemy_attacks(elapsed_ms)
+        self._revive(elapsed_ms)
+        self._update_anomaly_acceleration()
+        self.tick += 1
+
+    def _explode(self, x, y):
+        for enemies in (self._enemies, self._wanted):
+            hit = (
+                enemies.alive
+                & (enemies.shield_left_ms == 0)
+                & (np.hypot(enemies.x - x, enemies.y - y)
+                   <= self.explosion_radius)
+                )
+            enemies.health = np.where(
+                hit, enemies.health - self.attack_damage, enemies.health
+                )
+            killed = hit & (enemies.health <= 0)
+            self.points += float(enemies.kill_bounty[killed].sum())
+            enemies.alive = enemies.alive & ~killed
+
+    def _collect_bounties(self):
+        t = self._t
+        bounties = self._bounties
+        if not len(bounties):
+            return
+        dx = bounties.x[None, :] - t['x'][:, None]
+        dy = bounties.y[None, :] - t['y'][:, None]
+        reach = bounties.radius[None, :] + self.transport_radius
+        touched = (
+            (dx * dx + dy * dy <= reach * reach) & t['alive'][:, None]
+            ).any(axis=0)
+        count = int(touched.sum())
+        if count:
+            self.points += float(bounties.points[touched].sum())
+            bounties.x[touched] = self._rng.integers(0, self.width, count)
+            bounties.y[touched] = self._rng.integers(0, self.height, count)
+
+    def _move_bouncing(self, columns):
+        dt = self.dt
+        columns.x = columns.x + columns.vx * dt
+        columns.y = columns.y + columns.vy * dt
+        for position, velocity, limit in (('x', 'vx', self.width),
+                                          ('y', 'vy', self.height)):
+            values = getattr(columns, position)
+            outside = (values < 0) | (values > limit)
+            if outside.any():
+                setattr(columns, velocity, np.where(
+                    outside, -getattr(columns, velocity),
+                    getattr(columns, velocity)
+                    ))
+                setattr(columns, position, np.clip(values, 0, limit))
+
+    def _enemy_attacks(self, elapsed_ms):
+        t = self._t
+        enemies = self._enemies
+        self._enemy_attack_ms = np.maximum(
+            self._enemy_attack_ms - elapsed_ms, 0
+            )
+        if not len(enemies) or not t['alive'].any():
+            return
+        dx = t['x'][None, :] - enemies.x[:, None]
+        dy = t['y'][None, :] - enemies.y[:, None]
+        distance = np.where(t['alive'][None, :], np.hypot(dx, dy), np.inf)
+        target = distance.argmin(axis=1)
+        ready = (
+            enemies.alive & (self._enemy_attack_ms == 0)
+            & (distance[np.arange(len(enemies)), target] <= self.attack_range)
+            )
+        for enemy in np.flatnonzero(ready):
+            i = target[enemy]
+            self._enemy_attack_ms[enemy] = ENEMY_ATTACK_COOLDOWN_MS
+            if t['shield_left_ms'][i] > 0:
+                continue
+            t['health'][i] -= self.attack_damage
+            if t['health'][i] <= 0:
+                t['health'][i] = 0
+                t['alive'][i] = False
+                t['death_count'][i] += 1
+                t['revive_ms'][i] = self._params['reviveTimeoutSec'] * 1000
+
+    def _revive(self, elapsed_ms):
+        t = self._t
+        waiting = ~t['alive']
+        if not waiting.any():
+            return
+        t['revive_ms'] = np.where(
+            waiting, np.maximum(t['revive_ms'] - elapsed_ms, 0), 0
+            )
+        revived = waiting & (t['revive_ms'] == 0)
+        t['alive'] |= revived
+        t['health'][revived] = 100
+        t['x'][revived] = self._spawn[0][revived]
+        t['y'][revived] = self._spawn[1][revived]
+
+    def _update_anomaly_acceleration(self):
+        t = self._t
+        t['anomaly_ax'], t['anomaly_ay'] = field_at(
+            self._anomalies, t['x'], t['y']
+            )
+
+    def world(self):
+        """
+        Возвращает текущее состояние в виде World.
+
+        Возвращает:
+        World: Снимок состояния; массивы копируются.
+        """
+        t = self._t
+        params = self._params
+        columns = {
+            name: t[name].tolist() for name in Transport.__slots__
+            if name in t
+            }
+        transports = [
+            Transport(
+                transport_id, columns['x'][i], columns['y'][i],
+                columns['vx'][i], columns['vy'][i],
+                columns['self_ax'][i], columns['self_ay'][i],
+                columns['anomaly_ax'][i], columns['anomaly_ay'][i],
+                columns['health'][i],
+                'alive' if t['alive'][i] else 'dead',
+                int(columns['death_count'][i]),
+                columns['shield_left_ms'][i],
+                columns['shield_cooldown_ms'][i],
+                columns['attack_cooldown_ms'][i]
+                )
+            for i, transport_id in enumerate(self.ids)
+            ]
+        enemies = self._enemies
+        alive_enemies = enemies.alive
+        anomalies = self._anomalies
+        bounties = self._bounties
+        return World(
+            self.width, self.height, params['name'], self.points,
+            self.max_speed, self.max_accel, self.attack_range,
+            params['attackCooldownMs'], self.attack_damage,
+            self.explosion_radius, params['reviveTimeoutSec'],
+            params['shieldTimeMs'], params['shieldCooldownMs'],
+            self.transport_radius, transports,
+            Enemies(*(getattr(enemies, name)[alive_enemies].copy()
+                      for name in Enemies.__slots__)),
+            Enemies(*(getattr(self._wanted, name).copy()
+                      for name in Enemies.__slots__)),
+            Bounties(*(getattr(bounties, name).copy()
+                       for name in Bounties.__slots__)),
+            Anomalies(list(anomalies.ids), *(
+                getattr(anomalies, name).copy()
+                for name in Anomalies.__slots__[1:]
+                ))
+            )
+
+
+def _copy_columns(columns):
+    """Создает изменяемую копию столбцов состояния."""
+    return type(columns)(*(
+        value.copy() if isinstance(value, np.ndarray) else value
+        for value in (getattr(columns, name) for name in columns.__slots__)
+        ))
+
+
+def main():
+    from assignment import BountyAssigner
+    from motion_control import control_transports
+    from planner import RolloutPlanner
+    from spatial_index import WorldIndex
+    from target_cache import TargetCache
+    from targeting import AttackOptimizer
+    from threat_map import ThreatMap
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ticks', type=int, default=3000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--assign', action='store_true',
+                        help='совместное распределение монет')
+    parser.add_argument('--cache', action='store_true',
+                        help='закрепление целей между тиками')
+    parser.add_argument('--plan', action='store_true',
+                        help='ускорения от планировщика с прогоном')
+    parser.add_argument('--threat', action='store_true',
+                        help='учитывать карту угроз от врагов')
+    parser.add_argument('--target', action='store_true',
+                        help='точки атаки с учетом радиуса взрыва')
+    args = parser.parse_args()
+    assigner = BountyAssigner() if args.assign else None
+    cache = TargetCache() if args.cache else None
+    planner = RolloutPlanner(cache=cache) if args.plan else None
+    attacker = AttackOptimizer() if args.target else None
+
+    simulator = Simulator.from_mock(seed=args.seed)
+    world = simulator.world()
+    threat = None
+    if args.threat:
+        threat = ThreatMap(world.map_width, world.map_height)
+    start = time.perf_counter()
+    for _ in range(args.ticks):
+        if threat is not None:
+            threat.update(world)
+        if planner is not None:
+            commands = planner.control(world, WorldIndex(world), threat)
+        else:
+            commands = control_transports(
+                world, assigner=assigner, cache=cache, threat=threat
+                )
+        if attacker is not None:
+            attacker.apply(world, commands)
+        world = simulator.fetch(commands)
+    elapsed = time.perf_counter() - start
+    print(
+        f'Тиков: {args.ticks}, {args.ticks / elapsed:.0f} тиков/с, '
+        f'очков: {simulator.points:g}, '
+        f'смертей: {sum(t.death_count for t in world.transports)}'
+        )
+
+
+if __name__ == '__main__':
+    main()
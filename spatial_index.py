@@ -0,0 +1,175 @@
+import math
+
+import numpy as np
+
+
+# Число ячеек сетки вдоль большей стороны карты
+GRID_RESOLUTION = 64
+
+
+class SpatialGrid:
+    """
+    Равномерная сетка над точками для запросов ближайшего соседа
+    и поиска в радиусе.
+
+    Точки сортируются по номеру ячейки, поэтому каждая строка ячеек
+    занимает непрерывный срез массива индексов. Внутри ячейки сохраняется
+    исходный порядок точек, а результаты запросов возвращаются
+    в порядке исходного списка.
+
+    Параметры:
+    xs, ys (ndarray): Координаты точек.
+    map_width, map_height (float): Размеры карты.
+    """
+
+    def __init__(self, xs, ys, map_width, map_height):
+        self.xs = np.asarray(xs, dtype=float)
+        self.ys = np.asarray(ys, dtype=float)
+        self.cell_size = max(map_width, map_height, 1) / GRID_RESOLUTION
+        self.cols = int(math.ceil(map_width / self.cell_size)) + 1
+        self.rows = int(math.ceil(map_height / self.cell_size)) + 1
+
+        cx, cy = self._cells(self.xs, self.ys)
+        cell_ids = cy * self.cols + cx
+        self._order = np.argsort(cell_ids, kind='stable')
+        counts = np.bincount(cell_ids, minlength=self.cols * self.rows)
+        self._starts = np.concatenate(([0], np.cumsum(counts)))
+
+    def __len__(self):
+        return len(self.xs)
+
+    def _cells(self, xs, ys):
+        cx = np.clip(
+            (xs // self.cell_size).astype(np.intp), 0, self.cols - 1
+            )
+        cy = np.clip(
+            (ys // self.cell_size).astype(np.intp), 0, self.rows - 1
+            )
+        return cx, cy
+
+    def _cell(self, value, limit):
+        return min(max(int(value // self.cell_size), 0), limit - 1)
+
+    def _gather(self, spans):
+        """
+        Собирает индексы точек из набора диапазонов ячеек.
+
+        Параметры:
+        spans (list): Кортежи (row, col_from, col_to) включительно.
+
+        Возвращает:
+        ndarray: Индексы точек в исходном списке.
+        """
+        parts = []
+        for row, col_from, col_to in spans:
+            base = row * self.cols
+            start = self._starts[base + col_from]
+            stop = self._starts[base + col_to + 1]
+            if stop > start:
+                parts.append(self._order[start:stop])
+        if not parts:
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate(parts)
+
+    def _distances(self, indices, x, y):
+        dx = self.xs[indices] - x
+        dy = self.ys[indices] - y
+        return np.sqrt(dx * dx + dy * dy)
+
+    def within(self, x, y, radius):
+        """
+        Находит точки на расстоянии не больше radius.
+
+        Параметры:
+        x, y (float): Центр запроса.
+        radius (float): Радиус поиска.
+
+        Возвращает:
+        tuple: Отсортированные индексы точек и расстояния до них.
+        """
+        col_from = self._cell(x - radius, self.cols)
+        col_to = self._cell(x + radius, self.cols)
+        row_from = self._cell(y - radius, self.rows)
+        row_to = self._cell(y + radius, self.rows)
+
+        indices = self._gather(
+            [(row, col_from, col_to) for row in range(row_from, row_to + 1)]
+            )
+        distances = self._distances(indices, x, y)
+        mask = distances <= radius
+        indices = indices[mask]
+        distances = distances[mask]
+        order = np.argsort(indices)
+        return indices[order], distances[order]
+
+    def nearest(self, x, y):
+        """
+        Находит ближайшую точку, расширяя поиск кольцами ячеек.
+
+        При равных расстояниях возвращается точка, стоящая раньше
+        в исходном списке.
+
+        Параметры:
+        x, y (float): Точка запроса.
+
+        Возвращает:
+        tuple: Индекс ближайшей точки и расстояние до неё
+        либо (-1, inf), если точек нет.
+        """
+        if len(self.xs) == 0:
+            return -1, math.inf
+
+        col = self._cell(x, self.cols)
+        row = self._cell(y, self.rows)
+        best_index, best_distance = -1, math.inf
+        ring = 0
+        while True:
+            spans = []
+            col_from = max(col - ring, 0)
+            col_to = min(col + ring, self.cols - 1)
+            for r in range(row - ring, row + ring + 1):
+                if r < 0 or r >= self.rows:
+                    continue
+                if r in (row - ring, row + ring):
+                    spans.append((r, col_from, col_to))
+                else:
+                    if col - ring >= 0:
+                        spans.append((r, col - ring, col - ring))
+                    if col + ring < self.cols:
+                        spans.append((r, col + ring, col + ring))
+
+            indices = self._gather(spans)
+            if len(indices):
+                distances = self._distances(indices, x, y)
+                candidate = np.lexsort((indices, distances))[0]
+                if (distances[candidate], indices[candidate]) < (
+                        best_distance, best_index):
+                    best_distance = float(distances[candidate])
+                    best_index = int(indices[candidate])
+
+            # Все непросмотренные точки лежат не ближе ring * cell_size
+            if best_distance < ring * self.cell_size:
+                break
+            if (row - ring <= 0 and row + ring >= self.rows - 1
+                    and col - ring <= 0 and col + ring >= self.cols - 1):
+                break
+            ring += 1
+        return best_index, best_distance
+
+
+class WorldIndex:
+    """
+    Пространственный индекс монет, врагов и аномалий,
+    который строится один раз на каждый ответ сервера.
+
+    Параметры:
+    world (World): Состояние мира текущего тика.
+    """
+
+    def __init__(self, world):
+        size = (world.map_width, world.map_height)
+        self.bounties = SpatialGrid(world.bounties.x, world.bounties.y, *size)
+        self.enemies = SpatialGrid(world.enemies.x, world.enemies.y, *size)
+        self.anomalies = SpatialGrid(
+            world.anomalies.x, world.anomalies.y, *size
+            )
@@ -0,0 +1,119 @@
+import numpy as np
+
+from motion_control import bounty_values, choose_target
+from scoring import CAPTURE_DISTANCE, choose_eligible
+
+# Насколько (в очках за вычетом расстояния) монета рядом должна быть
+# выгоднее закрепленной, чтобы транспорт сменил цель
+SWITCH_MARGIN = 20.0
+
+
+class TargetCache:
+    """
+    Закрепление целевых монет за транспортами между тиками.
+
+    Выбранная монета запоминается по идентификатору транспорта
+    и ее координатам (монеты не перемещаются). Полный выбор цели
+    по правилам угла и дистанции, включая поиск ближайшей монеты по
+    всей карте, выполняется, только если закрепленная монета исчезла
+    (собрана или истекла) или транспорт возродился (изменился
+    deathCount). В остальных тиках проверяются лишь монеты в радиусе
+    захвата: цель меняется, если среди них есть доступная монета
+    выгоднее закрепленной больше чем на margin, — это же убирает
+    переключение между равноценными монетами от тика к тику.
+
+    Объект передается в control_transports параметром cache.
+
+    Параметры:
+    margin (float): Порог смены цели.
+
+    Атрибуты:
+    hits (int): Сколько раз закрепленная цель сохранена.
+    misses (int): Сколько раз цель выбрана заново.
+    switches (int): Сколько раз цель сменена на монету рядом.
+    """
+
+    def __init__(self, margin=SWITCH_MARGIN):
+        self.margin = margin
+        self._targets = {}
+        self.hits = 0
+        self.misses = 0
+        self.switches = 0
+
+    def choose(self, transport, direction, bounties, index, threat=None):
+        """
+        Возвращает цель транспорта, по возможности прежнюю.
+
+        Параметры:
+        transport (Transport): Управляемый транспорт.
+        direction (tuple): Вектор движения (x, y).
+        bounties (Bounties): Монеты.
+        index (WorldIndex): Пространственный индекс текущего ответа.
+        threat (ThreatMap): Карта угроз (опционально).
+
+        Возвращает:
+        int: Индекс монеты в bounties либо -1, если монет нет.
+        """
+        target = -1
+        entry = self._targets.get(transport.id)
+        if entry is not None and entry[2] == transport.death_count:
+            found, _ = index.bounties.within(entry[0], entry[1], 0)
+            if len(found):
+                target = int(found[0])
+
+        if target < 0:
+            self.misses += 1
+            target = choose_target(
+                transport, direction, bounties, index, threat
+                )
+        else:
+            nearby = self._nearby(
+                transport, direction, bounties, index, threat
+                )
+            if nearby >= 0 and nearby != target and (
+                    self._score(transport, bounties, nearby, threat)
+                    > self._score(transport, bounties, target, threat)
+                    + self.margin
+                    ):
+                target = nearby
+                self.switches += 1
+            else:
+                self.hits += 1
+
+        if target < 0:
+            self._targets.pop(transport.id, None)
+        else:
+            self._targets[transport.id] = (
+                float(bounties.x[target]), float(bounties.y[target]),
+                transport.death_count
+                )
+        return target
+
+    @staticmethod
+    def _nearby(transport, direction, bounties, index, threat):
+        """
+        Лучшая доступная монета в радиусе захвата либо -1.
+        """
+        candidates, _ = index.bounties.within(
+            transport.x, transport.y, CAPTURE_DISTANCE
+            )
+        if not len(candidates):
+            return -1
+        best = choose_eligible(
+            np.array([[transport.x, transport.y]], dtype=float),
+            np.array([direction], dtype=float),
+            np.column_stack(
+                (bounties.x[candidates], bounties.y[candidates])
+                ),
+            bounty_values(bounties, candidates, threat)
+            )[0]
+        return int(candidates[best]) if best >= 0 else -1
+
+    @staticmethod
+    def _score(transport, bounties, target, threat):
+        """Разность ценности монеты и расстояния до нее."""
+        value = bounty_values(bounties, np.array([target]), threat)[0]
+        return float(value) - float(np.hypot(
+            bounties.x[target] - transport.x,
+            bounties.y[target] - transport.y
+            ))
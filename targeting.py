@@ -0,0 +1,270 @@
+"""
+Выбор точек атаки с учетом радиуса взрыва.
+
+Взрыв наносит attackDamage всем врагам и разыскиваемым целям без щита
+в пределах attackExplosionRadius от точки атаки, поэтому точка
+выбирается не по одной цели, а по ценности всех, кого она заденет.
+Для каждого готового к атаке транспорта кандидаты в точки — позиции
+целей в радиусе атаки, середины пар целей, которые помещаются в один
+взрыв, и центры групп таких целей; все кандидаты транспорта
+оцениваются одним векторизованным расчетом. Цели рядом с транспортом
+находятся через пространственную сетку, а не перебором всех пар.
+"""
+import numpy as np
+
+from prediction import TICK_SECONDS
+from spatial_index import SpatialGrid
+
+# Через сколько секунд после ответа сервера взрыв настигает цели:
+# прицел, как и раньше, упреждает движение врага на тик
+LEAD_SECONDS = TICK_SECONDS
+# Доли упреждения, в которые проверяется попадание: вероятность задеть
+# цель — доля этих моментов, когда она внутри взрыва и без щита
+HIT_SAMPLES = (0.0, 0.5, 1.0)
+# Очки за единицу урона цели сверх доли награды (урон ослабляет врага,
+# даже если награды за него нет)
+DAMAGE_VALUE = 0.1
+# Запас до границы радиуса атаки, покрывающий округление точки до целых
+RANGE_MARGIN = 1.0
+# Сколько самых ценных целей рядом с транспортом рассматривается:
+# число кандидатов растет как квадрат числа целей (середины пар)
+MAX_NEARBY = 48
+
+
+class AttackOptimizer:
+    """
+    Совместный выбор точек атаки транспортов на тик.
+
+    Ценность попадания по цели с оставшимся здоровьем h — доля награды
+    killBounty, которую снимает выстрел (min(attackDamage, h) / h; вся
+    награда, если выстрел добивает цель), плюс DAMAGE_VALUE за единицу
+    урона, умноженная на вероятность попадания. Ценность точки — сумма
+    по всем задетым целям.
+
+    Выстрелы распределяются жадно: из лучших точек всех готовых
+    транспортов выбирается самая ценная, ожидаемый урон вычитается
+    из здоровья задетых целей, и лучшие точки транспортов, рядом
+    с которыми есть эти цели, пересчитываются. Поэтому два выстрела
+    не тратятся на цель, которую добивает один, а цель, которой нужно
+    два попадания, может получить оба.
+
+    Объект применяется к готовым командам методом apply.
+
+    Атрибуты:
+    shots (int): Число назначенных выстрелов.
+    multi_hits (int): Сколько из них задевают больше одной цели.
+    candidates (int): Число оцененных точек.
+    """
+
+    def __init__(self):
+        self.shots = 0
+        self.multi_hits = 0
+        self.candidates = 0
+
+    def apply(self, world, commands):
+        """
+        Заменяет атаки в командах на выбранные оптимизатором.
+
+        Параметры:
+        world (World): Состояние мира.
+        commands (list): Команды транспортов (см. control_transports).
+
+        Возвращает:
+        list: Те же команды.
+        """
+        attacks = self.plan(world)
+        for command in commands:
+            attack = attacks.get(command['id'])
+            if attack is None:
+                command.pop('attack', None)
+            else:
+                command['attack'] = attack
+        return commands
+
+    def plan(self, world):
+        """
+        Выбирает точки атаки для готовых к атаке транспортов.
+
+        Параметры:
+        world (World): Состояние мира.
+
+        Возвращает:
+        dict: Точки атаки {'x', 'y'} по идентификаторам транспортов.
+        """
+        ready = [
+            transport for transport in world.transports
+            if transport.status == 'alive'
+            and transport.attack_cooldown_ms == 0
+            ]
+        if not ready:
+            return {}
+        targets = _Targets(world)
+        if not len(targets):
+            return {}
+
+        options = {
+            transport.id: self._best_shot(world, targets, transport)
+            for transport in ready
+            }
+        transports = {transport.id: transport for transport in ready}
+        attacks = {}
+        while options:
+            # При равной ценности выигрывает транспорт раньше по списку
+            transport_id = max(
+                options, key=lambda key: options[key][0]
+                )
+            value, point, hits, chances, _ = options.pop(transport_id)
+            if value <= 0:
+                break
+            attacks[transport_id] = point
+            targets.remaining[hits] -= chances * world.attack_damage
+            self.shots += 1
+            if np.count_nonzero(chances) > 1:
+                self.multi_hits += 1
+            for other, option in options.items():
+                if np.intersect1d(option[4], hits).size:
+                    options[other] = self._best_shot(
+                        world, targets, transports[other]
+                        )
+        return attacks
+
+    def _best_shot(self, world, targets, transport):
+        """
+        Лучшая точка атаки транспорта.
+
+        Возвращает:
+        tuple: Ценность, точка {'x', 'y'}, индексы задетых целей,
+        вероятности попадания по ним и индексы целей рядом.
+        """
+        radius = world.attack_explosion_radius
+        nearby, _ = targets.grid.within(
+            transport.x, transport.y,
+            world.attack_range + radius + targets.drift
+            )
+        nearby = nearby[targets.remaining[nearby] > 0]
+        if not len(nearby):
+            return 0.0, None, nearby, np.empty(0), nearby
+        health = targets.remaining[nearby]
+        damage = np.minimum(world.attack_damage, health)
+        worth = targets.kill_bounty[nearby] * damage / health + (
+            DAMAGE_VALUE * damage
+            )
+        if len(nearby) > MAX_NEARBY:
+            keep = np.sort(np.argsort(-worth, kind='stable')[:MAX_NEARBY])
+            nearby = nearby[keep]
+            worth = worth[keep]
+        x = targets.x[nearby]
+        y = targets.y[nearby]
+
+        # Кандидаты: цели, середины пар и центры групп целей,
+        # помещающихся в один взрыв
+        close = np.hypot(
+            x[:, None] - x[None, :], y[:, None] - y[None, :]
+            ) <= 2 * radius
+        first, second = np.nonzero(np.triu(close, 1))
+        group = close.sum(axis=1)
+        point_x = np.concatenate((
+            x, (x[first] + x[second]) / 2, close @ x / group
+            ))
+        point_y = np.concatenate((
+            y, (y[first] + y[second]) / 2, close @ y / group
+            ))
+
+        # Точки дальше радиуса атаки сдвигаются к транспорту
+        dx = point_x - transport.x
+        dy = point_y - transport.y
+        distance = np.hypot(dx, dy)
+        limit = world.attack_range - RANGE_MARGIN
+        scale = np.where(
+            distance > limit, limit / np.maximum(distance, 1e-12), 1.0
+            )
+        point_x = np.round(transport.x + dx * scale)
+        point_y = np.round(transport.y + dy * scale)
+        self.candidates += len(point_x)
+
+        # Вероятности попадания, форма (точки, цели)
+        chances = np.mean([
+            (np.hypot(
+                point_x[:, None] - (x + targets.vx[nearby] * offset)[None],
+                point_y[:, None] - (y + targets.vy[nearby] * offset)[None]
+                ) <= radius)
+            & (targets.shield_left_ms[nearby] <= elapsed_ms)[None]
+            for offset, elapsed_ms in targets.moments
+            ], axis=0)
+        values = chances @ worth
+        best = int(np.argmax(values))
+        hit = chances[best] > 0
+        return (
+            float(values[best]),
+            {'x': int(point_x[best]), 'y': int(point_y[best])},
+            nearby[hit], chances[best][hit], nearby
+            )
+
+
+class _Targets:
+    """
+    Живые враги и разыскиваемые цели одним набором столбцов, без
+    повторов: разыскиваемая цель на месте врага — тот же транспорт.
+
+    Координаты x, y — середина пути цели до момента взрыва; сетка
+    строится по ним, а drift — наибольшее смещение от них за это время.
+    """
+
+    def __init__(self, world):
+        enemies = world.enemies
+        wanted = world.wanted
+        # Разыскиваемая цель может быть и в списке врагов: совпадающая
+        # по положению с живым врагом считается тем же транспортом и
+        # не добавляется второй раз, а награда берется наибольшая
+        enemy_alive = np.flatnonzero(enemies.alive)
+        position = {
+            key: order for order, key in enumerate(zip(
+                enemies.x[enemy_alive].tolist(),
+                enemies.y[enemy_alive].tolist()
+                ))
+            }
+        wanted_alive = []
+        merged = []
+        for number, key in enumerate(zip(
+                wanted.x.tolist(), wanted.y.tolist())):
+            if not wanted.alive[number]:
+                continue
+            order = position.get(key)
+            if order is None:
+                wanted_alive.append(number)
+            else:
+                merged.append((order, number))
+        columns = [(enemies, enemy_alive), (wanted, wanted_alive)]
+
+        def stack(name):
+            return np.concatenate([
+                np.asarray(getattr(group, name), dtype=float)[rows]
+                for group, rows in columns
+                ])
+
+        self.vx = stack('vx')
+        self.vy = stack('vy')
+        self.x = stack('x') + self.vx * LEAD_SECONDS / 2
+        self.y = stack('y') + self.vy * LEAD_SECONDS / 2
+        self.remaining = stack('health')
+        self.kill_bounty = stack('kill_bounty')
+        for order, number in merged:
+            self.kill_bounty[order] = max(
+                self.kill_bounty[order], float(wanted.kill_bounty[number])
+                )
+        self.shield_left_ms = stack('shield_left_ms')
+        # Моменты проверки: смещение во времени от середины пути
+        # (секунды) и время от ответа сервера (мс) для проверки щита
+        self.moments = [
+            ((sample - 0.5) * LEAD_SECONDS, sample * LEAD_SECONDS * 1000)
+            for sample in HIT_SAMPLES
+            ]
+        self.drift = float(
+            np.hypot(self.vx, self.vy).max(initial=0)
+            ) * LEAD_SECONDS / 2
+        self.grid = SpatialGrid(
+            self.x, self.y, world.map_width, world.map_height
+            )
+
+    def __len__(self):
+        return len(self.x)
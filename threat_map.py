@@ -0,0 +1,151 @@
+import collections
+import math
+
+import numpy as np
+
+# Шаг сетки угроз в единицах карты
+THREAT_CELL = 100.0
+# На сколько секунд вперед учитывается движение врага: радиус угрозы
+# увеличивается на путь, который враг пройдет за это время
+THREAT_LOOKAHEAD_SECONDS = 2.0
+# Через сколько обновлений сетка пересчитывается целиком, чтобы
+# не копилась ошибка округления
+REBUILD_EVERY = 256
+
+
+class ThreatMap:
+    """
+    Сетка опасности от врагов с инкрементальным обновлением.
+
+    Каждый живой враг вносит attackDamage во все клетки, центры которых
+    лежат в пределах attackRange плюс путь врага за
+    THREAT_LOOKAHEAD_SECONDS от клетки врага. Значение клетки — урон,
+    который могут нанести все враги, достающие до нее; щит врага его
+    не меняет (щит защищает врага, но не усиливает его атаку).
+
+    Вклад врага описывается отпечатком: клетка, радиус в клетках и вес.
+    У врагов нет идентификаторов, поэтому update сравнивает мультимножества
+    отпечатков прошлого и текущего тика: вычитаются только исчезнувшие
+    отпечатки и добавляются только новые, а враги, не сменившие клетку
+    и радиус, сетку не трогают. Запрос опасности в точке — одно
+    обращение к массиву.
+
+    Параметры:
+    map_width, map_height (float): Размеры карты.
+    cell (float): Шаг сетки.
+
+    Атрибуты:
+    grid (ndarray): Опасность по клеткам, размер (rows, cols).
+    updated (int): Сколько клеток изменено последним update.
+    """
+
+    def __init__(self, map_width, map_height, cell=THREAT_CELL):
+        self.cell = cell
+        self.cols = max(int(math.ceil(map_width / cell)), 1)
+        self.rows = max(int(math.ceil(map_height / cell)), 1)
+        self.grid = np.zeros((self.rows, self.cols))
+        self._footprints = collections.Counter()
+        self._masks = {}
+        self._updates = 0
+        self.updated = 0
+
+    def update(self, world):
+        """
+        Приводит сетку к врагам нового состояния мира.
+
+        Параметры:
+        world (World): Состояние мира.
+        """
+        current = collections.Counter(self._footprints_of(world))
+        self._updates += 1
+        self.updated = 0
+        if self._updates % REBUILD_EVERY == 0:
+            self.grid[:] = 0
+            for footprint, count in current.items():
+                self._stamp(footprint, count)
+        else:
+            for footprint, count in (self._footprints - current).items():
+                self._stamp(footprint, -count)
+            for footprint, count in (current - self._footprints).items():
+                self._stamp(footprint, count)
+        self._footprints = current
+
+    def _footprints_of(self, world):
+        """
+        Отпечатки живых врагов: (столбец, строка, радиус в клетках, вес).
+        """
+        enemies = world.enemies
+        alive = enemies.alive
+        if not alive.any():
+            return []
+        speed = np.hypot(enemies.vx[alive], enemies.vy[alive])
+        reach = world.attack_range + speed * THREAT_LOOKAHEAD_SECONDS
+        radius = np.ceil(reach / self.cell).astype(int)
+        cols = np.clip(
+            (enemies.x[alive] // self.cell).astype(int), 0, self.cols - 1
+            )
+        rows = np.clip(
+            (enemies.y[alive] // self.cell).astype(int), 0, self.rows - 1
+            )
+        weight = [world.attack_damage] * len(radius)
+        return zip(cols.tolist(), rows.tolist(), radius.tolist(), weight)
+
+    def _mask(self, radius):
+        """Круг радиусом radius клеток в квадрате (2r+1) x (2r+1)."""
+        mask = self._masks.get(radius)
+        if mask is None:
+            offsets = np.arange(-radius, radius + 1)
+            mask = (
+                offsets[:, None] ** 2 + offsets[None, :] ** 2
+                <= radius * radius
+                )
+            self._masks[radius] = mask
+        return mask
+
+    def _stamp(self, footprint, count):
+        """
+        Добавляет (count > 0) или вычитает (count < 0) вклад count
+        одинаковых отпечатков.
+        """
+        col, row, radius, weight = footprint
+        mask = self._mask(radius)
+        row0 = max(row - radius, 0)
+        row1 = min(row + radius + 1, self.rows)
+        col0 = max(col - radius, 0)
+        col1 = min(col + radius + 1, self.cols)
+        window = mask[
+            row0 - row + radius:row1 - row + radius,
+            col0 - col + radius:col1 - col + radius
+            ]
+        self.grid[row0:row1, col0:col1] += window * (weight * count)
+        self.updated += int(window.sum())
+
+    def danger(self, x, y):
+        """
+        Опасность в точке.
+
+        Параметры:
+        x, y (float): Координаты точки (вне карты — значение на краю).
+
+        Возвращает:
+        float: Суммарный урон врагов, достающих до клетки точки.
+        """
+        col = min(max(int(x // self.cell), 0), self.cols - 1)
+        row = min(max(int(y // self.cell), 0), self.rows - 1)
+        return float(self.grid[row, col])
+
+    def danger_many(self, x, y):
+        """
+        Опасность в многих точках.
+
+        Параметры:
+        x, y (ndarray): Координаты точек.
+
+        Возвращает:
+        ndarray: Значения опасности.
+        """
+        cols = np.clip((np.asarray(x) // self.cell).astype(int),
+                       0, self.cols - 1)
+        rows = np.clip((np.asarray(y) // self.cell).astype(int),
+                       0, self.rows - 1)
+        return self.grid[rows, cols]
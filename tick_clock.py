@@ -0,0 +1,235 @@
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+from prediction import TICK_SECONDS
+
+# Запас после границы тика, с которым команда должна прийти на сервер
+GUARD_SECONDS = 0.01
+# Число последних смен состояния, по которым оценивается период
+PERIOD_WINDOW = 64
+# Число ячеек гистограммы фазы и затухание голосов за одно наблюдение
+PHASE_BINS = 64
+DECAY = 0.97
+# Каждая PROBE_EVERY-я отправка нацелена на PROBE_SECONDS раньше границы:
+# ответ без смены состояния показывает, что граница еще не наступила,
+# иначе фазу, на которой всегда опрашивается сервер, не уточнить
+PROBE_EVERY = 8
+PROBE_SECONDS = 0.02
+# Пауза до захвата фазы, как в последовательном цикле без часов
+FALLBACK_SLEEP = 0.1
+# Минимальная скорость транспорта, по смещению которого оценивается время
+MIN_SPEED = 1.0
+
+
+class TickClock:
+    """
+    Часы, синхронизированные по фазе с тиками сервера.
+
+    Каждый ответ сервера — снимок состояния в момент, близкий к середине
+    запроса. Сравнение с предыдущим снимком показывает, была ли между
+    ними граница тика. Каждое такое наблюдение голосует за участки фазы
+    тика, согласующиеся с ним (гистограмма с затуханием), и граница
+    оценивается по центру наиболее согласованного участка. Период
+    считается по окну последних смен состояния, а число прошедших
+    тиков определяется по смещению транспортов: путь, деленный на
+    скорость, дает игровое время. Отправка следующей команды планируется
+    так, чтобы она пришла на сервер сразу после границы.
+
+    Атрибуты:
+    period (float): Оценка периода тика в секундах.
+    boundary (float): Время (time.monotonic) одной из границ тика
+    либо None, пока фаза не захвачена.
+    phase_error (float): Отклонение прихода последней команды от
+    целевого момента (граница + GUARD_SECONDS) в секундах.
+    """
+
+    def __init__(self, period=TICK_SECONDS, guard=GUARD_SECONDS):
+        self.period = period
+        self.guard = guard
+        self.boundary = None
+        self.phase_error = None
+        self._epoch = None
+        self._votes = np.zeros(PHASE_BINS)
+        self._sends = 0
+        self._last_sample = None
+        self._last_change = None
+        self._changes = deque(maxlen=PERIOD_WINDOW)
+        self._ticks = 0
+
+    def observe(self, sent_at, received_at, world):
+        """
+        Учитывает очередной ответ сервера.
+
+        Параметры:
+        sent_at (float): Время отправки запроса (time.monotonic).
+        received_at (float): Время получения ответа (time.monotonic).
+        world (World): Полученное состояние.
+        """
+        sample_at = (sent_at + received_at) / 2
+        signature = _signature(world)
+
+        if self.boundary is not None:
+            self.phase_error = self._offset(sample_at)
+
+        if self._last_sample is not None:
+            previous_at, previous_signature = self._last_sample
+            changed = signature != previous_signature
+            if changed:
+                self._update_period(sample_at, world)
+            if self.boundary is None:
+                if changed:
+                    self.boundary = (previous_at + sample_at) / 2
+                    self._epoch = self.boundary
+            else:
+                self._vote(previous_at, sample_at, changed)
+        self._last_sample = (sample_at, signature)
+
+    def _update_period(self, changed_at, world):
+        """
+        Уточняет период по числу тиков между сменами состояния.
+
+        Отдельный интервал между сменами зашумлен на величину до периода,
+        поэтому период считается по всему окну последних смен: прошедшее
+        время делится на суммарное число тиков.
+        """
+        if self._last_change is not None:
+            previous_at, previous_world = self._last_change
+            game_elapsed = _game_elapsed(previous_world, world)
+            if game_elapsed is None:
+                game_elapsed = changed_at - previous_at
+            self._ticks += max(1, round(game_elapsed / self.period))
+        self._changes.append((changed_at, self._ticks))
+        self._last_change = (changed_at, world)
+
+        first_at, first_ticks = self._changes[0]
+        if self._ticks - first_ticks >= PERIOD_WINDOW // 4:
+            self.period = (changed_at - first_at) / (self._ticks - first_ticks)
+
+    def _vote(self, start, end, changed):
+        """
+        Обновляет гистограмму фазы по интервалу между снимками
+        и переносит оценку границы в центр самого согласованного участка.
+        """
+        width = self.period / PHASE_BINS
+        if end - start < self.period:
+            centers = (np.arange(PHASE_BINS) + 0.5) * width
+            low = (start - self._epoch) % self.period
+            high = low + (end - start)
+            inside = ((centers > low) & (centers <= high)) | (
+                centers + self.period <= high
+                )
+            self._votes *= DECAY
+            self._votes += inside if changed else ~inside
+
+        best = self._votes >= self._votes.max() - 1e-9
+        if best.all():
+            return
+        # Самый длинный участок подряд идущих лучших ячеек (по кругу)
+        shift = int(np.argmin(best))
+        ring = np.roll(best, -shift)
+        run_start = run_length = length = 0
+        for position, flag in enumerate(ring):
+            length = length + 1 if flag else 0
+            if length > run_length:
+                run_length = length
+                run_start = position - length + 1
+        center = (shift + run_start + run_length / 2) % PHASE_BINS
+
+        # Начало отсчета фазы переносится к найденной границе с точностью
+        # до ячейки, чтобы голоса не смещались при уточнении периода
+        whole = int(center)
+        self._epoch += whole * width
+        self._votes = np.roll(self._votes, -whole)
+        self.boundary = self._epoch + (center - whole) * width
+
+    def _offset(self, moment):
+        """
+        Смещение момента относительно целевой точки тика,
+        приведенное к диапазону [-period / 2, period / 2).
+        """
+        offset = (moment - self.boundary - self.guard) % self.period
+        if offset >= self.period / 2:
+            offset -= self.period
+        return offset
+
+    def next_send_time(self, now, latency=0.0):
+        """
+        Рассчитывает момент отправки следующей команды.
+
+        Параметры:
+        now (float): Текущее время (time.monotonic).
+        latency (float): Ожидаемое время запроса туда и обратно.
+
+        Возвращает:
+        float: Время отправки (time.monotonic), при котором запрос придет
+        на сервер через GUARD_SECONDS после ближайшей границы тика
+        (или за PROBE_SECONDS до нее для пробной отправки).
+        """
+        if self.boundary is None:
+            return now + FALLBACK_SLEEP
+        self._sends += 1
+        offset = self.guard
+        if self._sends % PROBE_EVERY == 0:
+            offset = -PROBE_SECONDS
+        one_way = latency / 2
+        ticks = math.ceil(
+            (now + one_way - self.boundary - offset) / self.period
+            )
+        return self.boundary + ticks * self.period + offset - one_way
+
+    def wait(self, latency=0.0):
+        """
+        Засыпает до момента отправки следующей команды.
+
+        Параметры:
+        latency (float): Ожидаемое время запроса туда и обратно.
+        """
+        now = time.monotonic()
+        delay = self.next_send_time(now, latency) - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _signature(world):
+    """
+    Отпечаток состояния, меняющийся с каждым тиком сервера.
+    """
+    return (
+        tuple((t.x, t.y, t.vx, t.vy) for t in world.transports),
+        float(world.enemies.x.sum()), float(world.anomalies.x.sum()),
+        len(world.bounties)
+        )
+
+
+def _game_elapsed(before, after):
+    """
+    Оценивает игровое время между состояниями по смещению транспортов.
+
+    Параметры:
+    before, after (World): Состояния в двух соседних наблюдениях.
+
+    Возвращает:
+    float: Медиана пути, деленного на среднюю скорость, по движущимся
+    транспортам, либо None, если ни один транспорт не движется.
+    """
+    previous = {t.id: t for t in before.transports}
+    estimates = []
+    for transport in after.transports:
+        old = previous.get(transport.id)
+        if old is None or old.death_count != transport.death_count:
+            continue
+        speed = (
+            math.hypot(old.vx, old.vy)
+            + math.hypot(transport.vx, transport.vy)
+            ) / 2
+        if speed < MIN_SPEED:
+            continue
+        distance = math.hypot(transport.x - old.x, transport.y - old.y)
+        estimates.append(distance / speed)
+    if not estimates:
+        return None
+    estimates.sort()
+    return estimates[len(estimates) // 2]
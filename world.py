@@ -0,0 +1,289 @@
+from operator import itemgetter
+
+import numpy as np
+
+
+class Transport:
+    """
+    Собственный транспорт игрока.
+
+    Хранит значения в слотах вместо вложенных словарей ответа сервера:
+    векторы скорости и ускорений разложены на отдельные компоненты.
+    """
+
+    __slots__ = (
+        'id', 'x', 'y', 'vx', 'vy', 'self_ax', 'self_ay',
+        'anomaly_ax', 'anomaly_ay', 'health', 'status', 'death_count',
+        'shield_left_ms', 'shield_cooldown_ms', 'attack_cooldown_ms'
+        )
+
+    def __init__(self, id, x, y, vx, vy, self_ax, self_ay,
+                 anomaly_ax, anomaly_ay, health, status, death_count,
+                 shield_left_ms, shield_cooldown_ms, attack_cooldown_ms):
+        self.id = id
+        self.x = x
+        self.y = y
+        self.vx = vx
+        self.vy = vy
+        self.self_ax = self_ax
+        self.self_ay = self_ay
+        self.anomaly_ax = anomaly_ax
+        self.anomaly_ay = anomaly_ay
+        self.health = health
+        self.status = status
+        self.death_count = death_count
+        self.shield_left_ms = shield_left_ms
+        self.shield_cooldown_ms = shield_cooldown_ms
+        self.attack_cooldown_ms = attack_cooldown_ms
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Создает транспорт из словаря ответа сервера.
+
+        Параметры:
+        data (dict): Описание транспорта из списка 'transports'.
+
+        Возвращает:
+        Transport: Транспорт с разложенными по слотам значениями.
+        """
+        velocity = data['velocity']
+        self_acceleration = data['selfAcceleration']
+        anomaly_acceleration = data['anomalyAcceleration']
+        return cls(
+            data['id'], data['x'], data['y'],
+            velocity['x'], velocity['y'],
+            self_acceleration['x'], self_acceleration['y'],
+            anomaly_acceleration['x'], anomaly_acceleration['y'],
+            data['health'], data['status'], data['deathCount'],
+            data['shieldLeftMs'], data['shieldCooldownMs'],
+            data['attackCooldownMs']
+            )
+
+
+class Bounties:
+    """
+    Монеты на карте в виде столбцов (struct-of-arrays).
+
+    Атрибуты:
+    x, y (ndarray): Координаты монет.
+    points (ndarray): Очки за сбор монеты.
+    radius (ndarray): Радиусы монет.
+    """
+
+    __slots__ = ('x', 'y', 'points', 'radius')
+
+    FIELDS = ('x', 'y', 'points', 'radius')
+
+    def __init__(self, x, y, points, radius):
+        self.x = x
+        self.y = y
+        self.points = points
+        self.radius = radius
+
+    def __len__(self):
+        return len(self.x)
+
+    @classmethod
+    def from_list(cls, items):
+        return cls(*_columns(items, cls.FIELDS))
+
+
+class Enemies:
+    """
+    Вражеские транспорты (а также разыскиваемые цели) в виде столбцов.
+
+    Атрибуты:
+    x, y (ndarray): Координаты врагов.
+    vx, vy (ndarray): Компоненты скорости.
+    health (ndarray): Уровень здоровья.
+    kill_bounty (ndarray): Награда за уничтожение.
+    shield_left_ms (ndarray): Оставшееся время работы щита.
+    alive (ndarray): Признак статуса 'alive'.
+    """
+
+    __slots__ = (
+        'x', 'y', 'vx', 'vy', 'health', 'kill_bounty', 'shield_left_ms',
+        'alive'
+        )
+
+    FIELDS = (
+        'x', 'y', ('velocity', 'x'), ('velocity', 'y'), 'health',
+        'killBounty', 'shieldLeftMs'
+        )
+
+    def __init__(self, x, y, vx, vy, health, kill_bounty, shield_left_ms,
+                 alive):
+        self.x = x
+        self.y = y
+        self.vx = vx
+        self.vy = vy
+        self.health = health
+        self.kill_bounty = kill_bounty
+        self.shield_left_ms = shield_left_ms
+        self.alive = alive
+
+    def __len__(self):
+        return len(self.x)
+
+    @classmethod
+    def from_list(cls, items):
+        alive = np.fromiter(
+            map('alive'.__eq__, map(itemgetter('status'), items)),
+            dtype=bool, count=len(items)
+            )
+        return cls(*_columns(items, cls.FIELDS), alive)
+
+
+class Anomalies:
+    """
+    Аномалии на карте в виде столбцов.
+
+    Атрибуты:
+    ids (list): Идентификаторы аномалий.
+    x, y (ndarray): Координаты центров.
+    radius (ndarray): Радиусы ядра аномалий.
+    effective_radius (ndarray): Радиусы действия аномалий.
+    strength (ndarray): Сила аномалий.
+    vx, vy (ndarray): Компоненты скорости.
+    """
+
+    __slots__ = (
+        'ids', 'x', 'y', 'radius', 'effective_radius', 'strength', 'vx', 'vy'
+        )
+
+    FIELDS = (
+        'x', 'y', 'radius', 'effectiveRadius', 'strength',
+        ('velocity', 'x'), ('velocity', 'y')
+        )
+
+    def __init__(self, ids, x, y, radius, effective_radius, strength, vx, vy):
+        self.ids = ids
+        self.x = x
+        self.y = y
+        self.radius = radius
+        self.effective_radius = effective_radius
+        self.strength = strength
+        self.vx = vx
+        self.vy = vy
+
+    def __len__(self):
+        return len(self.x)
+
+    @classmethod
+    def from_list(cls, items):
+        return cls(
+            list(map(itemgetter('id'), items)), *_columns(items, cls.FIELDS)
+            )
+
+
+class World:
+    """
+    Компактное состояние игрового мира на один тик.
+
+    Ответ сервера преобразуется один раз: общие параметры становятся
+    атрибутами, транспорты — объектами Transport, а монеты, враги,
+    разыскиваемые цели и аномалии — столбцами NumPy. Состояние
+    не изменяется после создания и может передаваться между модулями
+    без копирования.
+    """
+
+    __slots__ = (
+        'map_width', 'map_height', 'name', 'points', 'max_speed',
+        'max_accel', 'attack_range', 'attack_cooldown_ms', 'attack_damage',
+        'attack_explosion_radius', 'revive_timeout_sec', 'shield_time_ms',
+        'shield_cooldown_ms', 'transport_radius', 'transports', 'enemies',
+        'wanted', 'bounties', 'anomalies'
+        )
+
+    def __init__(self, map_width, map_height, name, points, max_speed,
+                 max_accel, attack_range, attack_cooldown_ms, attack_damage,
+                 attack_explosion_radius, revive_timeout_sec, shield_time_ms,
+                 shield_cooldown_ms, transport_radius, transports, enemies,
+                 wanted, bounties, anomalies):
+        self.map_width = map_width
+        self.map_height = map_height
+        self.name = name
+        self.points = points
+        self.max_speed = max_speed
+        self.max_accel = max_accel
+        self.attack_range = attack_range
+        self.attack_cooldown_ms = attack_cooldown_ms
+        self.attack_damage = attack_damage
+        self.attack_explosion_radius = attack_explosion_radius
+        self.revive_timeout_sec = revive_timeout_sec
+        self.shield_time_ms = shield_time_ms
+        self.shield_cooldown_ms = shield_cooldown_ms
+        self.transport_radius = transport_radius
+        self.transports = transports
+        self.enemies = enemies
+        self.wanted = wanted
+        self.bounties = bounties
+        self.anomalies = anomalies
+
+    @classmethod
+    def from_response(cls, response):
+        """
+        Преобразует ответ сервера в состояние мира.
+
+        Параметры:
+        response (dict): Разобранный JSON-ответ эндпоинта move.
+
+        Возвращает:
+        World: Состояние мира для текущего тика.
+        """
+        return cls(
+            response['mapSize']['x'], response['mapSize']['y'],
+            response['name'], response['points'], response['maxSpeed'],
+            response['maxAccel'], response['attackRange'],
+            response['attackCooldownMs'], response['attackDamage'],
+            response['attackExplosionRadius'], response['reviveTimeoutSec'],
+            response['shieldTimeMs'], response['shieldCooldownMs'],
+            response['transportRadius'],
+            [Transport.from_dict(t) for t in response['transports']],
+            Enemies.from_list(response['enemies']),
+            Enemies.from_list(response['wantedList']),
+            Bounties.from_list(response['bounties']),
+            Anomalies.from_list(response['anomalies'])
+            )
+
+    def replace(self, **changes):
+        """
+        Создает копию состояния с измененными атрибутами.
+
+        Неизмененные атрибуты (в том числе столбцы) разделяются
+        с исходным состоянием без копирования.
+
+        Параметры:
+        changes: Новые значения атрибутов.
+
+        Возвращает:
+        World: Новое состояние мира.
+        """
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return World(**fields)
+
+
+def _columns(items, fields):
+    """
+    Извлекает из списка словарей только нужные поля в виде столбцов.
+
+    Параметры:
+    items (list): Однотипные словари из ответа сервера.
+    fields (tuple): Имена полей; кортеж (outer, inner) обозначает
+    вложенное поле, например ('velocity', 'x').
+
+    Возвращает:
+    list: Непрерывные массивы float, по одному на поле.
+    """
+    count = len(items)
+    columns = []
+    for field in fields:
+        if isinstance(field, tuple):
+            outer, inner = field
+            values = map(itemgetter(inner), map(itemgetter(outer), items))
+        else:
+            values = map(itemgetter(field), items)
+        columns.append(np.fromiter(values, dtype=float, count=count))
+    return columns